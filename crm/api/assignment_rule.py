@@ -1,25 +1,31 @@
 import frappe
+from frappe.query_builder import Order
+from frappe.query_builder.functions import Count
 
 
 @frappe.whitelist()
 def get_assignment_rules_list():
-	assignment_rules = []
-	for docname in frappe.get_all(
-		"Assignment Rule", filters={"document_type": ["in", ["CRM Lead", "CRM Deal"]]}
-	):
-		doc = frappe.get_value(
-			"Assignment Rule",
-			docname,
-			fieldname=[
-				"name",
-				"description",
-				"disabled",
-				"priority",
-			],
-			as_dict=True,
+	Rule = frappe.qb.DocType("Assignment Rule")
+	RuleUser = frappe.qb.DocType("Assignment Rule User")
+
+	assignment_rules = (
+		frappe.qb.from_(Rule)
+		.left_join(RuleUser)
+		.on((RuleUser.parent == Rule.name) & (RuleUser.parenttype == "Assignment Rule"))
+		.select(
+			Rule.name,
+			Rule.description,
+			Rule.disabled,
+			Rule.priority,
+			Count(RuleUser.name).as_("users_count"),
 		)
-		users_exists = bool(frappe.db.exists("Assignment Rule User", {"parent": docname.name}))
-		assignment_rules.append({**doc, "users_exists": users_exists})
+		.where(Rule.document_type.isin(["CRM Lead", "CRM Deal"]))
+		.groupby(Rule.name)
+		.orderby(Rule.creation, order=Order.desc)
+	).run(as_dict=True)
+
+	for rule in assignment_rules:
+		rule["users_exists"] = bool(rule.pop("users_count"))
 	return assignment_rules
 
 
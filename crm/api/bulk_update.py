@@ -0,0 +1,427 @@
+"""
+Bulk updates from list views.
+
+Setting the same values on many leads or deals does not save every document. The records
+of a chunk are updated with one `UPDATE`, and only the side effects of the fields that
+changed are applied, each for the whole chunk at once:
+
+- versions are recorded for the timeline of every changed record
+- a new owner is assigned, and the record shared with them after the commit
+- a new status closes the open status change log entry and opens another
+
+Fields that other fields are computed from, fetched from or validated against (names,
+contact details, forecasting, currency, ...) and statuses that close a deal still go through a
+full save of every record, as does every other doctype. So do records without an SLA while SLAs
+are enabled for the doctype, as their SLA conditions may depend on the changed fields, and leads
+whose email is the new lead owner, which their validation rejects.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.desk.form.assign_to import add as assign
+from frappe.model import no_value_fields
+from frappe.query_builder import Case
+from frappe.utils import add_to_date, cast, cstr, now_datetime
+
+from crm.api.doc import clear_list_totals
+from crm.fcrm.doctype.crm_status_change_log.crm_status_change_log import get_duration
+from crm.utils.side_effects import defer_batched_side_effect
+from crm.utils.status_catalog import get_status_info, get_status_type
+
+BULK_UPDATE_CHUNK_SIZE = 500
+# updates of more records than this are moved to a background job
+BULK_UPDATE_INLINE_LIMIT = 10
+OWNER_FIELDS = {"CRM Lead": "lead_owner", "CRM Deal": "deal_owner"}
+# fields whose change needs the document's controller to run
+SAVE_FIELDS = {
+	"CRM Lead": {
+		"salutation",
+		"first_name",
+		"middle_name",
+		"last_name",
+		"lead_name",
+		"organization",
+		"email",
+		"mobile_no",
+		"phone",
+		"sla",
+		"communication_status",
+	},
+	"CRM Deal": {
+		"organization",
+		"currency",
+		"probability",
+		"deal_value",
+		"expected_deal_value",
+		"expected_closure_date",
+		"closed_date",
+		"lost_reason",
+		"lost_notes",
+		"sla",
+		"communication_status",
+	},
+}
+# deal statuses of these types close the deal, e.g. create the customer in ERPNext
+SAVE_STATUS_TYPES = ("Won", "Lost")
+
+
+@frappe.whitelist()
+def bulk_update(doctype: str, docnames, data):
+	"""Set `data` on every document of `docnames`, in a background job for more than a few."""
+	docnames = frappe.parse_json(docnames)
+	data = frappe.parse_json(data)
+	if not isinstance(docnames, list) or not docnames:
+		frappe.throw(_("Documents to update must be a non-empty list"))
+	if not isinstance(data, dict) or not data:
+		frappe.throw(_("Nothing to update"))
+
+	validate_fields(doctype, data)
+
+	if len(docnames) > BULK_UPDATE_INLINE_LIMIT:
+		frappe.enqueue(
+			"crm.api.bulk_update.update_docs",
+			doctype=doctype,
+			docnames=docnames,
+			data=data,
+			notify=True,
+			queue="long",
+			timeout=60 * 60,
+		)
+		return {"queued": True}
+
+	return update_docs(doctype, docnames, data)
+
+
+def validate_fields(doctype, data):
+	"""Check the fields can be written and, as the value is the same for every record, validate it once."""
+	meta = frappe.get_meta(doctype)
+	permlevels = meta.get_permlevel_access("write")
+	for fieldname, value in data.items():
+		field = meta.get_field(fieldname)
+		if (
+			not field
+			or field.fieldtype in no_value_fields
+			or field.read_only
+			or (field.permlevel and field.permlevel not in permlevels)
+		):
+			frappe.throw(_("Field {0} cannot be updated in bulk").format(fieldname))
+
+		if value in (None, ""):
+			continue
+		if field.fieldtype == "Link" and not frappe.db.exists(field.options, value):
+			frappe.throw(
+				_("Could not find {0}: {1}").format(_(field.options), value), frappe.LinkValidationError
+			)
+		if field.fieldtype == "Select" and cstr(value) not in (field.options or "").split("\n"):
+			frappe.throw(_("{0} is not a valid {1}").format(value, _(field.label)))
+
+
+def update_docs(doctype, docnames, data, notify=False, chunk_size=BULK_UPDATE_CHUNK_SIZE):
+	"""
+	Update `docnames` in chunks, committing and publishing progress after every chunk.
+
+	:return: `{"updated": count, "failed": {name: error}}`
+	"""
+	meta = frappe.get_meta(doctype)
+	data = {fieldname: cast(meta.get_field(fieldname).fieldtype, value) for fieldname, value in data.items()}
+	set_based = needs_save(doctype, data) is False
+	sla_enabled = set_based and has_enabled_sla(doctype)
+
+	result = {"updated": 0, "failed": {}}
+	done = 0
+	for chunk in frappe.utils.create_batch(docnames, chunk_size):
+		names = []
+		for name in chunk:
+			if not frappe.db.exists(doctype, name):
+				result["failed"][name] = _("{0} {1} does not exist").format(_(doctype), name)
+			elif frappe.has_permission(doctype, "write", name):
+				names.append(name)
+			else:
+				result["failed"][name] = _("Not permitted")
+
+		if set_based:
+			update_chunk(doctype, names, data, result, sla_enabled)
+		else:
+			save_chunk(doctype, names, data, result)
+
+		if not frappe.flags.in_test:
+			frappe.db.commit()  # nosemgrep
+
+		done += len(chunk)
+		frappe.publish_progress(
+			done * 100 / len(docnames),
+			title=_("Updating {0}").format(_(doctype)),
+			description=_("{0} of {1}").format(done, len(docnames)),
+		)
+
+	if set_based:
+		clear_list_totals(frappe._dict(doctype=doctype))
+		frappe.publish_realtime("list_update", {"doctype": doctype}, after_commit=True)
+	if notify:
+		frappe.publish_realtime(
+			"crm_bulk_update", {"doctype": doctype, **result}, user=frappe.session.user, after_commit=True
+		)
+	return result
+
+
+def needs_save(doctype, data) -> bool:
+	if doctype not in OWNER_FIELDS or get_save_fields(doctype).intersection(data):
+		return True
+	# the linked doctype comes from another field of each record
+	meta = frappe.get_meta(doctype)
+	if any(meta.get_field(fieldname).fieldtype == "Dynamic Link" for fieldname in data):
+		return True
+	return doctype == "CRM Deal" and get_status_type(doctype, data.get("status")) in SAVE_STATUS_TYPES
+
+
+def get_save_fields(doctype) -> set[str]:
+	"""`SAVE_FIELDS` of `doctype` and the link fields other fields are fetched from."""
+	fetch_sources = {
+		df.fetch_from.split(".", 1)[0] for df in frappe.get_meta(doctype).fields if df.fetch_from
+	}
+	return SAVE_FIELDS[doctype] | (fetch_sources - {""})
+
+
+def has_enabled_sla(doctype) -> bool:
+	return bool(frappe.db.exists("CRM Service Level Agreement", {"apply_on": doctype, "enabled": 1}))
+
+
+def save_chunk(doctype, names, data, result):
+	for name in names:
+		frappe.db.savepoint("bulk_update")
+		try:
+			doc = frappe.get_doc(doctype, name)
+			doc.update(data)
+			doc.save()
+			result["updated"] += 1
+		except Exception as e:
+			frappe.db.rollback(save_point="bulk_update")
+			frappe.clear_last_message()
+			result["failed"][name] = str(e)
+
+
+def update_chunk(doctype, names, data, result, sla_enabled=False):
+	if not names:
+		return
+
+	owner_field = OWNER_FIELDS[doctype]
+	fields = ["name", "status", "sla", owner_field, "_assign", *data]
+	check_owner_email = doctype == "CRM Lead" and data.get(owner_field)
+	if check_owner_email:
+		fields.append("email")
+	rows = frappe.get_all(doctype, filters={"name": ("in", names)}, fields=list(dict.fromkeys(fields)))
+	changed_rows = [row for row in rows if any(cstr(row.get(f)) != cstr(value) for f, value in data.items())]
+	# records that already have the values count as updated
+	result["updated"] += len(rows) - len(changed_rows)
+	rows = changed_rows
+
+	if sla_enabled:
+		# an SLA may apply once the fields change, `set_sla` runs on save
+		save_chunk(doctype, [row.name for row in rows if not row.sla], data, result)
+		rows = [row for row in rows if row.sla]
+	if check_owner_email:
+		# `validate_email` rejects a lead owned by its own email address, let the save report it
+		save_chunk(doctype, [row.name for row in rows if row.email == data[owner_field]], data, result)
+		rows = [row for row in rows if row.email != data[owner_field]]
+	result["updated"] += len(rows)
+	if not rows:
+		return
+
+	timestamp = now_datetime()
+	changed = [row.name for row in rows]
+	Table = frappe.qb.DocType(doctype)
+	query = frappe.qb.update(Table).set(Table.modified, timestamp).set(Table.modified_by, frappe.session.user)
+	for fieldname, value in data.items():
+		query = query.set(Table[fieldname], value)
+	query.where(Table.name.isin(changed)).run()
+
+	insert_versions(doctype, rows, data, timestamp)
+	if owner_field in data:
+		assign_owner(doctype, rows, data[owner_field])
+	if "status" in data:
+		status_rows = [row for row in rows if row.status != data["status"]]
+		log_status_change(doctype, status_rows, data["status"], timestamp)
+
+
+def insert_versions(doctype, rows, data, timestamp):
+	frappe.db.bulk_insert(
+		"Version",
+		["name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"],
+		[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+				doctype,
+				row.name,
+				frappe.as_json(
+					{
+						"added": [],
+						"changed": [
+							[fieldname, row.get(fieldname), value]
+							for fieldname, value in data.items()
+							if cstr(row.get(fieldname)) != cstr(value)
+						],
+						"removed": [],
+						"row_changed": [],
+					},
+					indent=None,
+				),
+			)
+			for row in rows
+		],
+	)
+
+
+def assign_owner(doctype, rows, owner):
+	"""Assign the new owner to records they are not assigned to yet and share them after the commit."""
+	if not owner:
+		return
+
+	for row in rows:
+		if row.get(OWNER_FIELDS[doctype]) == owner:
+			continue
+		if owner not in json.loads(row._assign or "[]"):
+			assign({"assign_to": [owner], "doctype": doctype, "name": row.name})
+		defer_batched_side_effect(
+			"crm.api.bulk_update.share_with_owners", {"doctype": doctype, "name": row.name, "owner": owner}
+		)
+
+
+def share_with_owners(items: list[dict]):
+	for item in items:
+		try:
+			doc = frappe.get_doc(item["doctype"], item["name"])
+		except frappe.DoesNotExistError:
+			frappe.clear_last_message()
+			continue
+		doc.share_with_agent(item["owner"])
+
+
+def log_status_change(doctype, rows, status, timestamp):
+	"""
+	Close the open status change log entry of every record and open one for `status`, like
+	`add_status_change_log` does for a single save.
+	"""
+	if not rows:
+		return
+
+	Log = frappe.qb.DocType("CRM Status Change Log")
+	open_logs = {}
+	for log in (
+		frappe.qb.from_(Log)
+		.select(Log.name, Log.parent, Log.idx, Log.from_date)
+		.where((Log.parenttype == doctype) & Log.parent.isin([row.name for row in rows]))
+		.orderby(Log.idx)
+	).run(as_dict=True):
+		open_logs[log.parent] = log
+
+	status_type = get_status_type(doctype, status) or ""
+	new_logs = []
+	durations = Case()
+	for row in rows:
+		log = open_logs.get(row.name)
+		idx = log.idx if log else 0
+		if log:
+			durations = durations.when(Log.name == log.name, get_duration(log.from_date, timestamp))
+		elif row.status:
+			idx = 1
+			# records without a log get one for the status they had until now
+			new_logs.append(
+				{
+					"parent": row.name,
+					"idx": 1,
+					"from": row.status,
+					"from_type": get_status_type(doctype, row.status) or "",
+					"to": status,
+					"to_type": status_type,
+					"from_date": add_to_date(timestamp, minutes=-1),
+					"to_date": timestamp,
+					"duration": 60,
+				}
+			)
+		new_logs.append(
+			{
+				"parent": row.name,
+				"idx": idx + 1,
+				"from": status,
+				"from_type": status_type,
+				"from_date": timestamp,
+			}
+		)
+
+	if open_logs:
+		(
+			frappe.qb.update(Log)
+			.set(Log.to, status)
+			.set(Log.to_type, status_type)
+			.set(Log.to_date, timestamp)
+			.set(Log.log_owner, frappe.session.user)
+			.set(Log.duration, durations)
+			.where(Log.name.isin([log.name for log in open_logs.values()]))
+		).run()
+
+	frappe.db.bulk_insert(
+		"CRM Status Change Log",
+		[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"from",
+			"from_type",
+			"to",
+			"to_type",
+			"from_date",
+			"to_date",
+			"duration",
+			"log_owner",
+		],
+		[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+				log["parent"],
+				doctype,
+				"status_change_log",
+				log["idx"],
+				log["from"],
+				log["from_type"],
+				log.get("to", ""),
+				log.get("to_type", ""),
+				log["from_date"],
+				log.get("to_date"),
+				log.get("duration"),
+				frappe.session.user,
+			)
+			for log in new_logs
+		],
+	)
+
+	if doctype == "CRM Deal":
+		set_default_probability([row.name for row in rows], status)
+
+
+def set_default_probability(deals, status):
+	probability = get_status_info("CRM Deal", status).get("probability")
+	if not probability:
+		return
+
+	Deal = frappe.qb.DocType("CRM Deal")
+	(
+		frappe.qb.update(Deal)
+		.set(Deal.probability, probability)
+		.where(Deal.name.isin(deals) & (Deal.probability.isnull() | (Deal.probability == 0)))
+	).run()
@@ -6,7 +6,7 @@ from frappe import _
 from frappe.desk.form.utils import add_comment as frappe_add_comment
 from frappe.utils import get_fullname
 
-from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
+from crm.fcrm.doctype.crm_notification.crm_notification import notify_users
 
 
 def on_update(self, method):
@@ -22,25 +22,36 @@ def notify_mentions(doc):
 	if not content:
 		return
 	mentions = extract_mentions(content)
-	reference_doc = frappe.get_doc(doc.reference_doctype, doc.reference_name)
-	for mention in mentions:
-		owner = frappe.get_cached_value("User", doc.owner, "full_name")
-		doctype = doc.reference_doctype
-		if doctype.startswith("CRM "):
-			doctype = doctype[4:].lower()
-		name = (
-			reference_doc.lead_name
-			if doctype == "lead"
-			else reference_doc.organization or reference_doc.lead_name
-		)
-		notification_text = f"""
+	if not mentions:
+		return
+
+	owner = frappe.get_cached_value("User", doc.owner, "full_name")
+	doctype = doc.reference_doctype
+	if doctype.startswith("CRM "):
+		doctype = doctype[4:].lower()
+
+	# only the fields needed for the notification text, not the whole reference document
+	meta = frappe.get_meta(doc.reference_doctype)
+	fields = [field for field in ("lead_name", "organization") if meta.has_field(field)]
+	reference = fields and frappe.db.get_value(
+		doc.reference_doctype, doc.reference_name, fields, as_dict=True
+	)
+	reference = reference or {}
+	name = (
+		reference.get("lead_name")
+		if doctype == "lead"
+		else reference.get("organization") or reference.get("lead_name")
+	)
+
+	notification_text = f"""
             <div class="mb-2 leading-5 text-ink-gray-5">
                 <span class="font-medium text-ink-gray-9">{owner}</span>
                 <span>{_("mentioned you in {0}").format(doctype)}</span>
                 <span class="font-medium text-ink-gray-9">{name}</span>
             </div>
         """
-		notify_user(
+	notify_users(
+		[
 			{
 				"owner": doc.owner,
 				"assigned_to": mention.email,
@@ -52,7 +63,9 @@ def notify_mentions(doc):
 				"redirect_to_doctype": doc.reference_doctype,
 				"redirect_to_docname": doc.reference_name,
 			}
-		)
+			for mention in mentions
+		]
+	)
 
 
 def extract_mentions(html):
@@ -1,5 +1,24 @@
 import frappe
 from frappe import _
+from frappe.query_builder.functions import Count, IfNull
+
+from crm.utils.search_index import search_index
+
+# contacts that are primary on more deals than this update them in a background job
+DEAL_PROPAGATION_INLINE_LIMIT = 50
+
+# columns shown in the deals tab of a contact
+LINKED_DEAL_FIELDS = [
+	"name",
+	"organization",
+	"currency",
+	"annual_revenue",
+	"status",
+	"email",
+	"mobile_no",
+	"deal_owner",
+	"modified",
+]
 
 
 def validate(doc, method):
@@ -7,60 +26,101 @@ def validate(doc, method):
 
 
 def update_deals_email_mobile_no(doc):
-	linked_deals = frappe.get_all(
-		"CRM Contacts",
-		filters={"contact": doc.name, "is_primary": 1},
-		fields=["parent"],
+	if doc.is_new():
+		return
+
+	Deal, condition = get_deals_to_update(doc.name, doc.email_id, doc.mobile_no)
+	count = frappe.qb.from_(Deal).select(Count("*")).where(condition).run()[0][0]
+	if not count:
+		return
+
+	if count > DEAL_PROPAGATION_INLINE_LIMIT and not frappe.flags.in_test:
+		frappe.enqueue(
+			"crm.api.contact.propagate_contact_to_deals",
+			queue="long",
+			job_id=f"crm_propagate_contact_to_deals::{doc.name}",
+			deduplicate=True,
+			enqueue_after_commit=True,
+			contact=doc.name,
+		)
+		return
+
+	set_deals_email_mobile_no(doc.name, doc.email_id, doc.mobile_no)
+
+
+def get_deals_to_update(contact, email, mobile_no):
+	"""Return the CRM Deal table and a condition matching deals `contact` is the primary
+	contact of whose email or mobile no differ from the contact's."""
+	Deal = frappe.qb.DocType("CRM Deal")
+	DealContact = frappe.qb.DocType("CRM Contacts")
+
+	primary_deals = (
+		frappe.qb.from_(DealContact)
+		.select(DealContact.parent)
+		.where(
+			(DealContact.contact == contact)
+			& (DealContact.is_primary == 1)
+			& (DealContact.parenttype == "CRM Deal")
+		)
 	)
+	return Deal, Deal.name.isin(primary_deals) & (
+		(IfNull(Deal.email, "") != (email or "")) | (IfNull(Deal.mobile_no, "") != (mobile_no or ""))
+	)
+
+
+def set_deals_email_mobile_no(contact, email, mobile_no):
+	"""Copy the contact's email and mobile no to every deal it is the primary contact of,
+	with one UPDATE that only touches deals that differ."""
+	Deal, condition = get_deals_to_update(contact, email, mobile_no)
+	(
+		frappe.qb.update(Deal)
+		.set(Deal.email, email)
+		.set(Deal.mobile_no, mobile_no)
+		.set(Deal.modified, frappe.utils.now())
+		.set(Deal.modified_by, frappe.session.user)
+		.where(condition)
+	).run()
+
 
-	for linked_deal in linked_deals:
-		deal = frappe.db.get_values("CRM Deal", linked_deal.parent, ["email", "mobile_no"], as_dict=True)[0]
-		if deal.email != doc.email_id or deal.mobile_no != doc.mobile_no:
-			frappe.db.set_value(
-				"CRM Deal",
-				linked_deal.parent,
-				{
-					"email": doc.email_id,
-					"mobile_no": doc.mobile_no,
-				},
-			)
+def propagate_contact_to_deals(contact):
+	values = frappe.db.get_value("Contact", contact, ["email_id", "mobile_no"], as_dict=True)
+	if values:
+		set_deals_email_mobile_no(contact, values.email_id, values.mobile_no)
 
 
 @frappe.whitelist()
-def get_linked_deals(contact):
-	"""Get linked deals for a contact"""
+def get_linked_deals(contact, order_by="modified desc", start=0, page_length=0):
+	"""
+	Get linked deals for a contact
+
+	Deals are read with one query joining `CRM Contacts`, limited to the columns shown
+	on the contact page and to deals the user can read.
+
+	:param order_by: `<field> asc|desc`, field must be one of the returned columns
+	:param start: Offset of the first deal to return
+	:param page_length: Number of deals to return, all when 0
+	"""
 
 	if not frappe.has_permission("Contact", "read", contact):
 		frappe.throw("Not permitted", frappe.PermissionError)
 
-	deal_names = frappe.get_all(
-		"CRM Contacts",
-		filters={"contact": contact, "parenttype": "CRM Deal"},
-		fields=["parent"],
+	return frappe.get_list(
+		"CRM Deal",
+		filters=[["CRM Contacts", "contact", "=", contact]],
+		fields=LINKED_DEAL_FIELDS,
+		order_by=get_linked_deals_order_by(order_by),
+		limit_start=frappe.utils.cint(start),
+		limit_page_length=frappe.utils.cint(page_length),
 		distinct=True,
 	)
 
-	# get deals data
-	deals = []
-	for d in deal_names:
-		deal = frappe.get_cached_doc(
-			"CRM Deal",
-			d.parent,
-			fields=[
-				"name",
-				"organization",
-				"currency",
-				"annual_revenue",
-				"status",
-				"email",
-				"mobile_no",
-				"deal_owner",
-				"modified",
-			],
-		)
-		deals.append(deal.as_dict())
 
-	return deals
+def get_linked_deals_order_by(order_by):
+	fieldname, _sep, direction = (order_by or "").strip().partition(" ")
+	direction = direction.strip().lower() or "desc"
+	if fieldname not in LINKED_DEAL_FIELDS or direction not in ("asc", "desc"):
+		frappe.throw(_("Invalid sort order {0}").format(order_by))
+	return f"`tabCRM Deal`.`{fieldname}` {direction}"
 
 
 @frappe.whitelist()
@@ -123,23 +183,29 @@ def search_emails(txt: str):
 	if meta.get("fields", {"fieldname": "disabled", "fieldtype": "Check"}):
 		filters.append([doctype, "disabled", "!=", 1])
 
-	or_filters = []
 	search_fields = ["full_name", "email_id", "name"]
+	ranked = []
 	if txt:
-		for f in search_fields:
-			or_filters.append([doctype, f.strip(), "like", f"%{txt}%"])
+		# rank candidates with the search index instead of LIKE-scanning every contact
+		ranked = [result["name"] for result in search_index(txt, ["Contact"], limit=100)]
+		if not ranked:
+			return []
+		filters.append([doctype, "name", "in", ranked])
 
 	results = frappe.get_list(
 		doctype,
 		filters=filters,
 		fields=search_fields,
-		or_filters=or_filters,
 		limit_start=0,
-		limit_page_length=20,
+		limit_page_length=20 if not ranked else 0,
 		order_by="email_id, full_name, name",
 		ignore_permissions=False,
 		as_list=True,
 		strict=False,
 	)
 
+	if ranked:
+		rank = {name: i for i, name in enumerate(ranked)}
+		results = sorted(results, key=lambda row: rank[row[2]])[:20]
+
 	return results
@@ -2,9 +2,12 @@ import json
 
 import frappe
 from frappe import _
+from frappe.utils import flt
 
+from crm.fcrm.doctype.crm_call_rollup.crm_call_rollup import ROLLUP_FIELDS
 from crm.fcrm.doctype.crm_dashboard.crm_dashboard import create_default_manager_dashboard
 from crm.utils import sales_user_only
+from crm.utils.status_catalog import get_status_catalog, get_status_type, get_statuses_of_type
 
 
 @frappe.whitelist()
@@ -154,12 +157,13 @@ def get_ongoing_deals(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			COUNT(CASE
 				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type NOT IN ('Won', 'Lost')
+					AND d.status NOT IN %(closed_statuses)s
 					{conds}
 				THEN d.name
 				ELSE NULL
@@ -167,13 +171,12 @@ def get_ongoing_deals(from_date, to_date, user=""):
 
 			COUNT(CASE
 				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type NOT IN ('Won', 'Lost')
+					AND d.status NOT IN %(closed_statuses)s
 					{conds}
 				THEN d.name
 				ELSE NULL
 			END) as prev_month_deals
 		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 	""",
 		params,
 		as_dict=1,
@@ -215,12 +218,13 @@ def get_average_ongoing_deal_value(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			AVG(CASE
 				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type NOT IN ('Won', 'Lost')
+					AND d.status NOT IN %(closed_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
@@ -228,13 +232,12 @@ def get_average_ongoing_deal_value(from_date, to_date, user=""):
 
 			AVG(CASE
 				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type NOT IN ('Won', 'Lost')
+					AND d.status NOT IN %(closed_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
 			END) as prev_month_avg_value
 		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
     """,
 		params,
 		as_dict=1,
@@ -274,12 +277,13 @@ def get_won_deals(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			COUNT(CASE
 				WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type = 'Won'
+					AND d.status IN %(won_statuses)s
 					{conds}
 				THEN d.name
 				ELSE NULL
@@ -287,13 +291,12 @@ def get_won_deals(from_date, to_date, user=""):
 
 			COUNT(CASE
 				WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(from_date)s
-					AND s.type = 'Won'
+					AND d.status IN %(won_statuses)s
 					{conds}
 				THEN d.name
 				ELSE NULL
 			END) as prev_month_deals
 		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		""",
 		params,
 		as_dict=1,
@@ -335,12 +338,13 @@ def get_average_won_deal_value(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			AVG(CASE
 				WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type = 'Won'
+					AND d.status IN %(won_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
@@ -348,13 +352,12 @@ def get_average_won_deal_value(from_date, to_date, user=""):
 
 			AVG(CASE
 				WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(from_date)s
-					AND s.type = 'Won'
+					AND d.status IN %(won_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
 			END) as prev_month_avg_value
 		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		""",
 		params,
 		as_dict=1,
@@ -394,12 +397,13 @@ def get_average_deal_value(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			AVG(CASE
 				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type != 'Lost'
+					AND d.status NOT IN %(lost_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
@@ -407,13 +411,12 @@ def get_average_deal_value(from_date, to_date, user=""):
 
 			AVG(CASE
 				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type != 'Lost'
+					AND d.status NOT IN %(lost_statuses)s
 					{conds}
 				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
 				ELSE NULL
 			END) as prev_month_avg
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		""",
 		params,
 		as_dict=1,
@@ -455,6 +458,7 @@ def get_average_time_to_close_a_lead(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
@@ -463,9 +467,8 @@ def get_average_time_to_close_a_lead(from_date, to_date, user=""):
 			AVG(CASE WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(prev_to_date)s
 				THEN TIMESTAMPDIFF(DAY, COALESCE(l.creation, d.creation), d.closed_date) END) as prev_avg_lead
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		LEFT JOIN `tabCRM Lead` l ON d.lead = l.name
-		WHERE d.closed_date IS NOT NULL AND s.type = 'Won'
+		WHERE d.closed_date IS NOT NULL AND d.status IN %(won_statuses)s
 			{conds}
 		""",
 		params,
@@ -508,6 +511,7 @@ def get_average_time_to_close_a_deal(from_date, to_date, user=""):
 		conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
@@ -516,9 +520,8 @@ def get_average_time_to_close_a_deal(from_date, to_date, user=""):
 			AVG(CASE WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(prev_to_date)s
 				THEN TIMESTAMPDIFF(DAY, d.creation, d.closed_date) END) as prev_avg_deal
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		LEFT JOIN `tabCRM Lead` l ON d.lead = l.name
-		WHERE d.closed_date IS NOT NULL AND s.type = 'Won'
+		WHERE d.closed_date IS NOT NULL AND d.status IN %(won_statuses)s
 			{conds}
 		""",
 		params,
@@ -564,6 +567,7 @@ def get_sales_trend(from_date="", to_date="", user=""):
 		deal_conds += " AND deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
@@ -588,9 +592,8 @@ def get_sales_trend(from_date="", to_date="", user=""):
 				DATE(d.creation) AS date,
 				0 AS leads,
 				COUNT(*) AS deals,
-				SUM(CASE WHEN s.type = 'Won' THEN 1 ELSE 0 END) AS won_deals
+				SUM(CASE WHEN d.status IN %(won_statuses)s THEN 1 ELSE 0 END) AS won_deals
 			FROM `tabCRM Deal` d
-			JOIN `tabCRM Deal Status` s ON d.status = s.name
 			WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
 			{deal_conds}
 			GROUP BY DATE(d.creation)
@@ -651,24 +654,24 @@ def get_forecasted_revenue(from_date="", to_date="", user=""):
 		deal_conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			DATE_FORMAT(d.expected_closure_date, '%%Y-%%m')                        AS month,
 			SUM(
 				CASE
-					WHEN s.type = 'Lost' THEN d.expected_deal_value * IFNULL(d.exchange_rate, 1)
+					WHEN d.status IN %(lost_statuses)s THEN d.expected_deal_value * IFNULL(d.exchange_rate, 1)
 					ELSE d.expected_deal_value * IFNULL(d.probability, 0) / 100 * IFNULL(d.exchange_rate, 1)  -- forecasted
 				END
 			)                                                       AS forecasted,
 			SUM(
 				CASE
-					WHEN s.type = 'Won' THEN d.deal_value * IFNULL(d.exchange_rate, 1)            -- actual
+					WHEN d.status IN %(won_statuses)s THEN d.deal_value * IFNULL(d.exchange_rate, 1)  -- actual
 					ELSE 0
 				END
 			)                                                       AS actual
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		WHERE d.expected_closure_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
 		{deal_conds}
 		GROUP BY DATE_FORMAT(d.expected_closure_date, '%%Y-%%m')
@@ -796,15 +799,14 @@ def get_deals_by_stage_axis(from_date="", to_date="", user=""):
 		deal_conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			d.status AS stage,
-			COUNT(*) AS count,
-			s.type AS status_type
+			COUNT(*) AS count
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND s.type NOT IN ('Lost')
+		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND d.status NOT IN %(lost_statuses)s
 		{deal_conds}
 		GROUP BY d.status
 		ORDER BY count DESC
@@ -813,6 +815,9 @@ def get_deals_by_stage_axis(from_date="", to_date="", user=""):
 		as_dict=True,
 	)
 
+	for row in result:
+		row["status_type"] = get_status_type("CRM Deal", row.stage)
+
 	return {
 		"data": result or [],
 		"title": _("Deals by ongoing & won stage"),
@@ -853,10 +858,8 @@ def get_deals_by_stage_donut(from_date="", to_date="", user=""):
 		f"""
 		SELECT
 			d.status AS stage,
-			COUNT(*) AS count,
-			s.type AS status_type
+			COUNT(*) AS count
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
 		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
 		{deal_conds}
 		GROUP BY d.status
@@ -866,6 +869,9 @@ def get_deals_by_stage_donut(from_date="", to_date="", user=""):
 		as_dict=True,
 	)
 
+	for row in result:
+		row["status_type"] = get_status_type("CRM Deal", row.stage)
+
 	return {
 		"data": result or [],
 		"title": _("Deals by stage"),
@@ -897,14 +903,14 @@ def get_lost_deal_reasons(from_date="", to_date="", user=""):
 		deal_conds += " AND d.deal_owner = %(user)s"
 		params["user"] = user
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
 			d.lost_reason AS reason,
 			COUNT(*) AS count
 		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND s.type = 'Lost'
+		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND d.status IN %(lost_statuses)s
 		{deal_conds}
 		GROUP BY d.lost_reason
 		HAVING reason IS NOT NULL AND reason != ''
@@ -1141,6 +1147,223 @@ def get_deals_by_salesperson(from_date="", to_date="", user=""):
 	}
 
 
+def get_total_calls(from_date, to_date, user=""):
+	"""
+	Get call count for the dashboard.
+	"""
+	totals = get_call_rollup_totals(from_date, to_date, user)
+	current_calls = totals["current"].incoming_calls + totals["current"].outgoing_calls
+	prev_calls = totals["previous"].incoming_calls + totals["previous"].outgoing_calls
+
+	return {
+		"title": _("Total calls"),
+		"tooltip": _("Total number of incoming and outgoing calls"),
+		"value": int(current_calls),
+		"delta": (current_calls - prev_calls) / prev_calls * 100 if prev_calls else 0,
+		"deltaSuffix": "%",
+	}
+
+
+def get_missed_call_rate(from_date, to_date, user=""):
+	"""
+	Get missed call rate for the dashboard.
+	"""
+	totals = get_call_rollup_totals(from_date, to_date, user)
+
+	def missed_call_rate(row):
+		return row.missed_calls / row.incoming_calls * 100 if row.incoming_calls else 0
+
+	current_rate = missed_call_rate(totals["current"])
+	prev_rate = missed_call_rate(totals["previous"])
+
+	return {
+		"title": _("Missed call rate"),
+		"tooltip": _("Share of incoming calls that were not answered"),
+		"value": current_rate,
+		"suffix": "%",
+		"delta": current_rate - prev_rate if totals["previous"].incoming_calls else 0,
+		"deltaSuffix": "%",
+		"negativeIsBetter": True,
+	}
+
+
+def get_average_talk_time(from_date, to_date, user=""):
+	"""
+	Get average talk time of answered calls, in minutes, for the dashboard.
+	"""
+	totals = get_call_rollup_totals(from_date, to_date, user)
+
+	def average_talk_time(row):
+		return row.talk_time / row.answered_calls / 60 if row.answered_calls else 0
+
+	current_avg = average_talk_time(totals["current"])
+	prev_avg = average_talk_time(totals["previous"])
+
+	return {
+		"title": _("Avg. talk time"),
+		"tooltip": _("Average duration of answered calls"),
+		"value": current_avg,
+		"suffix": " min",
+		"delta": current_avg - prev_avg if prev_avg else 0,
+		"deltaSuffix": " min",
+	}
+
+
+def get_average_lead_response_time(from_date, to_date, user=""):
+	"""
+	Get average time from lead creation to its first outgoing call, in hours, for the dashboard.
+	"""
+	totals = get_call_rollup_totals(from_date, to_date, user)
+
+	def average_response_time(row):
+		return row.lead_response_time / row.lead_responses / 3600 if row.lead_responses else 0
+
+	current_avg = average_response_time(totals["current"])
+	prev_avg = average_response_time(totals["previous"])
+
+	return {
+		"title": _("Avg. lead response time"),
+		"tooltip": _("Average time taken from lead creation to the first call to the lead"),
+		"value": current_avg,
+		"suffix": " hrs",
+		"delta": current_avg - prev_avg if prev_avg else 0,
+		"deltaSuffix": " hrs",
+		"negativeIsBetter": True,
+	}
+
+
+def get_call_volume(from_date="", to_date="", user=""):
+	"""
+	Get daily call volume for the dashboard.
+	[
+		{ date: new Date('2024-05-01'), incoming_calls: 45, outgoing_calls: 23, missed_calls: 4 },
+		...
+	]
+	"""
+	conds = ""
+
+	if not from_date or not to_date:
+		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
+		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
+
+	params = {"from": from_date, "to": to_date}
+
+	if user:
+		conds += " AND agent = %(user)s"
+		params["user"] = user
+
+	result = frappe.db.sql(
+		f"""
+		SELECT
+			date,
+			SUM(incoming_calls) AS incoming_calls,
+			SUM(outgoing_calls) AS outgoing_calls,
+			SUM(missed_calls) AS missed_calls
+		FROM `tabCRM Call Rollup`
+		WHERE date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY date
+		ORDER BY date
+		""",
+		params,
+		as_dict=True,
+	)
+
+	call_volume = [
+		{
+			"date": frappe.utils.get_datetime(row.date).strftime("%Y-%m-%d"),
+			"incoming_calls": row.incoming_calls or 0,
+			"outgoing_calls": row.outgoing_calls or 0,
+			"missed_calls": row.missed_calls or 0,
+		}
+		for row in result
+	]
+
+	return {
+		"data": call_volume,
+		"title": _("Call volume"),
+		"subtitle": _("Daily incoming, outgoing and missed calls"),
+		"xAxis": {
+			"title": _("Date"),
+			"key": "date",
+			"type": "time",
+			"timeGrain": "day",
+		},
+		"yAxis": {
+			"title": _("Calls"),
+		},
+		"series": [
+			{"name": "incoming_calls", "type": "line", "showDataPoints": True},
+			{"name": "outgoing_calls", "type": "line", "showDataPoints": True},
+			{"name": "missed_calls", "type": "line", "showDataPoints": True},
+		],
+	}
+
+
+def get_calls_by_agent(from_date="", to_date="", user=""):
+	"""
+	Get call data by agent for the dashboard.
+	[
+		{ agent: 'John Smith', calls: 45, talk_time: 120, missed_call_rate: 8.5 },
+		...
+	]
+	"""
+	conds = ""
+
+	if not from_date or not to_date:
+		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
+		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
+
+	params = {"from": from_date, "to": to_date}
+
+	if user:
+		conds += " AND r.agent = %(user)s"
+		params["user"] = user
+
+	result = frappe.db.sql(
+		f"""
+		SELECT
+			IFNULL(u.full_name, r.agent) AS agent,
+			SUM(r.incoming_calls + r.outgoing_calls) AS calls,
+			ROUND(SUM(r.talk_time) / 60) AS talk_time,
+			ROUND(SUM(r.missed_calls) * 100 / NULLIF(SUM(r.incoming_calls), 0), 1) AS missed_call_rate
+		FROM `tabCRM Call Rollup` AS r
+		LEFT JOIN `tabUser` AS u ON u.name = r.agent
+		WHERE r.date BETWEEN %(from)s AND %(to)s
+			AND r.agent != ''
+			{conds}
+		GROUP BY r.agent, u.full_name
+		ORDER BY calls DESC
+		""",
+		params,
+		as_dict=True,
+	)
+
+	for row in result:
+		row.missed_call_rate = row.missed_call_rate or 0
+
+	return {
+		"data": result or [],
+		"title": _("Calls by agent"),
+		"subtitle": _("Number of calls and talk time (minutes) per agent"),
+		"xAxis": {
+			"title": _("Agent"),
+			"key": "agent",
+			"type": "category",
+		},
+		"yAxis": {
+			"title": _("Number of calls"),
+		},
+		"y2Axis": {
+			"title": _("Talk time (min)"),
+		},
+		"series": [
+			{"name": "calls", "type": "bar"},
+			{"name": "talk_time", "type": "line", "showDataPoints": True, "axis": "y2"},
+		],
+	}
+
+
 def get_base_currency_symbol():
 	"""
 	Get the base currency symbol from the system settings.
@@ -1149,10 +1372,68 @@ def get_base_currency_symbol():
 	return frappe.db.get_value("Currency", base_currency, "symbol") or ""
 
 
+def get_deal_status_params():
+	"""
+	Won, lost and closed (won or lost) deal statuses as query parameters, read from the
+	status catalog so the queries do not have to join `tabCRM Deal Status`.
+	"""
+	return {
+		"won_statuses": get_statuses_of_type("CRM Deal", "Won"),
+		"lost_statuses": get_statuses_of_type("CRM Deal", "Lost"),
+		"closed_statuses": get_statuses_of_type("CRM Deal", "Won", "Lost"),
+	}
+
+
+def get_call_rollup_totals(from_date, to_date, user=""):
+	"""
+	Call rollup totals of the period and of the period of the same length before it, read
+	from `tabCRM Call Rollup` instead of the call logs.
+	"""
+	diff = frappe.utils.date_diff(to_date, from_date)
+	if diff == 0:
+		diff = 1
+
+	conds = ""
+	params = {
+		"from_date": from_date,
+		"to_date": to_date,
+		"prev_from_date": frappe.utils.add_days(from_date, -diff),
+	}
+
+	if user:
+		conds += " AND agent = %(user)s"
+		params["user"] = user
+
+	result = frappe.db.sql(
+		f"""
+		SELECT
+			CASE WHEN date >= %(from_date)s THEN 'current' ELSE 'previous' END AS period,
+			SUM(incoming_calls) AS incoming_calls,
+			SUM(outgoing_calls) AS outgoing_calls,
+			SUM(answered_calls) AS answered_calls,
+			SUM(missed_calls) AS missed_calls,
+			SUM(talk_time) AS talk_time,
+			SUM(lead_responses) AS lead_responses,
+			SUM(lead_response_time) AS lead_response_time
+		FROM `tabCRM Call Rollup`
+		WHERE date >= %(prev_from_date)s AND date <= %(to_date)s
+			{conds}
+		GROUP BY period
+		""",
+		params,
+		as_dict=True,
+	)
+
+	totals = {period: frappe._dict(dict.fromkeys(ROLLUP_FIELDS, 0)) for period in ("current", "previous")}
+	for row in result:
+		totals[row.period].update({field: flt(row.get(field)) for field in ROLLUP_FIELDS})
+	return totals
+
+
 def get_deal_status_change_counts(from_date, to_date, deal_conds="", filters=None):
 	"""
 	Get count of each status change (to) for each deal, excluding deals with current status type 'Lost'.
-	Order results by status position.
+	Order results by status position, statuses come from the cached status catalog.
 	Returns:
 	[
 	  {"status": "Qualification", "count": 120},
@@ -1164,6 +1445,7 @@ def get_deal_status_change_counts(from_date, to_date, deal_conds="", filters=Non
 	params.setdefault("from", from_date)
 	params.setdefault("to", to_date)
 
+	params.update(get_deal_status_params())
 	result = frappe.db.sql(
 		f"""
 		SELECT
@@ -1173,22 +1455,19 @@ def get_deal_status_change_counts(from_date, to_date, deal_conds="", filters=Non
 			`tabCRM Status Change Log` scl
 		JOIN
 			`tabCRM Deal` d ON scl.parent = d.name
-		JOIN
-			`tabCRM Deal Status` s ON d.status = s.name
-		JOIN
-			`tabCRM Deal Status` st ON scl.to = st.name
 		WHERE
 			scl.to IS NOT NULL
 			AND scl.to != ''
-			AND s.type != 'Lost'
+			AND d.status NOT IN %(lost_statuses)s
 			AND DATE(d.creation) BETWEEN %(from)s AND %(to)s
 			{deal_conds}
 		GROUP BY
-			scl.to, st.position
-		ORDER BY
-			st.position ASC
+			scl.to
 		""",
 		params,
 		as_dict=True,
 	)
-	return result or []
+
+	statuses = get_status_catalog("CRM Deal Status")
+	result = [row for row in result if row.stage in statuses]
+	return sorted(result, key=lambda row: statuses[row.stage]["position"] or 0)
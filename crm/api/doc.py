@@ -1,17 +1,18 @@
+import hashlib
 import json
 
 import frappe
 from frappe import _
-from frappe.custom.doctype.property_setter.property_setter import make_property_setter
 from frappe.desk.form.assign_to import set_status
-from frappe.model import no_value_fields
+from frappe.model import default_fields, no_value_fields, optional_fields
 from frappe.model.document import get_controller
-from frappe.utils import make_filter_tuple
+from frappe.utils import cint, make_filter_tuple, now
 from pypika import Criterion
 
 from crm.api.views import get_views
 from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
-from crm.utils import get_dynamic_linked_docs, get_linked_docs, is_frappe_version
+from crm.fcrm.doctype.crm_view_settings.crm_view_settings import remove_duplicates
+from crm.utils import get_bulk_linked_docs, get_dynamic_linked_docs, get_linked_docs, is_frappe_version
 
 COUNT_NAME = (
 	{"COUNT": "name", "as": "total_count"}
@@ -19,6 +20,15 @@ COUNT_NAME = (
 	else "count(name) as total_count"
 )
 
+LINKED_DOCS_BATCH_SIZE = 500
+
+LIST_TOTALS_CACHE_KEY = "crm_list_totals"
+LIST_VERSIONS_CACHE_KEY = "crm_list_versions"
+# totals also change without a document event, e.g. when a record is shared or assigned
+LIST_TOTALS_TTL = 60
+AGGREGATE_FUNCTIONS = ("sum", "avg", "min", "max")
+AGGREGATE_FIELDTYPES = ("Currency", "Float", "Int", "Percent", "Duration")
+
 
 @frappe.whitelist()
 def sort_options(doctype: str):
@@ -241,13 +251,9 @@ def update_quick_filters(quick_filters: str, old_filters: str, doctype: str):
 	# update or create global quick filter settings
 	create_update_global_settings(doctype, quick_filters)
 
-	# remove old filters
-	for filter in removed_filters:
-		update_in_standard_filter(filter, doctype, 0)
-
-	# add new filters
-	for filter in new_filters:
-		update_in_standard_filter(filter, doctype, 1)
+	# remove old filters and add new ones
+	values = {**dict.fromkeys(removed_filters, 0), **dict.fromkeys(new_filters, 1)}
+	update_in_standard_filters(doctype, values)
 
 
 def create_update_global_settings(doctype, quick_filters):
@@ -262,21 +268,70 @@ def create_update_global_settings(doctype, quick_filters):
 		doc.insert()
 
 
-def update_in_standard_filter(fieldname, doctype, value):
-	if property_name := frappe.db.exists(
+def update_in_standard_filters(doctype, values: dict):
+	"""
+	Set `in_standard_filter` of several fields of `doctype`, `{fieldname: 0 | 1}`, with one write
+	per value and a single meta cache clear instead of one per property setter.
+	"""
+	if not values:
+		return
+
+	existing = frappe.get_all(
 		"Property Setter",
-		{"doc_type": doctype, "field_name": fieldname, "property": "in_standard_filter"},
-	):
-		frappe.db.set_value("Property Setter", property_name, "value", value)
-	else:
-		make_property_setter(
-			doctype,
-			fieldname,
-			"in_standard_filter",
-			value,
-			"Check",
-			validate_fields_for_doctype=False,
-		)
+		filters={"doc_type": doctype, "property": "in_standard_filter", "field_name": ("in", list(values))},
+		fields=["name", "field_name"],
+	)
+	existing = {row.field_name: row.name for row in existing}
+
+	timestamp = now()
+	PropertySetter = frappe.qb.DocType("Property Setter")
+	for value in (0, 1):
+		names = [existing[field] for field, v in values.items() if v == value and field in existing]
+		if names:
+			(
+				frappe.qb.update(PropertySetter)
+				.set(PropertySetter.value, value)
+				.set(PropertySetter.modified, timestamp)
+				.where(PropertySetter.name.isin(names))
+			).run()
+
+	frappe.db.bulk_insert(
+		"Property Setter",
+		[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"doctype_or_field",
+			"doc_type",
+			"field_name",
+			"property",
+			"property_type",
+			"value",
+			"is_system_generated",
+		],
+		[
+			(
+				f"{doctype}-{field}-in_standard_filter",
+				timestamp,
+				timestamp,
+				frappe.session.user,
+				frappe.session.user,
+				"DocField",
+				doctype,
+				field,
+				"in_standard_filter",
+				"Check",
+				value,
+				1,
+			)
+			for field, value in values.items()
+			if field not in existing
+		],
+	)
+
+	frappe.clear_cache(doctype=doctype)
 
 
 @frappe.whitelist()
@@ -294,9 +349,10 @@ def get_data(
 	kanban_fields=None,
 	view=None,
 	default_filters=None,
+	aggregates=None,
 ):
 	custom_view = False
-	filters = frappe._dict(filters)
+	filters = resolve_list_filters(filters, default_filters)
 	rows = frappe.parse_json(rows or "[]")
 	columns = frappe.parse_json(columns or "[]")
 	kanban_fields = frappe.parse_json(kanban_fields or "[]")
@@ -306,24 +362,9 @@ def get_data(
 	view_type = view.get("view_type") if view else None
 	group_by_field = view.get("group_by_field") if view else None
 
-	for key in filters:
-		value = filters[key]
-		if isinstance(value, list):
-			if "@me" in value:
-				value[value.index("@me")] = frappe.session.user
-			elif "%@me%" in value:
-				index = [i for i, v in enumerate(value) if v == "%@me%"]
-				for i in index:
-					value[i] = "%" + frappe.session.user + "%"
-		elif value == "@me":
-			filters[key] = frappe.session.user
-
-	if default_filters:
-		default_filters = frappe.parse_json(default_filters)
-		filters.update(default_filters)
-
 	is_default = True
 	data = []
+	group_counts = {}
 	_list = get_controller(doctype)
 	default_rows = []
 	if hasattr(_list, "default_list_data"):
@@ -381,16 +422,27 @@ def get_data(
 		if group_by_field and group_by_field not in rows:
 			rows.append(group_by_field)
 
-		data = (
-			frappe.get_list(
+		if view_type == "group_by" and group_by_field:
+			data, group_counts = get_group_by_data(
 				doctype,
-				fields=rows,
-				filters=filters,
-				order_by=order_by,
-				page_length=page_length,
+				rows,
+				filters,
+				order_by,
+				group_by_field,
+				page_length,
+				view.get("group_page_lengths"),
+			)
+		else:
+			data = (
+				frappe.get_list(
+					doctype,
+					fields=rows,
+					filters=filters,
+					order_by=order_by,
+					page_length=page_length,
+				)
+				or []
 			)
-			or []
-		)
 		data = parse_list_data(data, doctype)
 
 	if view_type == "kanban":
@@ -509,6 +561,8 @@ def get_data(
 			field["label"] = _(field["label"])
 			fields.append(field)
 
+	totals = get_list_totals(doctype, filters, aggregates)
+
 	if not is_default and custom_view_name:
 		is_default = frappe.db.get_value("CRM View Settings", custom_view_name, "load_default_columns")
 
@@ -518,10 +572,8 @@ def get_data(
 			if type == "Select":
 				return [option for option in options.split("\n")]
 			else:
-				has_empty_values = any([not d.get(group_by_field) for d in data])
-				options = list(set([d.get(group_by_field) for d in data]))
-				options = [u for u in options if u]
-				if has_empty_values:
+				options = [u for u in group_counts if u]
+				if "" in group_counts:
 					options.append("")
 
 				if order_by and group_by_field in order_by:
@@ -544,6 +596,7 @@ def get_data(
 					"fieldname": field.get("fieldname"),
 					"fieldtype": field.get("fieldtype"),
 					"options": get_options(field.get("fieldtype"), field.get("options")),
+					"counts": {str(key): count for key, count in group_counts.items()},
 				}
 
 	return {
@@ -560,7 +613,8 @@ def get_data(
 		"page_length_count": page_length_count,
 		"is_default": is_default,
 		"views": get_views(doctype),
-		"total_count": frappe.get_list(doctype, filters=filters, fields=[COUNT_NAME])[0].total_count,
+		"total_count": totals.total_count,
+		"aggregates": totals.aggregates,
 		"row_count": len(data),
 		"form_script": get_form_script(doctype),
 		"list_script": get_form_script(doctype, "List"),
@@ -568,6 +622,28 @@ def get_data(
 	}
 
 
+def resolve_list_filters(filters, default_filters=None):
+	"""Filters of a list view with `@me` replaced by the current user and the default filters added."""
+	filters = frappe._dict(frappe.parse_json(filters) or {})
+	for key in filters:
+		value = filters[key]
+		if isinstance(value, list):
+			if "@me" in value:
+				value[value.index("@me")] = frappe.session.user
+			elif "%@me%" in value:
+				index = [i for i, v in enumerate(value) if v == "%@me%"]
+				for i in index:
+					value[i] = "%" + frappe.session.user + "%"
+		elif value == "@me":
+			filters[key] = frappe.session.user
+
+	if default_filters:
+		default_filters = frappe.parse_json(default_filters)
+		filters.update(default_filters)
+
+	return filters
+
+
 def parse_list_data(data, doctype):
 	_list = get_controller(doctype)
 	if hasattr(_list, "parse_list_data"):
@@ -613,6 +689,190 @@ def get_records_based_on_order(doctype, rows, filters, page_length, order):
 	return records
 
 
+def get_list_totals(doctype, filters, aggregates=None):
+	"""
+	Count of the records of a list and the requested `aggregates` over them, e.g.
+	`[{"function": "sum", "field": "deal_value"}]`, from one query with the list's filters and
+	permissions. Cached for the current user until a record of `doctype` changes.
+	"""
+	aggregates = get_aggregate_fields(doctype, aggregates)
+	key = json.dumps(
+		[doctype, frappe.session.user, filters, aggregates, get_list_version(doctype)],
+		sort_keys=True,
+		default=str,
+	)
+	return frappe.cache.get_value(
+		f"{LIST_TOTALS_CACHE_KEY}|{hashlib.sha256(key.encode()).hexdigest()}",
+		generator=lambda: query_list_totals(doctype, filters, aggregates),
+		expires_in_sec=LIST_TOTALS_TTL,
+	)
+
+
+def query_list_totals(doctype, filters, aggregates):
+	converted = get_converted_fields(doctype, aggregates)
+	if converted:
+		row = query_converted_list_totals(doctype, filters, aggregates, converted)
+	else:
+		fields = [COUNT_NAME]
+		for function, fieldname in aggregates:
+			alias = f"{function}_{fieldname}"
+			if is_frappe_version("16", above=True):
+				fields.append({function.upper(): fieldname, "as": alias})
+			else:
+				fields.append(f"{function}({fieldname}) as {alias}")
+		row = frappe.get_list(doctype, filters=filters, fields=fields)[0]
+
+	totals = frappe._dict(total_count=row.total_count, aggregates={})
+	for function, fieldname in aggregates:
+		totals.aggregates.setdefault(fieldname, {})[function] = row.get(f"{function}_{fieldname}")
+	return totals
+
+
+def get_converted_fields(doctype, aggregates) -> set[str]:
+	"""Currency fields of records with their own exchange rate, aggregated in the base currency."""
+	meta = frappe.get_meta(doctype)
+	if not meta.has_field("exchange_rate"):
+		return set()
+	return {
+		fieldname for _function, fieldname in aggregates if meta.get_field(fieldname).fieldtype == "Currency"
+	}
+
+
+def query_converted_list_totals(doctype, filters, aggregates, converted):
+	# like the dashboard, amounts are converted with `exchange_rate` before they are added up,
+	# over the list query so its filters and permissions apply
+	fields = remove_duplicates([*(fieldname for _function, fieldname in aggregates), "exchange_rate"])
+	query = frappe.get_list(doctype, fields=fields, filters=filters, run=False)
+
+	columns = ["count(*) as total_count"]
+	for function, fieldname in aggregates:
+		value = f"t.`{fieldname}`"
+		if fieldname in converted:
+			value = f"{value} * ifnull(t.`exchange_rate`, 1)"
+		columns.append(f"{function}({value}) as `{function}_{fieldname}`")
+
+	return frappe.db.sql(f"select {', '.join(columns)} from ({query}) t", as_dict=True)[0]
+
+
+def get_aggregate_fields(doctype, aggregates) -> list[tuple[str, str]]:
+	"""Validated `(function, fieldname)` pairs of the aggregates requested for a list."""
+	meta = frappe.get_meta(doctype)
+	permlevels = meta.get_permlevel_access("read")
+
+	fields = []
+	for aggregate in frappe.parse_json(aggregates) or []:
+		function = (aggregate.get("function") or "").lower()
+		field = meta.get_field(aggregate.get("field"))
+		if (
+			function not in AGGREGATE_FUNCTIONS
+			or not field
+			or field.fieldtype not in AGGREGATE_FIELDTYPES
+			or (field.permlevel and field.permlevel not in permlevels)
+		):
+			frappe.throw(
+				_("Cannot compute {0} of {1}").format(aggregate.get("function"), aggregate.get("field"))
+			)
+		fields.append((function, field.fieldname))
+
+	return remove_duplicates(fields)
+
+
+def get_list_version(doctype):
+	return frappe.cache.hget(LIST_VERSIONS_CACHE_KEY, doctype, generator=frappe.generate_hash)
+
+
+def clear_list_totals(doc, method=None):
+	frappe.cache.hdel(LIST_VERSIONS_CACHE_KEY, doc.doctype)
+
+
+def get_group_by_data(
+	doctype, rows, filters, order_by, group_by_field, page_length=20, group_page_lengths=None
+):
+	"""
+	Rows and counts of a group by view. Every group has its total count from one `GROUP BY`
+	query and its first `page_length` rows, or the number asked for in `group_page_lengths`
+	when the group was paged further, from one window function query, so every group is
+	complete no matter how the other groups are sorted.
+	"""
+	if not is_list_field(doctype, group_by_field):
+		frappe.throw(_("Cannot group by {0}").format(group_by_field))
+
+	page_length = cint(page_length) or 20
+	group_page_lengths = {
+		str(key or ""): cint(value) for key, value in (frappe.parse_json(group_page_lengths) or {}).items()
+	}
+
+	group_counts = {}
+	for row in frappe.get_list(
+		doctype,
+		filters=filters,
+		fields=[group_by_field, COUNT_NAME],
+		group_by=group_by_field,
+		order_by=group_by_field,
+	):
+		key = get_group_key(row.get(group_by_field))
+		group_counts[key] = group_counts.get(key, 0) + row.total_count
+
+	if not group_counts:
+		return [], group_counts
+
+	order_by_fields = get_order_by_fields(doctype, order_by)
+	fields = remove_duplicates([*rows, group_by_field, *(field for field, _direction in order_by_fields)])
+	query = frappe.get_list(doctype, fields=fields, filters=filters, order_by=order_by, run=False)
+	window_order = ", ".join(f"t.`{field}` {direction}" for field, direction in order_by_fields)
+	# the list query comes with its values inlined, so the limit is too rather than passing values
+	limit = cint(max(page_length, *group_page_lengths.values()))
+
+	data = frappe.db.sql(
+		f"""
+		select * from (
+			select t.*, row_number() over (partition by t.`{group_by_field}` order by {window_order})
+				as _group_row
+			from ({query}) t
+		) g
+		where g._group_row <= {limit}
+		order by g._group_row
+		""",
+		as_dict=True,
+	)
+
+	# null and empty values are one group, and groups paged further may have brought extra rows
+	group_rows = {}
+	rows = []
+	for row in data:
+		row.pop("_group_row")
+		key = get_group_key(row.get(group_by_field))
+		group_rows[key] = group_rows.get(key, 0) + 1
+		if group_rows[key] <= group_page_lengths.get(str(key), page_length):
+			rows.append(row)
+
+	return rows, group_counts
+
+
+def get_group_key(value):
+	# the list view shows every falsy value under the one empty group
+	return value or ""
+
+
+def get_order_by_fields(doctype, order_by):
+	"""`(fieldname, direction)` pairs of a list view sort, ignoring anything that is not a field."""
+	fields = []
+	for part in (order_by or "").split(","):
+		fieldname, _sep, direction = part.strip().partition(" ")
+		fieldname = fieldname.split(".")[-1].strip("`")
+		direction = direction.strip().lower() or "asc"
+		if direction not in ("asc", "desc"):
+			continue
+		if is_list_field(doctype, fieldname):
+			fields.append((fieldname, direction))
+
+	return fields or [("modified", "desc")]
+
+
+def is_list_field(doctype, fieldname):
+	return fieldname in (*default_fields, *optional_fields) or frappe.get_meta(doctype).has_field(fieldname)
+
+
 @frappe.whitelist()
 def get_fields_meta(doctype, restricted_fieldtypes=None, as_array=False, only_required=False):
 	not_allowed_fieldtypes = [
@@ -766,35 +1026,53 @@ def get_linked_docs_of_document(doctype, docname):
 	linked_docs.extend(dynamic_linked_docs)
 	linked_docs = list({doc["reference_docname"]: doc for doc in linked_docs}.values())
 
-	docs_data = []
+	references = {}
 	for doc in linked_docs:
 		if not doc.get("reference_doctype") or not doc.get("reference_docname"):
 			continue
+		references.setdefault(doc["reference_doctype"], []).append(doc["reference_docname"])
 
-		try:
-			data = frappe.get_doc(doc["reference_doctype"], doc["reference_docname"])
-		except (frappe.DoesNotExistError, frappe.ValidationError):
-			continue
+	docs_data = []
+	for reference_doctype, names in references.items():
+		for data in get_linked_doc_titles(reference_doctype, names):
+			docs_data.append(
+				{
+					"doc": reference_doctype,
+					"title": data.title or data.name,
+					"reference_docname": data.name,
+					"reference_doctype": reference_doctype,
+				}
+			)
+	return docs_data
 
-		title = data.get("title")
-		if data.doctype == "CRM Call Log":
-			title = f"Call from {data.get('from')} to {data.get('to')}"
 
-		if data.doctype == "CRM Deal":
-			title = data.get("organization")
+def get_linked_doc_titles(doctype, names):
+	"""Fetch only the fields needed to title linked documents, one query per doctype."""
+	title_fields = {
+		"CRM Call Log": ["from", "to"],
+		"CRM Deal": ["organization"],
+		"CRM Notification": ["message"],
+	}
 
-		if data.doctype == "CRM Notification":
-			title = data.get("message")
+	try:
+		meta = frappe.get_meta(doctype)
+	except frappe.DoesNotExistError:
+		frappe.clear_last_message()
+		return []
 
-		docs_data.append(
-			{
-				"doc": data.doctype,
-				"title": title or data.get("name"),
-				"reference_docname": doc["reference_docname"],
-				"reference_doctype": doc["reference_doctype"],
-			}
-		)
-	return docs_data
+	fields = ["name"] + [f for f in title_fields.get(doctype, ["title"]) if meta.has_field(f)]
+	docs = frappe.get_all(doctype, filters={"name": ["in", names]}, fields=fields)
+
+	for data in docs:
+		if doctype == "CRM Call Log":
+			data.title = f"Call from {data.get('from')} to {data.get('to')}"
+		elif doctype == "CRM Deal":
+			data.title = data.get("organization")
+		elif doctype == "CRM Notification":
+			data.title = data.get("message")
+		else:
+			data.title = data.get("title")
+	return docs
 
 
 def remove_doc_link(doctype, docname):
@@ -870,10 +1148,53 @@ def remove_linked_doc_reference(items, remove_contact=None, delete=False):
 	return "success"
 
 
+def clear_doc_links(doctype, names):
+	"""Set-based `remove_doc_link` for many documents of the same doctype."""
+	meta = frappe.get_meta(doctype)
+	reference_fields = (
+		["reference_doctype", "reference_name"]
+		if doctype == "CRM Notification"
+		else ["reference_doctype", "reference_docname"]
+	)
+	if not all(meta.has_field(f) and not meta.get_field(f).reqd for f in reference_fields):
+		for name in names:
+			remove_doc_link(doctype, name)
+		return
+
+	table = frappe.qb.DocType(doctype)
+	if doctype == "CRM Notification":
+		(
+			frappe.qb.update(table)
+			.set(table.notification_type_doctype, "")
+			.set(table.notification_type_doc, "")
+			.where(table.name.isin(names) & (table.notification_type_doctype == table.reference_doctype))
+		).run()
+
+	query = frappe.qb.update(table).set(table.modified, frappe.utils.now())
+	for fieldname in reference_fields:
+		query = query.set(table[fieldname], "")
+	query.where(table.name.isin(names)).run()
+
+
+def unlink_docs(doctype, names, remove_contact=False, delete=False):
+	if remove_contact:
+		for name in names:
+			remove_contact_link(doctype, name)
+	else:
+		clear_doc_links(doctype, names)
+
+	if not delete:
+		return
+
+	for name in names:
+		try:
+			frappe.delete_doc(doctype, name)
+		except (frappe.DoesNotExistError, frappe.ValidationError):
+			continue
+
+
 @frappe.whitelist()
 def delete_bulk_docs(doctype, items, delete_linked=False):
-	from frappe.desk.reportview import delete_bulk
-
 	if not doctype:
 		frappe.throw("Doctype is required")
 
@@ -884,32 +1205,58 @@ def delete_bulk_docs(doctype, items, delete_linked=False):
 	if not isinstance(items, list):
 		frappe.throw("Items must be a list")
 
-	for doc in items:
-		try:
-			if not frappe.db.exists(doctype, doc):
-				frappe.log_error(f"Document {doctype} {doc} does not exist", "Bulk Delete Error")
-				continue
-
-			linked_docs = get_linked_docs_of_document(doctype, doc)
-			for linked_doc in linked_docs:
-				if not linked_doc.get("reference_doctype") or not linked_doc.get("reference_docname"):
-					continue
-
-				remove_linked_doc_reference(
-					[
-						{
-							"doctype": linked_doc["reference_doctype"],
-							"docname": linked_doc["reference_docname"],
-						}
-					],
-					remove_contact=doctype == "Contact",
-					delete=delete_linked,
-				)
-		except Exception as e:
-			frappe.log_error(f"Error processing linked docs for {doctype} {doc}: {e!s}", "Bulk Delete Error")
-
 	if len(items) > 10:
-		frappe.enqueue("frappe.desk.reportview.delete_bulk", doctype=doctype, items=items)
+		frappe.enqueue(
+			"crm.api.doc.delete_docs_with_linked_docs",
+			doctype=doctype,
+			items=items,
+			delete_linked=delete_linked,
+			queue="long",
+		)
 	else:
-		delete_bulk(doctype, items)
+		delete_docs_with_linked_docs(doctype, items, delete_linked)
 	return "success"
+
+
+def delete_docs_with_linked_docs(doctype, items, delete_linked=False):
+	"""
+	Unlink (or delete) everything referencing `items` and then delete `items`.
+
+	Linked documents are discovered for all items together with `get_bulk_linked_docs`
+	and processed per referencing doctype in batches, reporting progress as it goes.
+	"""
+	from frappe.desk.reportview import delete_bulk
+	from frappe.utils import create_batch
+
+	existing = set(frappe.get_all(doctype, filters={"name": ["in", items]}, pluck="name"))
+	for doc in items:
+		if doc not in existing:
+			frappe.log_error(f"Document {doctype} {doc} does not exist", "Bulk Delete Error")
+	items = [doc for doc in items if doc in existing]
+
+	linked_docs = {}
+	for linked_doc in get_bulk_linked_docs(doctype, items):
+		linked_docs.setdefault(linked_doc["reference_doctype"], set()).add(linked_doc["reference_docname"])
+
+	total = sum(len(names) for names in linked_docs.values())
+	done = 0
+	for reference_doctype, names in linked_docs.items():
+		for batch in create_batch(sorted(names), LINKED_DOCS_BATCH_SIZE):
+			try:
+				unlink_docs(
+					reference_doctype, batch, remove_contact=doctype == "Contact", delete=delete_linked
+				)
+			except Exception as e:
+				frappe.log_error(
+					f"Error processing linked {reference_doctype} docs for {doctype}: {e!s}",
+					"Bulk Delete Error",
+				)
+
+			done += len(batch)
+			frappe.publish_progress(
+				done * 100 / total,
+				title=_("Removing linked documents"),
+				description=_("{0} of {1}").format(done, total),
+			)
+
+	delete_bulk(doctype, items)
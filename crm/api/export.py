@@ -0,0 +1,197 @@
+"""
+List view exports.
+
+An export runs as a background job that streams the rows of a list view, with the view's
+filters, sort and columns, from an unbuffered cursor into a CSV or Excel file, so memory
+stays flat however many records are exported. Progress and, once the file is written, its
+download link are sent to the user as `crm_export` realtime events. Exported files are
+deleted by a daily job once they are a day old.
+"""
+
+import csv
+import json
+import os
+import re
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, cstr, now_datetime, scrub
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from crm.api.doc import COUNT_NAME, is_list_field, resolve_list_filters
+
+EXPORT_FORMATS = {"CSV": "csv", "Excel": "xlsx"}
+# progress is published every this many rows
+EXPORT_PROGRESS_ROWS = 5000
+# fields that hold a JSON list of users, exported as a comma separated list
+USER_LIST_FIELDS = ("_assign", "_liked_by")
+EXPORT_FILE_PREFIX = "crm-export-"
+EXPORT_RETENTION_DAYS = 1
+# ids picked by the client, used in the file name and job id
+EXPORT_ID_PATTERN = re.compile(r"[a-z0-9]{1,20}")
+
+
+@frappe.whitelist()
+def export_list(
+	doctype: str,
+	columns,
+	filters=None,
+	order_by: str | None = None,
+	default_filters=None,
+	file_format: str = "Excel",
+	selected_items=None,
+	page_length: int | None = None,
+	export_id: str | None = None,
+):
+	"""
+	Start exporting a list view, returns the id its `crm_export` events are sent with.
+
+	Only the first `page_length` records are exported when it is set, e.g. the rows loaded
+	in the view, otherwise every record matching the filters. The client can pass the
+	`export_id` so it knows the id before a quick export publishes its events.
+	"""
+	if export_id and not EXPORT_ID_PATTERN.fullmatch(export_id):
+		frappe.throw(_("Invalid export id"))
+
+	frappe.has_permission(doctype, "export", throw=True)
+	if file_format not in EXPORT_FORMATS:
+		frappe.throw(_("Cannot export to {0}").format(file_format))
+
+	columns = [
+		{"key": column.get("key"), "label": _(column.get("label") or column.get("key"))}
+		for column in frappe.parse_json(columns) or []
+	]
+	for column in columns:
+		if not is_list_field(doctype, column["key"]):
+			frappe.throw(_("Cannot export {0} of {1}").format(column["key"], _(doctype)))
+	if not columns:
+		frappe.throw(_("Select at least one column to export"))
+
+	filters = resolve_list_filters(filters, default_filters)
+	if selected_items := frappe.parse_json(selected_items):
+		filters["name"] = ["in", selected_items]
+
+	export_id = export_id or frappe.generate_hash(length=10)
+	frappe.enqueue(
+		"crm.api.export.build_export",
+		export_id=export_id,
+		doctype=doctype,
+		columns=columns,
+		filters=filters,
+		order_by=order_by,
+		file_format=file_format,
+		page_length=cint(page_length) or None,
+		queue="long",
+		timeout=60 * 60,
+		job_id=f"crm_export::{export_id}",
+	)
+	return export_id
+
+
+def build_export(export_id, doctype, columns, filters, order_by=None, file_format="Excel", page_length=None):
+	fields = [column["key"] for column in columns]
+	total = frappe.get_list(doctype, filters=filters, fields=[COUNT_NAME])[0].total_count
+	if page_length:
+		total = min(total, page_length)
+	query = frappe.get_list(
+		doctype, fields=fields, filters=filters, order_by=order_by, limit=page_length or None, run=False
+	)
+
+	file_name = f"{EXPORT_FILE_PREFIX}{scrub(doctype)}-{export_id}.{EXPORT_FORMATS[file_format]}"
+	path = frappe.get_site_path("private", "files", file_name)
+	writer = (ExcelWriter if file_format == "Excel" else CSVWriter)(path, _(doctype))
+
+	try:
+		writer.write([column["label"] for column in columns])
+		# the cursor can't be shared while rows are streamed, so nothing else queries until it is done
+		with frappe.db.unbuffered_cursor():
+			for done, row in enumerate(frappe.db.sql(query, as_iterator=True), 1):
+				writer.write(format_row(fields, row))
+				if done % EXPORT_PROGRESS_ROWS == 0:
+					publish_export_event(export_id, "progress", percent=min(done * 100 / (total or 1), 99))
+		writer.close()
+	except Exception:
+		frappe.log_error(f"Export of {doctype} failed", reference_doctype=doctype)
+		publish_export_event(export_id, "failed")
+		writer.abort()
+		if os.path.exists(path):
+			os.remove(path)
+		return
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+		}
+	).insert(ignore_permissions=True)
+	publish_export_event(export_id, "done", percent=100, file_url=file.file_url)
+
+
+def format_row(fields, row):
+	values = []
+	for fieldname, value in zip(fields, row, strict=False):
+		if fieldname in USER_LIST_FIELDS and value:
+			try:
+				value = ", ".join(json.loads(value))
+			except (TypeError, ValueError):
+				pass
+		values.append(value)
+	return values
+
+
+def publish_export_event(export_id, status, **data):
+	frappe.publish_realtime(
+		"crm_export", {"export_id": export_id, "status": status, **data}, user=frappe.session.user
+	)
+
+
+def delete_old_exports():
+	"""Delete exported files older than a day, they are downloaded as soon as they are written."""
+	for name in frappe.get_all(
+		"File",
+		filters={
+			"file_name": ["like", f"{EXPORT_FILE_PREFIX}%"],
+			"is_private": 1,
+			"creation": ["<", add_days(now_datetime(), -EXPORT_RETENTION_DAYS)],
+		},
+		pluck="name",
+	):
+		frappe.delete_doc("File", name, ignore_permissions=True)
+
+
+class CSVWriter:
+	def __init__(self, path, title=None):
+		self.file = open(path, "w", encoding="utf-8", newline="")
+		self.writer = csv.writer(self.file)
+
+	def write(self, row):
+		self.writer.writerow(["" if value is None else cstr(value) for value in row])
+
+	def close(self):
+		self.file.close()
+
+	def abort(self):
+		self.file.close()
+
+
+class ExcelWriter:
+	"""Write-only workbook, rows are flushed to a temporary file as they are added."""
+
+	def __init__(self, path, title=None):
+		self.path = path
+		self.workbook = Workbook(write_only=True)
+		# sheet titles are limited to 31 characters
+		self.sheet = self.workbook.create_sheet((title or "Sheet1")[:31])
+
+	def write(self, row):
+		self.sheet.append([ILLEGAL_CHARACTERS_RE.sub("", v) if isinstance(v, str) else v for v in row])
+
+	def close(self):
+		self.workbook.save(self.path)
+
+	def abort(self):
+		# drops the temporary files rows were flushed to, nothing was written to `path` yet
+		self.workbook.close()
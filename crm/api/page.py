@@ -0,0 +1,106 @@
+import frappe
+from frappe import _
+
+from crm.api.activities import get_deal_activities, get_lead_activities
+from crm.api.doc import get_assigned_users, get_linked_docs_of_document
+from crm.api.whatsapp import get_whatsapp_messages, is_whatsapp_enabled
+from crm.fcrm.doctype.crm_deal.api import get_deal_contacts
+from crm.fcrm.doctype.crm_fields_layout.crm_fields_layout import get_fields_layout, get_sidepanel_sections
+from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
+
+PAGE_DOCTYPES = ("CRM Lead", "CRM Deal")
+DEFAULT_LAYOUT_TYPES = ("Side Panel", "Data Fields")
+
+
+class PageContext:
+	"""Everything sections of one page load share: the document, read once and permission
+	checked once, and the owner field used for default assignees."""
+
+	def __init__(self, doctype: str, name: str, layout_types=None):
+		self.doctype = doctype
+		self.name = name
+		self.layout_types = layout_types or DEFAULT_LAYOUT_TYPES
+		self.doc = frappe.get_doc(doctype, name)
+		self.doc.check_permission("read")
+
+	@property
+	def owner_field(self):
+		return "lead_owner" if self.doctype == "CRM Lead" else "deal_owner"
+
+
+def get_doc_section(context: PageContext):
+	context.doc.apply_fieldlevel_read_permissions()
+	return context.doc.as_dict()
+
+
+def get_activities_section(context: PageContext):
+	if context.doctype == "CRM Deal":
+		return get_deal_activities(context.name)
+	return get_lead_activities(context.name)
+
+
+def get_whatsapp_section(context: PageContext):
+	if not is_whatsapp_enabled():
+		return []
+	return get_whatsapp_messages(context.doctype, context.name)
+
+
+def get_contacts_section(context: PageContext):
+	if context.doctype != "CRM Deal":
+		return []
+	return get_deal_contacts(context.name)
+
+
+PAGE_SECTIONS = {
+	"doc": get_doc_section,
+	"fields_layouts": lambda context: {
+		layout_type: get_fields_layout(context.doctype, layout_type) for layout_type in context.layout_types
+	},
+	"sidepanel_sections": lambda context: get_sidepanel_sections(context.doctype),
+	"activities": get_activities_section,
+	"whatsapp_messages": get_whatsapp_section,
+	"linked_docs": lambda context: get_linked_docs_of_document(context.doctype, context.name),
+	"form_script": lambda context: get_form_script(context.doctype),
+	"assigned_users": lambda context: get_assigned_users(
+		context.doctype, context.name, context.doc.get(context.owner_field)
+	),
+	"contacts": get_contacts_section,
+}
+
+
+@frappe.whitelist()
+def get_page_data(doctype: str, name: str, sections=None, layout_types=None):
+	"""
+	Load a lead or deal page in one request.
+
+	The document is read and permission checked once and meta is shared by every
+	section, instead of each section being its own request with its own session and
+	permission overhead.
+
+	:param doctype: `CRM Lead` or `CRM Deal`
+	:param name: Name of the lead or deal
+	:param sections: List of sections to return, all of `PAGE_SECTIONS` by default
+	:param layout_types: Field layout types returned in `fields_layouts`
+	:return: `{section: data}`, sections that failed are left out and their error
+	        message is returned under `errors`
+	"""
+	if doctype not in PAGE_DOCTYPES:
+		frappe.throw(_("Page data is only available for leads and deals"))
+
+	sections = frappe.parse_json(sections) if sections else list(PAGE_SECTIONS)
+	unknown = [section for section in sections if section not in PAGE_SECTIONS]
+	if unknown:
+		frappe.throw(_("Unknown page sections: {0}").format(", ".join(unknown)))
+
+	context = PageContext(doctype, name, frappe.parse_json(layout_types) if layout_types else None)
+
+	data = {"errors": {}}
+	for section in sections:
+		try:
+			data[section] = PAGE_SECTIONS[section](context)
+		except Exception as e:
+			# one broken section should not keep the rest of the page from loading
+			frappe.clear_last_message()
+			data["errors"][section] = str(e)
+
+	return data
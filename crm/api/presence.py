@@ -0,0 +1,137 @@
+"""
+Presence of CRM users.
+
+The desk sends a heartbeat every `HEARTBEAT_INTERVAL` seconds (and whenever its state
+changes) with whether the user is active, idle or on a call and whether their
+softphone is connected. Every heartbeat is kept in Redis under its own key that
+expires after `PRESENCE_TTL`, so a user whose tab is closed goes offline without any
+cleanup, and looking up a user (or a whole list of users) is a single Redis call.
+
+Calls reported by the telephony providers, which the desk does not see when they are
+taken on a phone, keep the agent busy until the call ends whatever their heartbeats say.
+"""
+
+import json
+import time
+
+import frappe
+from frappe import _
+
+PRESENCE_CACHE_KEY = "crm_presence"
+CALL_PRESENCE_CACHE_KEY = "crm_presence_call"
+HEARTBEAT_INTERVAL = 30
+# a user without a heartbeat for this many seconds is offline
+PRESENCE_TTL = 3 * HEARTBEAT_INTERVAL
+PRESENCE_STATUSES = ("online", "busy", "idle")
+# statuses in which a user can be routed a call or assigned a chat
+AVAILABLE_STATUSES = ("online", "idle")
+# a call whose final event never arrives stops keeping its agent busy after this many seconds
+CALL_PRESENCE_TTL = 4 * 60 * 60
+
+
+@frappe.whitelist()
+def heartbeat(status: str = "online", softphone: bool = False):
+	"""Record that the session user is `status` and whether their softphone is connected."""
+	if frappe.session.user == "Guest":
+		frappe.throw(_("Not permitted"), frappe.PermissionError)
+	if status not in PRESENCE_STATUSES:
+		frappe.throw(_("Invalid presence status {0}").format(status))
+
+	if status != "busy" and is_on_call(frappe.session.user):
+		# the desk only knows about softphone calls
+		status = "busy"
+
+	set_presence(frappe.session.user, status, softphone=bool(frappe.parse_json(softphone)))
+	return {"interval": HEARTBEAT_INTERVAL}
+
+
+@frappe.whitelist()
+def get_presence(users=None) -> dict:
+	"""
+	Presence of `users`, or of every enabled user if not given.
+
+	:return: `{user: {"status", "softphone", "last_seen"}}`, with status `offline` for users
+	        without a recent heartbeat
+	"""
+	from crm.api.session import get_session_role_flags, get_user_directory
+
+	get_session_role_flags()
+	users = frappe.parse_json(users) if users else [user["name"] for user in get_user_directory()]
+	return get_users_presence(users)
+
+
+def set_presence(user: str, status: str, softphone: bool | None = None):
+	if softphone is None:
+		softphone = get_user_presence(user)["softphone"]
+
+	presence = {"status": status, "softphone": softphone, "last_seen": time.time()}
+	frappe.cache.set(get_presence_key(user), json.dumps(presence), ex=PRESENCE_TTL)
+
+
+def clear_presence(user: str):
+	frappe.cache.delete(get_presence_key(user), get_call_presence_key(user))
+
+
+def get_user_presence(user: str) -> dict:
+	return get_users_presence([user])[user]
+
+
+def get_users_presence(users: list) -> dict:
+	users = list(dict.fromkeys(users))
+	if not users:
+		return {}
+
+	values = frappe.cache.mget([get_presence_key(user) for user in users])
+	return {user: parse_presence(value) for user, value in zip(users, values, strict=True)}
+
+
+def parse_presence(value) -> dict:
+	if not value:
+		return {"status": "offline", "softphone": False, "last_seen": None}
+	return json.loads(value)
+
+
+def get_presence_key(user: str) -> str:
+	return frappe.cache.make_key(f"{PRESENCE_CACHE_KEY}|{user}")
+
+
+def get_call_presence_key(user: str) -> str:
+	return frappe.cache.make_key(f"{CALL_PRESENCE_CACHE_KEY}|{user}")
+
+
+def is_on_call(user: str) -> bool:
+	return bool(frappe.cache.get(get_call_presence_key(user)))
+
+
+def get_available_users(users: list, softphone: bool = False) -> list:
+	"""Users of `users` that are online or idle, not on a call, and (optionally) have their
+	softphone connected."""
+	presence = get_users_presence(users)
+	return [
+		user
+		for user in presence
+		if presence[user]["status"] in AVAILABLE_STATUSES and (not softphone or presence[user]["softphone"])
+	]
+
+
+def set_call_presence(user: str | None, on_call: bool):
+	"""Mark a user who is present as busy while on a call, and online again after it."""
+	if not user:
+		return
+
+	if on_call:
+		frappe.cache.set(get_call_presence_key(user), 1, ex=CALL_PRESENCE_TTL)
+	else:
+		frappe.cache.delete(get_call_presence_key(user))
+
+	status = get_user_presence(user)["status"]
+	if status == "offline":
+		return
+	if on_call and status != "busy":
+		set_presence(user, "busy")
+	elif not on_call and status == "busy":
+		set_presence(user, "online")
+
+
+def on_logout(login_manager):
+	clear_presence(login_manager.user)
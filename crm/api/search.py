@@ -0,0 +1,41 @@
+import frappe
+from frappe import _
+
+from crm.utils.search_index import SEARCH_INDEX_FIELDS, search_index
+
+
+@frappe.whitelist()
+def search(txt: str, doctypes=None, limit: int = 10):
+	"""
+	Typeahead search over contacts, leads and organizations.
+
+	:param txt: Text typed so far, every word must prefix-match the result
+	:param doctypes: Doctypes to search, all indexed doctypes by default
+	:param limit: Number of results to return
+	:return: Ranked `{doctype, name, title, description}` the user can read
+	"""
+	doctypes = frappe.parse_json(doctypes) if doctypes else list(SEARCH_INDEX_FIELDS)
+	if isinstance(doctypes, str):
+		doctypes = [doctypes]
+	invalid = [doctype for doctype in doctypes if doctype not in SEARCH_INDEX_FIELDS]
+	if invalid:
+		frappe.throw(_("Search is not available for {0}").format(", ".join(invalid)))
+
+	limit = min(frappe.utils.cint(limit) or 10, 50)
+	# rank a few more than needed, some may be filtered out by permissions
+	results = search_index(txt or "", doctypes, limit * 3)
+	return filter_permitted(results)[:limit]
+
+
+def filter_permitted(results: list[dict]) -> list[dict]:
+	"""Keep results the user can read, checked with one `get_list` per doctype."""
+	names = {}
+	for result in results:
+		names.setdefault(result["doctype"], []).append(result["name"])
+
+	permitted = set()
+	for doctype, doc_names in names.items():
+		for name in frappe.get_list(doctype, filters={"name": ["in", doc_names]}, pluck="name"):
+			permitted.add((doctype, name))
+
+	return [result for result in results if (result["doctype"], result["name"]) in permitted]
@@ -1,7 +1,11 @@
 import frappe
 from frappe import _
 
+from crm.api.presence import get_users_presence
+
 CRM_ALLOWED_ROLES = ["System Manager", "Sales Manager", "Sales User"]
+USER_DIRECTORY_CACHE_KEY = "crm_user_directory"
+CRM_USER_DIRECTORY_CACHE_KEY = "crm_user_directory::crm_only"
 
 
 def get_session_role_flags():
@@ -20,59 +24,101 @@ def get_session_role_flags():
 
 
 @frappe.whitelist()
-def get_users():
+def get_users(crm_only: bool = False):
 	session_roles = get_session_role_flags()
+	crm_only = frappe.parse_json(crm_only)
 
-	users = frappe.qb.get_query(
-		"User",
-		fields=[
-			"name",
-			"email",
-			"enabled",
-			"user_image",
-			"first_name",
-			"last_name",
-			"full_name",
-			"user_type",
-		],
-		order_by="full_name asc",
-		distinct=True,
-		filters={"enabled": 1},
-	).run(as_dict=1)
-
-	crm_users = []
-
+	users = [frappe._dict(user) for user in get_user_directory(crm_only)]
+	presence = get_users_presence([user.name for user in users])
 	for user in users:
 		if frappe.session.user == user.name:
 			user.session_user = True
+		user.presence = presence[user.name]["status"]
 
-		user.roles = frappe.get_roles(user.name)
-
-		user.role = ""
-
-		if "System Manager" in user.roles:
-			user.role = "System Manager"
-		elif "Sales Manager" in user.roles:
-			user.role = "Sales Manager"
-		elif "Sales User" in user.roles:
-			user.role = "Sales User"
-		elif "Guest" in user.roles:
-			user.role = "Guest"
-
-		if frappe.session.user == user.name:
-			user.session_user = True
-
-		user.is_telephony_agent = frappe.db.exists("CRM Telephony Agent", {"user": user.name})
+	crm_users = [user for user in users if user.role in CRM_ALLOWED_ROLES]
 
-		if user.role in ("System Manager", "Sales Manager", "Sales User"):
-			crm_users.append(user)
-
-	if not session_roles["is_system_manager"]:
+	if crm_only or not session_roles["is_system_manager"]:
 		users = crm_users
 
 	return users, crm_users
 
 
+def get_user_directory(crm_only: bool = False) -> list[dict]:
+	"""Enabled users with their roles and telephony flag, cached per site until a user or
+	telephony agent changes."""
+	key = CRM_USER_DIRECTORY_CACHE_KEY if crm_only else USER_DIRECTORY_CACHE_KEY
+	return frappe.cache.get_value(key, generator=lambda: build_user_directory(crm_only))
+
+
+def build_user_directory(crm_only: bool = False) -> list[dict]:
+	User = frappe.qb.DocType("User")
+	HasRole = frappe.qb.DocType("Has Role")
+	TelephonyAgent = frappe.qb.DocType("CRM Telephony Agent")
+
+	query = (
+		frappe.qb.from_(User)
+		.left_join(HasRole)
+		.on((HasRole.parent == User.name) & (HasRole.parenttype == "User"))
+		.left_join(TelephonyAgent)
+		.on(TelephonyAgent.user == User.name)
+		.select(
+			User.name,
+			User.email,
+			User.enabled,
+			User.user_image,
+			User.first_name,
+			User.last_name,
+			User.full_name,
+			User.user_type,
+			HasRole.role,
+			TelephonyAgent.name.as_("telephony_agent"),
+		)
+		.where(User.enabled == 1)
+		.orderby(User.full_name)
+	)
+
+	if crm_only:
+		crm_role_users = (
+			frappe.qb.from_(HasRole)
+			.select(HasRole.parent)
+			.where((HasRole.parenttype == "User") & HasRole.role.isin(CRM_ALLOWED_ROLES))
+		)
+		query = query.where(
+			(User.name == "Administrator")
+			| ((User.user_type == "System User") & User.name.isin(crm_role_users))
+		)
+
+	users = {}
+	for row in query.run(as_dict=True):
+		role = row.pop("role")
+		telephony_agent = row.pop("telephony_agent")
+
+		user = users.setdefault(row.name, {**row, "roles": ["Guest", "All"], "is_telephony_agent": False})
+		if role and role not in user["roles"]:
+			user["roles"].append(role)
+		if telephony_agent:
+			user["is_telephony_agent"] = True
+
+	for user in users.values():
+		user["role"] = get_crm_role(user["name"], user["roles"])
+
+	return list(users.values())
+
+
+def get_crm_role(user: str, roles: list[str]) -> str:
+	if user == "Administrator" or "System Manager" in roles:
+		return "System Manager"
+	elif "Sales Manager" in roles:
+		return "Sales Manager"
+	elif "Sales User" in roles:
+		return "Sales User"
+	return "Guest"
+
+
+def clear_user_directory_cache(doc=None, method=None):
+	frappe.cache.delete_value([USER_DIRECTORY_CACHE_KEY, CRM_USER_DIRECTORY_CACHE_KEY])
+
+
 @frappe.whitelist()
 def get_organizations():
 	get_session_role_flags()
@@ -1,7 +1,9 @@
 import frappe
 from frappe import _
 
-from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
+from crm.fcrm.doctype.crm_notification.crm_notification import notify_users
+from crm.overrides.assignment_rule import CRM_ASSIGNMENT_DOCTYPES, clear_assignment_load
+from crm.utils.side_effects import defer_batched_side_effect
 
 
 def after_insert(doc, method):
@@ -14,10 +16,18 @@ def after_insert(doc, method):
 			)
 
 	if doc.reference_type in ["CRM Lead", "CRM Deal", "CRM Task"] and doc.reference_name and doc.allocated_to:
-		notify_assigned_user(doc)
+		defer_batched_side_effect("crm.api.todo.notify_assigned_users", {"todo": doc.name})
 
 
 def on_update(doc, method):
+	if (
+		doc.reference_type in CRM_ASSIGNMENT_DOCTYPES
+		and doc.get_doc_before_save()
+		and (doc.has_value_changed("status") or doc.has_value_changed("allocated_to"))
+	):
+		# open assignment counts used for load balancing are stale now
+		clear_assignment_load(doc.reference_type)
+
 	if (
 		doc.has_value_changed("status")
 		and doc.status == "Cancelled"
@@ -25,37 +35,75 @@ def on_update(doc, method):
 		and doc.reference_name
 		and doc.allocated_to
 	):
-		notify_assigned_user(doc, is_cancelled=True)
+		defer_batched_side_effect(
+			"crm.api.todo.notify_assigned_users", {"todo": doc.name, "is_cancelled": True}
+		)
+
+
+# fields of the assigned document used in notification texts and redirects
+REFERENCE_FIELDS = {
+	"CRM Lead": ["name", "lead_name"],
+	"CRM Deal": ["name", "organization", "lead_name"],
+	"CRM Task": ["name", "title", "reference_doctype", "reference_docname"],
+}
 
 
 def notify_assigned_user(doc, is_cancelled=False):
-	_doc = frappe.get_doc(doc.reference_type, doc.reference_name)
-	owner = frappe.get_cached_value("User", frappe.session.user, "full_name")
-	notification_text = get_notification_text(owner, doc, _doc, is_cancelled)
+	notify_assigned_users([{"todo": doc.name, "is_cancelled": is_cancelled}])
+
+
+def notify_assigned_users(items: list[dict]):
+	"""
+	Notify assignees of many ToDos at once, e.g. after a bulk assignment. Items are
+	`{"todo": name, "is_cancelled": bool}`. ToDos and their reference documents are read
+	with one query per doctype and all notifications are written together.
+	"""
+	is_cancelled = {item["todo"]: item.get("is_cancelled", False) for item in items}
+	todos = frappe.get_all(
+		"ToDo",
+		filters={"name": ["in", list(is_cancelled)]},
+		fields=["name", "reference_type", "reference_name", "allocated_to"],
+	)
+
+	references = {}
+	for doctype, fields in REFERENCE_FIELDS.items():
+		names = list({todo.reference_name for todo in todos if todo.reference_type == doctype})
+		if names:
+			for row in frappe.get_all(doctype, filters={"name": ["in", names]}, fields=fields):
+				references[(doctype, row.name)] = row
 
-	message = (
-		_("Your assignment on {0} {1} has been removed by {2}").format(
-			doc.reference_type, doc.reference_name, owner
+	owner = frappe.get_cached_value("User", frappe.session.user, "full_name")
+	notifications = []
+	for todo in todos:
+		reference_doc = references.get((todo.reference_type, todo.reference_name))
+		if not reference_doc or not todo.allocated_to:
+			continue
+
+		cancelled = is_cancelled[todo.name]
+		message = (
+			_("Your assignment on {0} {1} has been removed by {2}").format(
+				todo.reference_type, todo.reference_name, owner
+			)
+			if cancelled
+			else _("{0} assigned a {1} {2} to you").format(owner, todo.reference_type, todo.reference_name)
+		)
+		redirect_to_doctype, redirect_to_name = get_redirect_to_doc(todo, reference_doc)
+
+		notifications.append(
+			{
+				"owner": frappe.session.user,
+				"assigned_to": todo.allocated_to,
+				"notification_type": "Assignment",
+				"message": message,
+				"notification_text": get_notification_text(owner, todo, reference_doc, cancelled),
+				"reference_doctype": todo.reference_type,
+				"reference_docname": todo.reference_name,
+				"redirect_to_doctype": redirect_to_doctype,
+				"redirect_to_docname": redirect_to_name,
+			}
 		)
-		if is_cancelled
-		else _("{0} assigned a {1} {2} to you").format(owner, doc.reference_type, doc.reference_name)
-	)
 
-	redirect_to_doctype, redirect_to_name = get_redirect_to_doc(doc)
-
-	notify_user(
-		{
-			"owner": frappe.session.user,
-			"assigned_to": doc.allocated_to,
-			"notification_type": "Assignment",
-			"message": message,
-			"notification_text": notification_text,
-			"reference_doctype": doc.reference_type,
-			"reference_docname": doc.reference_name,
-			"redirect_to_doctype": redirect_to_doctype,
-			"redirect_to_docname": redirect_to_name,
-		}
-	)
+	notify_users(notifications)
 
 
 def get_notification_text(owner, doc, reference_doc, is_cancelled=False):
@@ -113,9 +161,9 @@ def get_notification_text(owner, doc, reference_doc, is_cancelled=False):
         """
 
 
-def get_redirect_to_doc(doc):
+def get_redirect_to_doc(doc, reference_doc=None):
 	if doc.reference_type == "CRM Task":
-		reference_doc = frappe.get_doc(doc.reference_type, doc.reference_name)
+		reference_doc = reference_doc or frappe.get_doc(doc.reference_type, doc.reference_name)
 		return reference_doc.reference_doctype, reference_doc.reference_docname
 
 	return doc.reference_type, doc.reference_name
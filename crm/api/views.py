@@ -1,9 +1,20 @@
 import frappe
 from pypika import Criterion
 
+VIEWS_CACHE_KEY = "crm_views"
+
 
 @frappe.whitelist()
 def get_views(doctype):
+	"""Views of `doctype` the current user can see, cached per user until any view changes."""
+	return frappe.cache.hget(
+		VIEWS_CACHE_KEY,
+		f"{frappe.session.user}|{doctype or ''}",
+		generator=lambda: query_views(doctype),
+	)
+
+
+def query_views(doctype):
 	View = frappe.qb.DocType("CRM View Settings")
 	query = (
 		frappe.qb.from_(View)
@@ -14,3 +25,8 @@ def get_views(doctype):
 		query = query.where(View.dt == doctype)
 	views = query.run(as_dict=True)
 	return views
+
+
+def clear_views_cache():
+	# public views are shared, so a change to any view can change what every user sees
+	frappe.cache.delete_value(VIEWS_CACHE_KEY)
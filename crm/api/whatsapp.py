@@ -6,7 +6,8 @@ from frappe import _
 from frappe.permissions import add_permission, update_permission_property
 
 from crm.api.doc import get_assigned_users
-from crm.fcrm.doctype.crm_notification.crm_notification import notify_user
+from crm.api.presence import get_user_presence
+from crm.fcrm.doctype.crm_notification.crm_notification import notify_users
 from crm.integrations.api import get_contact_lead_or_deal_from_number
 
 ALLOWED_WHATSAPP_ROLES = ["System Manager", "Sales Manager", "Sales User"]
@@ -82,8 +83,8 @@ def notify_agent(doc):
             </div>
         """
 		assigned_users = get_assigned_users(doc.reference_doctype, doc.reference_name)
-		for user in assigned_users:
-			notify_user(
+		notify_users(
+			[
 				{
 					"owner": doc.owner,
 					"assigned_to": user,
@@ -95,7 +96,9 @@ def notify_agent(doc):
 					"redirect_to_doctype": doc.reference_doctype,
 					"redirect_to_docname": doc.reference_name,
 				}
-			)
+				for user in assigned_users
+			]
+		)
 
 
 @frappe.whitelist()
@@ -665,7 +668,10 @@ def send_chat_message(phone, message="", attach="", content_type="text", jid="")
 
 @frappe.whitelist()
 def assign_chat(jid, user=""):
-	"""Assign a CRM user to a WhatsApp chat. Only admins and managers can assign."""
+	"""Assign a CRM user to a WhatsApp chat. Only admins and managers can assign.
+
+	The assignee's presence is returned with the result, so an assignment to someone who is
+	offline or on a call can be flagged right away."""
 	validate_access()
 	if not any(role in ["System Manager", "Sales Manager"] for role in frappe.get_roles()):
 		frappe.throw(_("Only admins and managers can assign staff to chats."), frappe.PermissionError)
@@ -683,7 +689,10 @@ def assign_chat(jid, user=""):
 			timeout=10,
 		)
 		resp.raise_for_status()
-		return resp.json()
+		result = resp.json()
+		if user and isinstance(result, dict):
+			result["presence"] = get_user_presence(user)["status"]
+		return result
 	except Exception as e:
 		frappe.log_error(title="WhatsApp Bridge: Failed to assign chat", message=str(e))
 		return {"ok": False}
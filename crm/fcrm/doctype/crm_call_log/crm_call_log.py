@@ -5,7 +5,9 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from crm.fcrm.doctype.crm_call_rollup.crm_call_rollup import remove_from_call_rollup, update_call_rollup
 from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.recordings import get_recording_proxy_url
 from crm.utils import seconds_to_duration
 
 
@@ -121,6 +123,12 @@ class CRMCallLog(Document):
 	def parse_list_data(calls):
 		return [parse_call_log(call) for call in calls] if calls else []
 
+	def on_update(self):
+		update_call_rollup(self)
+
+	def on_trash(self):
+		remove_from_call_rollup(self)
+
 	def has_link(self, doctype, name):
 		for link in self.links:
 			if link.link_doctype == doctype and link.link_name == name:
@@ -136,6 +144,9 @@ class CRMCallLog(Document):
 def parse_call_log(call):
 	call["show_recording"] = False
 	call["_duration"] = seconds_to_duration(call.get("duration"))
+	if call.get("recording_url") and call.get("name"):
+		# the provider URL needs its credentials, recordings are played through the local proxy
+		call["recording_url"] = get_recording_proxy_url(call["name"])
 	if call.get("type") == "Incoming":
 		call["activity_type"] = "incoming_call"
 		contact = get_contact_by_phone_number(call.get("from"))
@@ -0,0 +1,296 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Coalesce, Date, Sum
+from frappe.utils import create_batch, flt, getdate, now, time_diff_in_seconds
+
+MISSED_CALL_STATUSES = ("No Answer", "Busy", "Canceled", "Failed")
+ROLLUP_FIELDS = (
+	"incoming_calls",
+	"outgoing_calls",
+	"answered_calls",
+	"missed_calls",
+	"talk_time",
+	"lead_responses",
+	"lead_response_time",
+)
+
+
+class CRMCallRollup(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		agent: DF.Link | None
+		answered_calls: DF.Int
+		date: DF.Date
+		incoming_calls: DF.Int
+		lead_response_time: DF.Duration | None
+		lead_responses: DF.Int
+		missed_calls: DF.Int
+		outgoing_calls: DF.Int
+		talk_time: DF.Duration | None
+	# end: auto-generated types
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("CRM Call Rollup", ["date", "agent"], constraint_name="unique_date_agent")
+
+
+def get_call_rollup_values(call_log) -> tuple[tuple, dict] | None:
+	"""`(date, agent)` a call log is counted under and what it adds to that day's rollup."""
+	if not call_log or not call_log.get("creation"):
+		return None
+
+	incoming = call_log.type == "Incoming"
+	answered = call_log.status == "Completed"
+	agent = (call_log.receiver if incoming else call_log.caller) or ""
+	values = {
+		"incoming_calls": int(incoming),
+		"outgoing_calls": int(not incoming),
+		"answered_calls": int(answered),
+		"missed_calls": int(incoming and call_log.status in MISSED_CALL_STATUSES),
+		"talk_time": flt(call_log.duration) if answered else 0,
+	}
+	return (getdate(call_log.creation), agent), values
+
+
+def update_call_rollup(call_log, method=None):
+	"""Move the call log's share of the rollups from what it was before this save to what it is now."""
+	before = call_log.get_doc_before_save()
+	old = get_call_rollup_values(before)
+	new = get_call_rollup_values(call_log)
+
+	deltas = {}
+	for sign, rollup in ((-1, old), (1, new)):
+		if rollup:
+			key, values = rollup
+			day = deltas.setdefault(key, dict.fromkeys(values, 0))
+			for field, value in values.items():
+				day[field] += sign * value
+
+	for (date, agent), values in deltas.items():
+		add_to_call_rollup(date, agent, values)
+
+	if call_log.type == "Outgoing":
+		update_lead_response(call_log, before)
+
+
+def remove_from_call_rollup(call_log, method=None):
+	if rollup := get_call_rollup_values(call_log):
+		(date, agent), values = rollup
+		add_to_call_rollup(date, agent, {field: -value for field, value in values.items()})
+
+	if call_log.type == "Outgoing":
+		remove_lead_response(call_log)
+
+
+def update_lead_response(call_log, before=None):
+	"""
+	Count the time from lead creation to this call for every lead that was just linked to the
+	call, if it is the first outgoing call made to that lead.
+	"""
+	old_leads = get_linked_leads(before) if before else set()
+	for lead in get_linked_leads(call_log) - old_leads:
+		if has_earlier_outgoing_call(lead, call_log):
+			continue
+
+		if lead_creation := frappe.db.get_value("CRM Lead", lead, "creation"):
+			add_lead_response(call_log, lead_creation)
+
+
+def remove_lead_response(call_log):
+	"""
+	Take back the lead responses a deleted call was counted as, the next outgoing call made to
+	each of those leads becomes its first response instead.
+	"""
+	for lead in get_linked_leads(call_log):
+		if has_earlier_outgoing_call(lead, call_log):
+			continue
+
+		lead_creation = frappe.db.get_value("CRM Lead", lead, "creation")
+		if not lead_creation:
+			continue
+
+		add_lead_response(call_log, lead_creation, -1)
+		if next_call := get_next_outgoing_call(lead, call_log):
+			add_lead_response(next_call, lead_creation)
+
+
+def add_lead_response(call, lead_creation, sign: int = 1):
+	response_time = max(time_diff_in_seconds(call.creation, lead_creation), 0)
+	add_to_call_rollup(
+		getdate(call.creation),
+		call.caller or "",
+		{"lead_responses": sign, "lead_response_time": sign * response_time},
+	)
+
+
+def get_linked_leads(call_log) -> set[str]:
+	return {link.link_name for link in call_log.links if link.link_doctype == "CRM Lead"}
+
+
+def has_earlier_outgoing_call(lead: str, call_log) -> bool:
+	CallLog = frappe.qb.DocType("CRM Call Log")
+	query = get_other_outgoing_calls(lead, call_log).where(CallLog.creation < call_log.creation)
+	return bool(query.select(CallLog.name).limit(1).run())
+
+
+def get_next_outgoing_call(lead: str, call_log):
+	CallLog = frappe.qb.DocType("CRM Call Log")
+	calls = (
+		get_other_outgoing_calls(lead, call_log)
+		.select(CallLog.creation, CallLog.caller)
+		.orderby(CallLog.creation)
+		.limit(1)
+		.run(as_dict=True)
+	)
+	return calls[0] if calls else None
+
+
+def get_other_outgoing_calls(lead: str, call_log):
+	"""Query on the outgoing calls made to `lead`, other than `call_log`."""
+	CallLog = frappe.qb.DocType("CRM Call Log")
+	DynamicLink = frappe.qb.DocType("Dynamic Link")
+	return (
+		frappe.qb.from_(DynamicLink)
+		.join(CallLog)
+		.on(CallLog.name == DynamicLink.parent)
+		.where(
+			(DynamicLink.parenttype == "CRM Call Log")
+			& (DynamicLink.link_doctype == "CRM Lead")
+			& (DynamicLink.link_name == lead)
+			& (CallLog.type == "Outgoing")
+			& (CallLog.name != call_log.name)
+		)
+	)
+
+
+def add_to_call_rollup(date, agent: str, values: dict):
+	values = {field: value for field, value in values.items() if value}
+	if not values:
+		return
+
+	ensure_call_rollup(date, agent)
+
+	Rollup = frappe.qb.DocType("CRM Call Rollup")
+	query = frappe.qb.update(Rollup).set(Rollup.modified, now())
+	for field, value in values.items():
+		query = query.set(Rollup[field], Rollup[field] + value)
+	query.where((Rollup.date == date) & (Rollup.agent == agent)).run()
+
+
+def ensure_call_rollup(date, agent: str):
+	if frappe.db.exists("CRM Call Rollup", {"date": date, "agent": agent}):
+		return
+
+	frappe.db.savepoint("crm_call_rollup")
+	try:
+		insert_call_rollups([{"date": date, "agent": agent}])
+	except Exception as e:
+		# inserted by a concurrent save of another call of the same agent and day
+		if not frappe.db.is_duplicate_entry(e):
+			raise
+		frappe.db.rollback(save_point="crm_call_rollup")
+
+
+def insert_call_rollups(rows: list[dict]):
+	timestamp = now()
+	frappe.db.bulk_insert(
+		"CRM Call Rollup",
+		["name", "creation", "modified", "owner", "modified_by", "date", "agent", *ROLLUP_FIELDS],
+		[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				"Administrator",
+				"Administrator",
+				row["date"],
+				row["agent"] or "",
+				*(row.get(field) or 0 for field in ROLLUP_FIELDS),
+			)
+			for row in rows
+		],
+	)
+
+
+def rebuild_call_rollups(from_date=None):
+	"""Recompute the rollups, of every day or from `from_date`, from the call logs."""
+	filters = {"date": [">=", getdate(from_date)]} if from_date else {}
+	frappe.db.delete("CRM Call Rollup", filters)
+
+	CallLog = frappe.qb.DocType("CRM Call Log")
+	day = Date(CallLog.creation)
+	incoming = CallLog.type == "Incoming"
+	answered = CallLog.status == "Completed"
+	agent = Coalesce(Case().when(incoming, CallLog.receiver).else_(CallLog.caller), "")
+	query = (
+		frappe.qb.from_(CallLog)
+		.select(
+			day.as_("date"),
+			agent.as_("agent"),
+			Sum(Case().when(incoming, 1).else_(0)).as_("incoming_calls"),
+			Sum(Case().when(incoming, 0).else_(1)).as_("outgoing_calls"),
+			Sum(Case().when(answered, 1).else_(0)).as_("answered_calls"),
+			Sum(Case().when(incoming & CallLog.status.isin(MISSED_CALL_STATUSES), 1).else_(0)).as_(
+				"missed_calls"
+			),
+			Sum(Case().when(answered, CallLog.duration).else_(0)).as_("talk_time"),
+		)
+		.groupby(day, agent)
+	)
+	if from_date:
+		query = query.where(CallLog.creation >= getdate(from_date))
+
+	rollups = {(getdate(row.date), row.agent or ""): row for row in query.run(as_dict=True)}
+	for row in get_lead_responses(from_date):
+		rollup = rollups.setdefault(row.key, frappe._dict(date=row.key[0], agent=row.key[1]))
+		rollup.lead_responses = (rollup.get("lead_responses") or 0) + 1
+		rollup.lead_response_time = (rollup.get("lead_response_time") or 0) + row.response_time
+
+	rows = [{**rollup, "date": date, "agent": agent} for (date, agent), rollup in rollups.items()]
+	for batch in create_batch(rows, 1000):
+		insert_call_rollups(list(batch))
+
+
+def get_lead_responses(from_date=None):
+	"""First outgoing call of every lead, with its agent and the time since the lead was created."""
+	CallLog = frappe.qb.DocType("CRM Call Log")
+	DynamicLink = frappe.qb.DocType("Dynamic Link")
+	Lead = frappe.qb.DocType("CRM Lead")
+	calls = (
+		frappe.qb.from_(DynamicLink)
+		.join(CallLog)
+		.on(CallLog.name == DynamicLink.parent)
+		.join(Lead)
+		.on(Lead.name == DynamicLink.link_name)
+		.select(DynamicLink.link_name, CallLog.creation, CallLog.caller, Lead.creation.as_("lead_creation"))
+		.where(
+			(DynamicLink.parenttype == "CRM Call Log")
+			& (DynamicLink.link_doctype == "CRM Lead")
+			& (CallLog.type == "Outgoing")
+		)
+		.orderby(CallLog.creation)
+	).run(as_dict=True)
+
+	first_calls = {}
+	for call in calls:
+		first_calls.setdefault(call.link_name, call)
+
+	for call in first_calls.values():
+		if from_date and getdate(call.creation) < getdate(from_date):
+			continue
+		yield frappe._dict(
+			key=(getdate(call.creation), call.caller or ""),
+			response_time=max(time_diff_in_seconds(call.creation, call.lead_creation), 0),
+		)
@@ -0,0 +1,98 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import getdate
+
+from crm.api.dashboard import get_call_rollup_totals
+from crm.fcrm.doctype.crm_call_rollup.crm_call_rollup import ROLLUP_FIELDS, rebuild_call_rollups
+
+
+class TestCRMCallRollup(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_rollup_follows_call_log_changes(self):
+		before = get_today_rollup("Administrator")
+
+		call_log = create_call_log("test-rollup-1", type="Incoming", status="Ringing")
+		call_log.status = "No Answer"
+		call_log.save()
+		create_call_log("test-rollup-2", type="Incoming", status="Completed", duration=90)
+
+		rollup = get_today_rollup("Administrator")
+		self.assertEqual(rollup.incoming_calls - before.incoming_calls, 2)
+		self.assertEqual(rollup.missed_calls - before.missed_calls, 1)
+		self.assertEqual(rollup.answered_calls - before.answered_calls, 1)
+		self.assertEqual(rollup.talk_time - before.talk_time, 90)
+
+		call_log.delete()
+		rollup = get_today_rollup("Administrator")
+		self.assertEqual(rollup.incoming_calls - before.incoming_calls, 1)
+		self.assertEqual(rollup.missed_calls - before.missed_calls, 0)
+
+	def test_first_lead_response(self):
+		before = get_today_rollup("Administrator")
+		lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Rollup Lead"}).insert()
+
+		for call_sid in ("test-rollup-3", "test-rollup-4"):
+			call_log = create_call_log(call_sid, type="Outgoing", caller="Administrator", receiver=None)
+			call_log.link_with_reference_doc("CRM Lead", lead.name)
+			call_log.save()
+
+		rollup = get_today_rollup("Administrator")
+		self.assertEqual(rollup.lead_responses - before.lead_responses, 1)
+
+	def test_deleted_lead_response_moves_to_next_call(self):
+		before = get_today_rollup("Administrator")
+		lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Rollup Lead"}).insert()
+
+		call_logs = []
+		for call_sid in ("test-rollup-7", "test-rollup-8"):
+			call_log = create_call_log(call_sid, type="Outgoing", caller="Administrator", receiver=None)
+			call_log.link_with_reference_doc("CRM Lead", lead.name)
+			call_log.save()
+			call_logs.append(call_log)
+
+		call_logs[0].delete()
+		rollup = get_today_rollup("Administrator")
+		self.assertEqual(rollup.lead_responses - before.lead_responses, 1)
+
+		rebuild_call_rollups(getdate())
+		self.assertEqual(get_today_rollup("Administrator"), rollup)
+
+		call_logs[1].delete()
+		rollup = get_today_rollup("Administrator")
+		self.assertEqual(rollup.lead_responses, before.lead_responses)
+
+	def test_rebuild_matches_incremental_rollup(self):
+		create_call_log("test-rollup-5", type="Incoming", status="Completed", duration=30)
+		create_call_log("test-rollup-6", type="Outgoing", caller="Administrator", receiver=None)
+		incremental = get_today_rollup("Administrator")
+
+		rebuild_call_rollups(getdate())
+		self.assertEqual(get_today_rollup("Administrator"), incremental)
+
+		totals = get_call_rollup_totals(getdate(), getdate(), "Administrator")
+		self.assertEqual(totals["current"].incoming_calls, incremental.incoming_calls)
+
+
+def get_today_rollup(agent):
+	rollup = frappe.db.get_value(
+		"CRM Call Rollup", {"date": getdate(), "agent": agent}, ROLLUP_FIELDS, as_dict=True
+	)
+	return frappe._dict({field: (rollup or {}).get(field) or 0 for field in ROLLUP_FIELDS})
+
+
+def create_call_log(call_sid, **kwargs):
+	return frappe.get_doc(
+		{
+			"doctype": "CRM Call Log",
+			"id": call_sid,
+			"from": "+919999900010",
+			"to": "+918000000010",
+			"receiver": "Administrator",
+			**kwargs,
+		}
+	).insert()
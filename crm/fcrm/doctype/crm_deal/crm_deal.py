@@ -6,9 +6,11 @@ from frappe import _
 from frappe.desk.form.assign_to import add as assign
 from frappe.model.document import Document
 
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import get_cached_exchange_rate
 from crm.fcrm.doctype.crm_service_level_agreement.utils import get_sla
 from crm.fcrm.doctype.crm_status_change_log.crm_status_change_log import add_status_change_log
-from crm.fcrm.doctype.fcrm_settings.fcrm_settings import get_exchange_rate
+from crm.utils.side_effects import defer_side_effect
+from crm.utils.status_catalog import get_status_info, get_status_type
 
 
 class CRMDeal(Document):
@@ -83,11 +85,11 @@ class CRMDeal(Document):
 		self.set_primary_contact()
 		self.set_primary_email_mobile_no()
 		if not self.is_new() and self.has_value_changed("deal_owner") and self.deal_owner:
-			self.share_with_agent(self.deal_owner)
+			defer_side_effect(self, "share_with_agent", agent=self.deal_owner)
 			self.assign_agent(self.deal_owner)
 		if self.has_value_changed("status"):
 			add_status_change_log(self)
-			if frappe.db.get_value("CRM Deal Status", self.status, "type") == "Won":
+			if get_status_type(self.doctype, self.status) == "Won":
 				self.closed_date = frappe.utils.nowdate()
 		self.validate_forecasting_fields()
 		self.validate_lost_reason()
@@ -213,7 +215,7 @@ class CRMDeal(Document):
 		Update the default probability based on the status.
 		"""
 		if not self.probability or self.probability == 0:
-			self.probability = frappe.db.get_value("CRM Deal Status", self.status, "probability") or 0
+			self.probability = get_status_info(self.doctype, self.status).get("probability") or 0
 
 	def update_expected_deal_value(self):
 		"""
@@ -240,7 +242,7 @@ class CRMDeal(Document):
 		"""
 		Validate the lost reason if the status is set to "Lost".
 		"""
-		if self.status and frappe.get_cached_value("CRM Deal Status", self.status, "type") == "Lost":
+		if get_status_type(self.doctype, self.status) == "Lost":
 			if not self.lost_reason:
 				frappe.throw(_("Please specify a reason for losing the deal."), frappe.ValidationError)
 			elif self.lost_reason == "Other" and not self.lost_notes:
@@ -251,7 +253,7 @@ class CRMDeal(Document):
 			system_currency = frappe.db.get_single_value("FCRM Settings", "currency") or "USD"
 			exchange_rate = 1
 			if self.currency and self.currency != system_currency:
-				exchange_rate = get_exchange_rate(self.currency, system_currency)
+				exchange_rate = get_cached_exchange_rate(self.currency, system_currency)
 
 			self.db_set("exchange_rate", exchange_rate)
 
@@ -4,6 +4,7 @@
 import frappe
 from frappe.tests import IntegrationTestCase
 
+from crm.api.contact import LINKED_DEAL_FIELDS, get_linked_deals
 from crm.fcrm.doctype.crm_deal.crm_deal import (
 	add_contact,
 	create_deal,
@@ -364,6 +365,46 @@ class TestCRMDeal(IntegrationTestCase):
 		deal.reload()
 		self.assertEqual(deal.contacts[0].is_primary, 1)
 
+	def test_contact_update_propagates_to_primary_deals(self):
+		"""Test that changing the primary contact's email updates only the deals it is primary on"""
+		contact = create_test_contact(first_name="Agency", email="agency@example.com")
+		other = create_test_contact(first_name="Other", email="other@example.com")
+
+		primary_deal = create_test_deal(organization="Agency Org")
+		primary_deal.append("contacts", {"contact": contact.name, "is_primary": 1})
+		primary_deal.save()
+
+		secondary_deal = create_test_deal(organization="Agency Org")
+		secondary_deal.append("contacts", {"contact": other.name, "is_primary": 1})
+		secondary_deal.append("contacts", {"contact": contact.name})
+		secondary_deal.save()
+
+		contact.reload()
+		contact.email_ids[0].email_id = "agency.new@example.com"
+		contact.save(ignore_permissions=True)
+
+		self.assertEqual(
+			frappe.db.get_value("CRM Deal", primary_deal.name, "email"), "agency.new@example.com"
+		)
+		self.assertEqual(frappe.db.get_value("CRM Deal", secondary_deal.name, "email"), "other@example.com")
+
+	def test_get_linked_deals_of_contact(self):
+		"""Test that linked deals of a contact are listed once each, sorted and paged"""
+		contact = create_test_contact(first_name="Linked", email="linked@example.com")
+		deals = []
+		for org in ("Linked Org A", "Linked Org B"):
+			deal = create_test_deal(organization=org)
+			deal.append("contacts", {"contact": contact.name, "is_primary": 1})
+			deal.save()
+			deals.append(deal.name)
+
+		linked = get_linked_deals(contact.name, order_by="name asc")
+		self.assertEqual([d.name for d in linked], sorted(deals))
+		self.assertEqual(set(linked[0]), set(LINKED_DEAL_FIELDS))
+
+		self.assertEqual(len(get_linked_deals(contact.name, start=1, page_length=1)), 1)
+		self.assertRaises(frappe.ValidationError, get_linked_deals, contact.name, order_by="lost_reason desc")
+
 
 def create_test_deal(**kwargs):
 	"""Helper function to create a CRM Deal for testing"""
@@ -1,9 +1,10 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
-# import frappe
 from frappe.model.document import Document
 
+from crm.utils.status_catalog import clear_status_catalog
+
 
 class CRMDealStatus(Document):
 	# begin: auto-generated types
@@ -35,4 +36,11 @@ class CRMDealStatus(Document):
 		type: DF.Literal["Open", "Ongoing", "On Hold", "Won", "Lost"]
 	# end: auto-generated types
 
-	pass
+	def on_update(self):
+		clear_status_catalog(self)
+
+	def on_trash(self):
+		clear_status_catalog(self)
+
+	def after_rename(self, old, new, merge=False):
+		clear_status_catalog(self)
@@ -0,0 +1,131 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import getdate, nowdate
+
+from crm.fcrm.doctype.fcrm_settings.fcrm_settings import get_exchange_rate
+
+EXCHANGE_RATE_CACHE_KEY = "crm_exchange_rates"
+
+
+class CRMExchangeRate(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		date: DF.Date
+		from_currency: DF.Link
+		rate: DF.Float
+		to_currency: DF.Link
+	# end: auto-generated types
+
+	def on_update(self):
+		clear_exchange_rate_cache(self.from_currency, self.to_currency)
+
+	def on_trash(self):
+		clear_exchange_rate_cache(self.from_currency, self.to_currency)
+
+
+def get_cached_exchange_rate(from_currency, to_currency):
+	"""
+	Get the rate to convert `from_currency` to `to_currency` from the local rate store.
+
+	The provider is only called synchronously the very first time a currency pair is
+	seen. After that the latest stored rate is used, and if it is older than today a
+	background job is queued to refresh it.
+	"""
+	if from_currency == to_currency:
+		return 1
+
+	latest = get_latest_exchange_rate(from_currency, to_currency)
+	if not latest:
+		return fetch_and_store_exchange_rate(from_currency, to_currency)
+
+	if getdate(latest.date) < getdate(nowdate()):
+		frappe.enqueue(
+			"crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate.refresh_exchange_rate",
+			from_currency=from_currency,
+			to_currency=to_currency,
+			job_id=f"crm_exchange_rate::{from_currency}::{to_currency}",
+			deduplicate=True,
+			enqueue_after_commit=True,
+		)
+
+	return latest.rate
+
+
+def get_latest_exchange_rate(from_currency, to_currency):
+	return frappe.cache.hget(
+		EXCHANGE_RATE_CACHE_KEY,
+		f"{from_currency}::{to_currency}",
+		generator=lambda: frappe.db.get_value(
+			"CRM Exchange Rate",
+			{"from_currency": from_currency, "to_currency": to_currency},
+			["date", "rate"],
+			as_dict=True,
+			order_by="date desc",
+		),
+	)
+
+
+def fetch_and_store_exchange_rate(from_currency, to_currency, date=None):
+	date = date or nowdate()
+	rate = get_exchange_rate(from_currency, to_currency, None if date == nowdate() else date)
+	store_exchange_rate(from_currency, to_currency, date, rate)
+	return rate
+
+
+def store_exchange_rate(from_currency, to_currency, date, rate):
+	name = frappe.db.get_value(
+		"CRM Exchange Rate", {"from_currency": from_currency, "to_currency": to_currency, "date": date}
+	)
+	if name:
+		frappe.db.set_value("CRM Exchange Rate", name, "rate", rate)
+	else:
+		frappe.get_doc(
+			{
+				"doctype": "CRM Exchange Rate",
+				"from_currency": from_currency,
+				"to_currency": to_currency,
+				"date": date,
+				"rate": rate,
+			}
+		).insert(ignore_permissions=True)
+
+	clear_exchange_rate_cache(from_currency, to_currency)
+
+
+def clear_exchange_rate_cache(from_currency, to_currency):
+	frappe.cache.hdel(EXCHANGE_RATE_CACHE_KEY, f"{from_currency}::{to_currency}")
+
+
+def refresh_exchange_rate(from_currency, to_currency):
+	try:
+		fetch_and_store_exchange_rate(from_currency, to_currency)
+	except Exception:
+		frappe.log_error(title=f"Exchange Rate Refresh Error ({from_currency} to {to_currency})")
+
+
+def prefetch_exchange_rates():
+	"""Fetch today's rates for every currency used on deals and organizations."""
+	system_currency = frappe.db.get_single_value("FCRM Settings", "currency") or "USD"
+
+	currencies = set()
+	for doctype in ("CRM Deal", "CRM Organization"):
+		currencies.update(
+			frappe.get_all(
+				doctype,
+				filters={"currency": ["not in", ["", system_currency]]},
+				pluck="currency",
+				distinct=True,
+			)
+		)
+
+	for currency in currencies:
+		refresh_exchange_rate(currency, system_currency)
@@ -0,0 +1,52 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, nowdate
+
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import (
+	clear_exchange_rate_cache,
+	get_cached_exchange_rate,
+	store_exchange_rate,
+)
+
+PROVIDER = "crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate.get_exchange_rate"
+CURRENCY_PAIRS = (("USD", "INR"), ("EUR", "INR"))
+
+
+class IntegrationTestCRMExchangeRate(IntegrationTestCase):
+	def setUp(self):
+		clear_cached_rates()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		# the rolled back rates would otherwise still be served from the cache
+		clear_cached_rates()
+
+	def test_rate_is_fetched_once_and_then_served_from_store(self):
+		with patch(PROVIDER, return_value=83.5) as provider:
+			self.assertEqual(get_cached_exchange_rate("USD", "INR"), 83.5)
+			self.assertEqual(get_cached_exchange_rate("USD", "INR"), 83.5)
+
+		provider.assert_called_once()
+		self.assertTrue(
+			frappe.db.exists(
+				"CRM Exchange Rate", {"from_currency": "USD", "to_currency": "INR", "date": nowdate()}
+			)
+		)
+
+	def test_stale_rate_is_used_without_calling_provider(self):
+		store_exchange_rate("EUR", "INR", add_days(nowdate(), -3), 90.25)
+
+		with patch(PROVIDER, side_effect=Exception("offline")) as provider:
+			self.assertEqual(get_cached_exchange_rate("EUR", "INR"), 90.25)
+
+		provider.assert_not_called()
+
+
+def clear_cached_rates():
+	for from_currency, to_currency in CURRENCY_PAIRS:
+		clear_exchange_rate_cache(from_currency, to_currency)
@@ -1,6 +1,7 @@
 # Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import hashlib
 import json
 
 import frappe
@@ -8,6 +9,8 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import random_string
 
+FIELDS_LAYOUT_CACHE_KEY = "crm_fields_layout"
+
 
 class CRMFieldsLayout(Document):
 	# begin: auto-generated types
@@ -23,19 +26,44 @@ class CRMFieldsLayout(Document):
 		type: DF.Literal["Quick Entry", "Side Panel", "Data Fields", "Grid Row", "Required Fields"]
 	# end: auto-generated types
 
-	pass
+	def on_update(self):
+		clear_fields_layout_cache()
+
+	def on_trash(self):
+		clear_fields_layout_cache()
 
 
 @frappe.whitelist()
 def get_fields_layout(doctype: str, type: str, parent_doctype: str | None = None):
-	tabs = []
-	layout = None
+	"""
+	Return the layout of `type` for `doctype` with every placed field resolved against the
+	meta and the current user's permlevel access. Resolved layouts are cached per role set
+	until a layout is saved or the cache is cleared, and meta or permission changes make a
+	new metadata version, so they never serve a stale layout.
+	"""
+	return frappe.cache.hget(
+		FIELDS_LAYOUT_CACHE_KEY,
+		get_fields_layout_cache_key(doctype, type, parent_doctype),
+		generator=lambda: build_fields_layout(doctype, type, parent_doctype),
+	)
+
+
+def get_fields_layout_cache_key(doctype: str, type: str, parent_doctype: str | None = None) -> str:
+	roles = hashlib.sha256("|".join(sorted(frappe.get_roles())).encode()).hexdigest()[:16]
+	metadata_version = frappe.cache.get_value("metadata_version") or ""
+	return f"{doctype}|{type}|{parent_doctype or ''}|{roles}|{metadata_version}"
 
-	if frappe.db.exists("CRM Fields Layout", {"dt": doctype, "type": type}):
-		layout = frappe.get_doc("CRM Fields Layout", {"dt": doctype, "type": type})
 
-	if layout and layout.layout:
-		tabs = json.loads(layout.layout)
+def clear_fields_layout_cache():
+	frappe.cache.delete_value(FIELDS_LAYOUT_CACHE_KEY)
+
+
+def build_fields_layout(doctype: str, type: str, parent_doctype: str | None = None):
+	tabs = []
+	layout = frappe.db.get_value("CRM Fields Layout", {"dt": doctype, "type": type}, "layout")
+
+	if layout:
+		tabs = json.loads(layout)
 
 	if not tabs and type != "Required Fields":
 		tabs = get_default_layout(doctype)
@@ -47,48 +75,40 @@ def get_fields_layout(doctype: str, type: str, parent_doctype: str | None = None
 	if not has_tabs:
 		tabs = [{"name": "first_tab", "sections": tabs}]
 
-	allowed_fields = []
-	for tab in tabs:
-		for section in tab.get("sections"):
-			if "columns" not in section:
-				continue
-			for column in section.get("columns"):
-				if not column.get("fields"):
-					continue
-				allowed_fields.extend(column.get("fields"))
-
-	fields = frappe.get_meta(doctype).fields
-	fields = [field for field in fields if field.fieldname in allowed_fields]
-
-	required_fields = []
+	fields = {field.fieldname: field for field in frappe.get_meta(doctype).fields}
+	permlevels = get_permlevels(doctype, parent_doctype)
 
+	required_fields = {}
 	if type == "Required Fields":
-		required_fields = [
-			field for field in frappe.get_meta(doctype, False).fields if field.reqd and not field.default
-		]
+		required_fields = {
+			field.fieldname: field
+			for field in frappe.get_meta(doctype, False).fields
+			if field.reqd and not field.default
+		}
 
 	for tab in tabs:
 		for section in tab.get("sections"):
 			if section.get("columns"):
 				section["columns"] = [column for column in section.get("columns") if column]
 			for column in section.get("columns") if section.get("columns") else []:
-				column["fields"] = [field for field in column.get("fields") if field]
-				for field in column.get("fields") if column.get("fields") else []:
-					field = next((f for f in fields if f.fieldname == field), None)
-					if field:
-						field = field.as_dict()
-						handle_perm_level_restrictions(field, doctype, parent_doctype)
-						column["fields"][column.get("fields").index(field["fieldname"])] = field
-
-						# remove field from required_fields if it is already present
-						if (
-							type == "Required Fields"
-							and field.reqd
-							and any(f.get("fieldname") == field.get("fieldname") for f in required_fields)
-						):
-							required_fields = [
-								f for f in required_fields if f.get("fieldname") != field.get("fieldname")
-							]
+				resolved_fields = []
+				for fieldname in column.get("fields") or []:
+					if not fieldname:
+						continue
+
+					field = fields.get(fieldname)
+					if not field:
+						resolved_fields.append(fieldname)
+						continue
+
+					field = field.as_dict()
+					handle_perm_level_restrictions(field, doctype, parent_doctype, permlevels)
+					resolved_fields.append(field)
+
+					# remove field from required_fields if it is already present
+					if field.reqd:
+						required_fields.pop(field.fieldname, None)
+				column["fields"] = resolved_fields
 
 	if type == "Required Fields" and required_fields and tabs:
 		tabs[-1].get("sections").append(
@@ -100,7 +120,7 @@ def get_fields_layout(doctype: str, type: str, parent_doctype: str | None = None
 				"columns": [
 					{
 						"name": "required_fields_column_" + str(random_string(4)),
-						"fields": [field.as_dict() for field in required_fields],
+						"fields": [field.as_dict() for field in required_fields.values()],
 					}
 				],
 			}
@@ -126,24 +146,24 @@ def get_sidepanel_sections(doctype):
 		"Column Break",
 	]
 
-	fields = frappe.get_meta(doctype).fields
-	fields = [field for field in fields if field.fieldtype not in not_allowed_fieldtypes]
+	fields = {
+		field.fieldname: field
+		for field in frappe.get_meta(doctype).fields
+		if field.fieldtype not in not_allowed_fieldtypes
+	}
+	permlevels = get_permlevels(doctype)
 
 	add_forecasting_section(layout, doctype)
 
 	for section in layout:
 		section["name"] = section.get("name") or section.get("label")
 		for column in section.get("columns") if section.get("columns") else []:
-			for field in column.get("fields") if column.get("fields") else []:
-				field_obj = next((f for f in fields if f.fieldname == field), None)
+			for idx, field in enumerate(column.get("fields") or []):
+				field_obj = fields.get(field)
 				if field_obj:
 					field_obj = field_obj.as_dict()
-					handle_perm_level_restrictions(field_obj, doctype)
-					column["fields"][column.get("fields").index(field)] = get_field_obj(field_obj)
-
-	fields_meta = {}
-	for field in fields:
-		fields_meta[field.fieldname] = field
+					handle_perm_level_restrictions(field_obj, doctype, permlevels=permlevels)
+					column["fields"][idx] = get_field_obj(field_obj)
 
 	return layout
 
@@ -180,11 +200,12 @@ def add_forecasting_section(layout, doctype):
 			)
 
 
-def handle_perm_level_restrictions(field, doctype, parent_doctype=None):
+def handle_perm_level_restrictions(field, doctype, parent_doctype=None, permlevels=None):
 	if field.permlevel == 0:
 		return
-	field_has_write_access = field.permlevel in get_permlevel_access("write", doctype, parent_doctype)
-	field_has_read_access = field.permlevel in get_permlevel_access("read", doctype, parent_doctype)
+	read_permlevels, write_permlevels = permlevels or get_permlevels(doctype, parent_doctype)
+	field_has_write_access = field.permlevel in write_permlevels
+	field_has_read_access = field.permlevel in read_permlevels
 
 	if not field_has_write_access and field_has_read_access:
 		field.read_only = 1
@@ -192,6 +213,14 @@ def handle_perm_level_restrictions(field, doctype, parent_doctype=None):
 		field.hidden = 1
 
 
+def get_permlevels(doctype, parent_doctype=None):
+	"""Permlevels the current user can read and write, resolved once for a whole layout."""
+	return (
+		get_permlevel_access("read", doctype, parent_doctype),
+		get_permlevel_access("write", doctype, parent_doctype),
+	)
+
+
 def get_permlevel_access(permission_type="write", doctype=None, parent_doctype=None):
 	allowed_permlevels = []
 	roles = frappe.get_roles()
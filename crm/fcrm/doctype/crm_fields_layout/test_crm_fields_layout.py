@@ -1,9 +1,27 @@
 # Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import UnitTestCase
+import json
 
+import frappe
+from frappe.tests import IntegrationTestCase
 
-class TestCRMFieldsLayout(UnitTestCase):
-	pass
+from crm.fcrm.doctype.crm_fields_layout.crm_fields_layout import get_fields_layout, save_fields_layout
+
+
+class TestCRMFieldsLayout(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_saving_layout_invalidates_cached_layout(self):
+		layout = [{"name": "tab", "sections": [{"name": "section", "columns": [{"fields": ["email"]}]}]}]
+		save_fields_layout("CRM Lead", "Quick Entry", json.dumps(layout))
+		fields = get_fields_layout("CRM Lead", "Quick Entry")[0]["sections"][0]["columns"][0]["fields"]
+		self.assertEqual([f["fieldname"] for f in fields], ["email"])
+
+		layout[0]["sections"][0]["columns"][0]["fields"] = ["email", "mobile_no", "unknown_field"]
+		save_fields_layout("CRM Lead", "Quick Entry", json.dumps(layout))
+		fields = get_fields_layout("CRM Lead", "Quick Entry")[0]["sections"][0]["columns"][0]["fields"]
+		self.assertEqual([f["fieldname"] for f in fields[:2]], ["email", "mobile_no"])
+		# fields missing from the meta are passed through as-is
+		self.assertEqual(fields[2], "unknown_field")
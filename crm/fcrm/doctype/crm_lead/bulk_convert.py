@@ -0,0 +1,216 @@
+import frappe
+from frappe import _
+from frappe.query_builder import Case
+from frappe.utils import create_batch
+
+from crm.fcrm.doctype.crm_lead.crm_lead import get_lead_deal_field_map
+from crm.utils.status_catalog import get_status_info
+
+BULK_CONVERSION_CHUNK_SIZE = 100
+# conversions larger than this are moved to a background job
+BULK_CONVERSION_INLINE_LIMIT = 10
+
+
+@frappe.whitelist()
+def bulk_convert_to_deal(leads, deal=None):
+	leads = frappe.parse_json(leads)
+	if not isinstance(leads, list) or not leads:
+		frappe.throw(_("Leads must be a non-empty list"))
+
+	for lead in leads:
+		if not frappe.has_permission("CRM Lead", "write", lead):
+			frappe.throw(_("Not allowed to convert Lead {0} to Deal").format(lead), frappe.PermissionError)
+
+	deal = frappe.parse_json(deal) if deal else None
+	if len(leads) > BULK_CONVERSION_INLINE_LIMIT:
+		frappe.enqueue(
+			"crm.fcrm.doctype.crm_lead.bulk_convert.convert_leads_to_deals",
+			leads=leads,
+			deal=deal,
+			notify=True,
+			queue="long",
+			timeout=60 * 60,
+		)
+		return {"queued": True}
+
+	return convert_leads_to_deals(leads, deal)
+
+
+def convert_leads_to_deals(leads, deal=None, notify=False, chunk_size=BULK_CONVERSION_CHUNK_SIZE):
+	"""
+	Convert many leads to deals in one run.
+
+	Works like `convert_to_deal` for each lead, but the lead -> deal field map, the
+	contact lookup and the organization lookup are done once per run / chunk instead
+	of once per lead. Each chunk is committed separately and progress is published
+	after every chunk. With `notify`, the converted and failed leads are published to
+	the user as `crm_bulk_convert` once done.
+
+	:return: `{"deals": {lead: deal}, "failed": {lead: error}}`
+	"""
+	field_map = get_lead_deal_field_map()
+	status_qualified = bool(get_status_info("CRM Lead", "Qualified"))
+	status_replied = frappe.db.exists("CRM Communication Status", "Replied")
+
+	result = {"deals": {}, "failed": {}}
+	done = 0
+
+	for chunk in create_batch(leads, chunk_size):
+		docs = []
+		for name in chunk:
+			try:
+				lead = frappe.get_doc("CRM Lead", name)
+			except frappe.DoesNotExistError:
+				frappe.clear_last_message()
+				result["failed"][name] = _("Lead does not exist")
+				continue
+
+			if lead.converted:
+				result["failed"][name] = _("Lead is already converted")
+				continue
+			docs.append(lead)
+
+		contacts = ContactResolver(docs)
+		organizations = resolve_organizations(docs)
+		converted = []
+
+		for lead in docs:
+			frappe.db.savepoint("convert_lead")
+			try:
+				contact, new_contact = contacts.get_or_create(lead)
+				organization = organizations.get(lead.organization)
+				new_organization = bool(lead.organization and not organization)
+				if new_organization:
+					organization = lead.insert_organization()
+
+				result["deals"][lead.name] = lead.create_deal(contact, organization, deal, field_map)
+			except Exception as e:
+				frappe.db.rollback(save_point="convert_lead")
+				frappe.clear_last_message()
+				result["failed"][lead.name] = str(e)
+				continue
+
+			# only records that survived the savepoint are reused by later leads
+			if new_contact:
+				contacts.add(lead, contact)
+			if new_organization:
+				organizations[lead.organization] = organization
+			converted.append((lead, organization))
+
+		mark_leads_as_converted(converted, status_qualified, status_replied)
+		if not frappe.flags.in_test:
+			frappe.db.commit()  # nosemgrep
+
+		done += len(chunk)
+		frappe.publish_progress(
+			done * 100 / len(leads),
+			title=_("Converting leads to deals"),
+			description=_("{0} of {1}").format(done, len(leads)),
+		)
+
+	if notify:
+		frappe.publish_realtime(
+			"crm_bulk_convert",
+			{"converted": len(result["deals"]), "failed": result["failed"]},
+			user=frappe.session.user,
+			after_commit=True,
+		)
+	return result
+
+
+class ContactResolver:
+	"""Find existing contacts for a chunk of leads by email, phone and mobile no with two
+	queries, remembering contacts added along the way so later leads reuse them."""
+
+	def __init__(self, leads):
+		emails = {lead.email for lead in leads if lead.email}
+		phones = {p for lead in leads for p in (lead.phone, lead.mobile_no) if p}
+
+		self.by_email = self.get_parents("Contact Email", "email_id", emails)
+		self.by_phone = self.get_parents("Contact Phone", "phone", phones)
+
+	@staticmethod
+	def get_parents(doctype, fieldname, values):
+		if not values:
+			return {}
+
+		rows = frappe.get_all(
+			doctype,
+			filters={fieldname: ["in", list(values)]},
+			fields=[fieldname, "parent"],
+			order_by="creation",
+		)
+		parents = {}
+		for row in rows:
+			parents.setdefault(row[fieldname], row.parent)
+		return parents
+
+	def get_or_create(self, lead):
+		""":return: `(contact, created)`, a created contact is reused once it is `add`ed"""
+		contact = (
+			self.by_email.get(lead.email)
+			or self.by_phone.get(lead.phone)
+			or self.by_phone.get(lead.mobile_no)
+		)
+		if contact:
+			lead.update_lead_contact(contact)
+			return contact, False
+
+		if not lead.lead_name:
+			lead.set_full_name()
+			lead.set_lead_name()
+
+		return lead.insert_contact(), True
+
+	def add(self, lead, contact):
+		if lead.email:
+			self.by_email[lead.email] = contact
+		for phone in (lead.phone, lead.mobile_no):
+			if phone:
+				self.by_phone[phone] = contact
+
+
+def resolve_organizations(leads):
+	names = list({lead.organization for lead in leads if lead.organization})
+	if not names:
+		return {}
+
+	organizations = frappe.get_all(
+		"CRM Organization",
+		filters={"organization_name": ["in", names]},
+		fields=["name", "organization_name"],
+	)
+	return {org.organization_name: org.name for org in organizations}
+
+
+def mark_leads_as_converted(converted, status_qualified=None, status_replied=None):
+	"""Mark `(lead, organization)` pairs as converted, linking leads to the organization they resolved to."""
+	if not converted:
+		return
+
+	leads = [lead for lead, _organization in converted]
+	Lead = frappe.qb.DocType("CRM Lead")
+	query = (
+		frappe.qb.update(Lead)
+		.set(Lead.converted, 1)
+		.set(Lead.modified, frappe.utils.now())
+		.set(Lead.modified_by, frappe.session.user)
+		.where(Lead.name.isin([lead.name for lead in leads]))
+	)
+	if status_qualified:
+		query = query.set(Lead.status, "Qualified")
+	query.run()
+
+	# like `create_organization`, leads point to the existing organization record they matched
+	renamed = {lead.name: org for lead, org in converted if org and org != lead.organization}
+	if renamed:
+		organization = Case()
+		for lead, org in renamed.items():
+			organization = organization.when(Lead.name == lead, org)
+		frappe.qb.update(Lead).set(Lead.organization, organization).where(Lead.name.isin(list(renamed))).run()
+
+	sla_leads = [lead.name for lead in leads if lead.sla]
+	if status_replied and sla_leads:
+		(
+			frappe.qb.update(Lead).set(Lead.communication_status, "Replied").where(Lead.name.isin(sla_leads))
+		).run()
@@ -11,6 +11,8 @@ from crm.fcrm.doctype.crm_service_level_agreement.utils import get_sla
 from crm.fcrm.doctype.crm_status_change_log.crm_status_change_log import (
 	add_status_change_log,
 )
+from crm.utils.side_effects import defer_side_effect
+from crm.utils.status_catalog import get_status_info
 
 
 class CRMLead(Document):
@@ -79,7 +81,7 @@ class CRMLead(Document):
 		self.set_title()
 		self.validate_email()
 		if not self.is_new() and self.has_value_changed("lead_owner") and self.lead_owner:
-			self.share_with_agent(self.lead_owner)
+			defer_side_effect(self, "share_with_agent", agent=self.lead_owner)
 			self.assign_agent(self.lead_owner)
 		if self.has_value_changed("status"):
 			add_status_change_log(self)
@@ -181,6 +183,9 @@ class CRMLead(Document):
 			self.update_lead_contact(existing_contact)
 			return existing_contact
 
+		return self.insert_contact()
+
+	def insert_contact(self):
 		contact = frappe.new_doc("Contact")
 		contact.update(
 			{
@@ -219,6 +224,9 @@ class CRMLead(Document):
 			self.db_set("organization", existing_organization)
 			return existing_organization
 
+		return self.insert_organization()
+
+	def insert_organization(self):
 		organization = frappe.new_doc("CRM Organization")
 		organization.update(
 			{
@@ -271,59 +279,14 @@ class CRMLead(Document):
 
 		return False
 
-	def create_deal(self, contact, organization, deal=None):
+	def create_deal(self, contact, organization, deal=None, field_map=None):
 		new_deal = frappe.new_doc("CRM Deal")
 
-		lead_deal_map = {
-			"lead_owner": "deal_owner",
-		}
-
-		restricted_fieldtypes = [
-			"Tab Break",
-			"Section Break",
-			"Column Break",
-			"HTML",
-			"Button",
-			"Attach",
-		]
-		restricted_map_fields = [
-			"name",
-			"naming_series",
-			"creation",
-			"owner",
-			"modified",
-			"modified_by",
-			"idx",
-			"docstatus",
-			"status",
-			"email",
-			"mobile_no",
-			"phone",
-			"sla",
-			"sla_status",
-			"response_by",
-			"first_response_time",
-			"first_responded_on",
-			"communication_status",
-			"sla_creation",
-			"status_change_log",
-		]
-
-		for field in self.meta.fields:
-			if field.fieldtype in restricted_fieldtypes:
-				continue
-			if field.fieldname in restricted_map_fields:
-				continue
-
-			fieldname = field.fieldname
-			if field.fieldname in lead_deal_map:
-				fieldname = lead_deal_map[field.fieldname]
-
-			if hasattr(new_deal, fieldname):
-				if fieldname == "organization":
-					new_deal.update({fieldname: organization})
-				else:
-					new_deal.update({fieldname: self.get(field.fieldname)})
+		for lead_field, deal_field in (field_map or get_lead_deal_field_map()).items():
+			if deal_field == "organization":
+				new_deal.update({deal_field: organization})
+			else:
+				new_deal.update({deal_field: self.get(lead_field)})
 
 		new_deal.update(
 			{
@@ -456,6 +419,60 @@ class CRMLead(Document):
 		}
 
 
+LEAD_DEAL_FIELD_MAP = {
+	"lead_owner": "deal_owner",
+}
+
+RESTRICTED_MAP_FIELDTYPES = [
+	"Tab Break",
+	"Section Break",
+	"Column Break",
+	"HTML",
+	"Button",
+	"Attach",
+]
+
+RESTRICTED_MAP_FIELDS = [
+	"name",
+	"naming_series",
+	"creation",
+	"owner",
+	"modified",
+	"modified_by",
+	"idx",
+	"docstatus",
+	"status",
+	"email",
+	"mobile_no",
+	"phone",
+	"sla",
+	"sla_status",
+	"response_by",
+	"first_response_time",
+	"first_responded_on",
+	"communication_status",
+	"sla_creation",
+	"status_change_log",
+]
+
+
+def get_lead_deal_field_map():
+	"""Map of CRM Lead fieldname -> CRM Deal fieldname copied over when converting a lead."""
+	lead_meta = frappe.get_meta("CRM Lead")
+	deal_meta = frappe.get_meta("CRM Deal")
+
+	field_map = {}
+	for field in lead_meta.fields:
+		if field.fieldtype in RESTRICTED_MAP_FIELDTYPES or field.fieldname in RESTRICTED_MAP_FIELDS:
+			continue
+
+		fieldname = LEAD_DEAL_FIELD_MAP.get(field.fieldname, field.fieldname)
+		if deal_meta.has_field(fieldname):
+			field_map[field.fieldname] = fieldname
+
+	return field_map
+
+
 @frappe.whitelist()
 def convert_to_deal(lead, doc=None, deal=None, existing_contact=None, existing_organization=None):
 	if not (doc and doc.flags.get("ignore_permissions")) and not frappe.has_permission(
@@ -464,7 +481,7 @@ def convert_to_deal(lead, doc=None, deal=None, existing_contact=None, existing_o
 		frappe.throw(_("Not allowed to convert Lead to Deal"), frappe.PermissionError)
 
 	lead = frappe.get_cached_doc("CRM Lead", lead)
-	if frappe.db.exists("CRM Lead Status", "Qualified"):
+	if get_status_info("CRM Lead", "Qualified"):
 		lead.db_set("status", "Qualified")
 	lead.db_set("converted", 1)
 	if lead.sla and frappe.db.exists("CRM Communication Status", "Replied"):
@@ -1,10 +1,13 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
+from unittest.mock import patch
+
 import frappe
 from frappe.tests import IntegrationTestCase
 
-from crm.fcrm.doctype.crm_lead.crm_lead import convert_to_deal
+from crm.fcrm.doctype.crm_lead.bulk_convert import convert_leads_to_deals
+from crm.fcrm.doctype.crm_lead.crm_lead import CRMLead, convert_to_deal
 
 
 class TestCRMLead(IntegrationTestCase):
@@ -504,6 +507,88 @@ class TestCRMLead(IntegrationTestCase):
 		self.assertEqual(deal.annual_revenue, 750000)
 		self.assertEqual(deal.job_title, "CEO")
 
+	def test_bulk_convert_to_deal(self):
+		"""Test converting many leads at once reuses contacts and organizations"""
+		existing_contact = frappe.get_doc(
+			{
+				"doctype": "Contact",
+				"first_name": "Bulk",
+				"email_ids": [{"email_id": "bulk.existing@example.com", "is_primary": 1}],
+			}
+		).insert()
+
+		leads = [
+			create_lead(first_name="Bulk", email="bulk.existing@example.com", organization="Bulk Corp"),
+			create_lead(first_name="Bulk Two", email="bulk.two@example.com", organization="Bulk Corp"),
+			create_lead(first_name="Bulk Three", email="bulk.three@example.com"),
+		]
+
+		result = convert_leads_to_deals([lead.name for lead in leads], chunk_size=2)
+
+		self.assertFalse(result["failed"])
+		self.assertEqual(len(result["deals"]), 3)
+		self.assertEqual(frappe.db.count("CRM Organization", {"organization_name": "Bulk Corp"}), 1)
+
+		first_deal = frappe.get_doc("CRM Deal", result["deals"][leads[0].name])
+		self.assertEqual(first_deal.contacts[0].contact, existing_contact.name)
+		self.assertEqual(first_deal.lead, leads[0].name)
+
+		for lead in leads:
+			self.assertEqual(frappe.db.get_value("CRM Lead", lead.name, "converted"), 1)
+
+		# converting again is reported instead of creating duplicate deals
+		result = convert_leads_to_deals([leads[0].name])
+		self.assertIn(leads[0].name, result["failed"])
+
+	def test_bulk_convert_publishes_failures(self):
+		"""Test a background conversion tells the user which leads failed"""
+		lead = create_lead(first_name="Notify")
+
+		with patch("frappe.publish_realtime") as publish_realtime:
+			convert_leads_to_deals([lead.name, "CRM-LEAD-MISSING"], notify=True)
+
+		event, data = publish_realtime.call_args.args
+		self.assertEqual(event, "crm_bulk_convert")
+		self.assertEqual(data["converted"], 1)
+		self.assertEqual(list(data["failed"]), ["CRM-LEAD-MISSING"])
+
+	def test_bulk_convert_failure_does_not_leak_records(self):
+		"""Test contacts and organizations rolled back with a failed lead are not reused"""
+		existing_organization = frappe.get_doc(
+			{"doctype": "CRM Organization", "organization_name": "Bulk Existing Corp"}
+		).insert()
+		leads = [
+			create_lead(
+				first_name="Fail", email="bulk.rollback@example.com", organization="Bulk Rollback Corp"
+			),
+			create_lead(
+				first_name="Pass", email="bulk.rollback@example.com", organization="Bulk Rollback Corp"
+			),
+			create_lead(first_name="Existing", organization="Bulk Existing Corp"),
+		]
+		create_deal = CRMLead.create_deal
+
+		def fail_first_lead(lead, *args, **kwargs):
+			if lead.name == leads[0].name:
+				frappe.throw("Deal could not be created")
+			return create_deal(lead, *args, **kwargs)
+
+		with patch.object(CRMLead, "create_deal", fail_first_lead):
+			result = convert_leads_to_deals([lead.name for lead in leads])
+
+		self.assertEqual(list(result["failed"]), [leads[0].name])
+		deal = frappe.get_doc("CRM Deal", result["deals"][leads[1].name])
+		self.assertTrue(frappe.db.exists("Contact", deal.contacts[0].contact))
+		self.assertTrue(frappe.db.exists("CRM Organization", deal.organization))
+		self.assertEqual(frappe.db.count("CRM Organization", {"organization_name": "Bulk Rollback Corp"}), 1)
+		existing_deal = result["deals"][leads[2].name]
+		self.assertEqual(
+			frappe.db.get_value("CRM Deal", existing_deal, "organization"), existing_organization.name
+		)
+		self.assertEqual(
+			frappe.db.get_value("CRM Lead", leads[2].name, "organization"), existing_organization.name
+		)
+
 
 def create_lead(**kwargs):
 	"""Helper function to create a CRM Lead for testing"""
@@ -1,10 +1,25 @@
 # Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import hashlib
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
 
+# fields two notifications must share to be considered the same notification
+NOTIFICATION_HASH_FIELDS = (
+	"from_user",
+	"to_user",
+	"type",
+	"message",
+	"notification_text",
+	"notification_type_doctype",
+	"notification_type_doc",
+	"reference_doctype",
+	"reference_name",
+)
+
 
 class CRMNotification(Document):
 	# begin: auto-generated types
@@ -18,6 +33,7 @@ class CRMNotification(Document):
 		comment: DF.Link | None
 		from_user: DF.Link | None
 		message: DF.HTMLEditor | None
+		notification_hash: DF.Data | None
 		notification_text: DF.Text | None
 		notification_type_doc: DF.DynamicLink | None
 		notification_type_doctype: DF.Link | None
@@ -28,32 +44,76 @@ class CRMNotification(Document):
 		type: DF.Literal["Mention", "Task", "Assignment", "WhatsApp"]
 	# end: auto-generated types
 
+	def before_insert(self):
+		if not self.notification_hash:
+			self.notification_hash = get_notification_hash(self)
+
 	def on_update(self):
 		if self.to_user:
-			frappe.publish_realtime("crm_notification", user=self.to_user)
+			frappe.publish_realtime("crm_notification", user=self.to_user, after_commit=True)
+
+
+def get_notification_hash(values) -> str:
+	key = frappe.as_json([values.get(field) or "" for field in NOTIFICATION_HASH_FIELDS], indent=None)
+	return hashlib.sha256(key.encode()).hexdigest()
 
 
 def notify_user(args):
 	"""
 	Notify the assigned user
 	"""
-	args = frappe._dict(args)
-	if args.owner == args.assigned_to:
+	notify_users([args])
+
+
+def notify_users(notifications: list[dict]):
+	"""
+	Create CRM Notifications for many recipients at once.
+
+	Every item takes the same arguments as `notify_user`. Notifications already sent
+	(or repeated in `notifications`) are skipped using one lookup on the indexed
+	`notification_hash`, the rest are bulk inserted and each recipient gets a single
+	realtime event after commit.
+	"""
+	rows = {}
+	for args in notifications:
+		args = frappe._dict(args)
+		if not args.assigned_to or args.owner == args.assigned_to:
+			continue
+
+		values = frappe._dict(
+			from_user=args.owner,
+			to_user=args.assigned_to,
+			type=args.notification_type,
+			message=args.message,
+			notification_text=args.notification_text,
+			notification_type_doctype=args.reference_doctype,
+			notification_type_doc=args.reference_docname,
+			reference_doctype=args.redirect_to_doctype,
+			reference_name=args.redirect_to_docname,
+		)
+		rows.setdefault(get_notification_hash(values), values)
+
+	if not rows:
 		return
 
-	values = frappe._dict(
-		doctype="CRM Notification",
-		from_user=args.owner,
-		to_user=args.assigned_to,
-		type=args.notification_type,
-		message=args.message,
-		notification_text=args.notification_text,
-		notification_type_doctype=args.reference_doctype,
-		notification_type_doc=args.reference_docname,
-		reference_doctype=args.redirect_to_doctype,
-		reference_name=args.redirect_to_docname,
+	existing = frappe.get_all(
+		"CRM Notification", filters={"notification_hash": ["in", list(rows)]}, pluck="notification_hash"
 	)
+	for notification_hash in existing:
+		rows.pop(notification_hash, None)
 
-	if frappe.db.exists("CRM Notification", values):
+	if not rows:
 		return
-	frappe.get_doc(values).insert(ignore_permissions=True)
+
+	now = frappe.utils.now()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "read", "notification_hash"]
+	fields += list(NOTIFICATION_HASH_FIELDS)
+	records = [
+		[frappe.generate_hash(length=10), now, now, frappe.session.user, frappe.session.user, 0, h]
+		+ [row[field] for field in NOTIFICATION_HASH_FIELDS]
+		for h, row in rows.items()
+	]
+	frappe.db.bulk_insert("CRM Notification", fields, records)
+
+	for user in {row.to_user for row in rows.values()}:
+		frappe.publish_realtime("crm_notification", user=user, after_commit=True)
@@ -1,9 +1,36 @@
 # Copyright (c) 2024, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import UnitTestCase
+import frappe
+from frappe.tests import IntegrationTestCase
 
+from crm.fcrm.doctype.crm_notification.crm_notification import notify_users
 
-class TestCRMNotification(UnitTestCase):
-	pass
+
+class TestCRMNotification(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_notify_users_skips_duplicates(self):
+		notification = {
+			"owner": "Administrator",
+			"assigned_to": "Guest",
+			"notification_type": "Mention",
+			"message": "Hello",
+			"notification_text": "Administrator mentioned you",
+			"redirect_to_doctype": "CRM Lead",
+			"redirect_to_docname": "CRM-LEAD-TEST",
+		}
+
+		# repeated in the same call, for the sender itself and in a later call
+		notify_users([notification, notification, {**notification, "assigned_to": "Administrator"}])
+		notify_users([notification])
+
+		notifications = frappe.get_all(
+			"CRM Notification",
+			filters={"reference_name": "CRM-LEAD-TEST"},
+			fields=["to_user", "notification_hash"],
+		)
+		self.assertEqual(len(notifications), 1)
+		self.assertEqual(notifications[0].to_user, "Guest")
+		self.assertTrue(notifications[0].notification_hash)
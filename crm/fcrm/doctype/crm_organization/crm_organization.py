@@ -4,7 +4,7 @@
 import frappe
 from frappe.model.document import Document
 
-from crm.fcrm.doctype.fcrm_settings.fcrm_settings import get_exchange_rate
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import get_cached_exchange_rate
 
 
 class CRMOrganization(Document):
@@ -36,7 +36,7 @@ class CRMOrganization(Document):
 			system_currency = frappe.db.get_single_value("FCRM Settings", "currency") or "USD"
 			exchange_rate = 1
 			if self.currency and self.currency != system_currency:
-				exchange_rate = get_exchange_rate(self.currency, system_currency)
+				exchange_rate = get_cached_exchange_rate(self.currency, system_currency)
 
 			self.db_set("exchange_rate", exchange_rate)
 
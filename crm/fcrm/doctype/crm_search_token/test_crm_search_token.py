@@ -0,0 +1,45 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.search import search
+
+
+class TestCRMSearchToken(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_index_is_maintained_from_doc_events(self):
+		org = frappe.get_doc(
+			{"doctype": "CRM Organization", "organization_name": "Zyxwv Widgets International"}
+		).insert()
+
+		results = search("zyxwv wid", doctypes=["CRM Organization"])
+		self.assertEqual([r["name"] for r in results], [org.name])
+		self.assertEqual(results[0]["title"], "Zyxwv Widgets International")
+
+		org.website = "https://zyxwv.example.com"
+		org.save()
+		self.assertTrue(search("zyxwv.example", doctypes=["CRM Organization"]))
+
+		org.delete()
+		self.assertFalse(search("zyxwv", doctypes=["CRM Organization"]))
+
+	def test_email_domains_are_searchable(self):
+		lead = frappe.get_doc(
+			{"doctype": "CRM Lead", "first_name": "Domain Lead", "email": "jane.doe@zyxwvacme.com"}
+		).insert()
+
+		for txt in ("zyxwvacme.com", "jane.doe@zyxwv", "jane"):
+			results = search(txt, doctypes=["CRM Lead"])
+			self.assertIn(lead.name, [r["name"] for r in results], txt)
+
+	def test_every_word_must_match_and_exact_matches_rank_first(self):
+		for organization_name in ("Qwertyuiop Labs", "Qwerty Labs", "Qwerty Foods"):
+			frappe.get_doc({"doctype": "CRM Organization", "organization_name": organization_name}).insert()
+
+		results = search("qwerty labs", doctypes=["CRM Organization"])
+		self.assertEqual([r["title"] for r in results], ["Qwerty Labs", "Qwertyuiop Labs"])
+		self.assertFalse(search("qwerty zzzz", doctypes=["CRM Organization"]))
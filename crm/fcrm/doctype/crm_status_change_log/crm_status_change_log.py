@@ -7,6 +7,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import add_to_date, get_datetime
 
+from crm.utils.status_catalog import get_status_type
+
 
 class CRMStatusChangeLog(Document):
 	# begin: auto-generated types
@@ -43,13 +45,11 @@ def get_duration(from_date, to_date):
 
 
 def add_status_change_log(doc):
-	to_status_type = frappe.db.get_value("CRM Deal Status", doc.status, "type") if doc.status else None
+	to_status_type = get_status_type(doc.doctype, doc.status)
 
 	if not doc.is_new():
 		previous_status = doc.get_doc_before_save().status if doc.get_doc_before_save() else None
-		previous_status_type = (
-			frappe.db.get_value("CRM Deal Status", previous_status, "type") if previous_status else None
-		)
+		previous_status_type = get_status_type(doc.doctype, previous_status)
 		if not doc.status_change_log and previous_status:
 			now_minus_one_minute = add_to_date(datetime.now(), minutes=-1)
 			doc.append(
@@ -3,9 +3,12 @@
 import json
 
 import frappe
+from frappe import _
 from frappe.model.document import Document, get_controller
 from frappe.utils import parse_json
 
+from crm.api.views import clear_views_cache
+
 
 class CRMViewSettings(Document):
 	# begin: auto-generated types
@@ -39,7 +42,11 @@ class CRMViewSettings(Document):
 		user: DF.Link | None
 	# end: auto-generated types
 
-	pass
+	def on_update(self):
+		clear_views_cache()
+
+	def on_trash(self):
+		clear_views_cache()
 
 
 @frappe.whitelist()
@@ -124,22 +131,49 @@ def delete(name):
 
 @frappe.whitelist()
 def public(name, value):
+	set_view_public(name, value)
+	clear_views_cache()
+
+
+@frappe.whitelist()
+def pin(name, value):
+	set_view_pinned(name, value)
+	clear_views_cache()
+
+
+@frappe.whitelist()
+def update_views(mutations):
+	"""
+	Apply a batch of view changes, e.g. the ones a burst of column drags queues up, with one
+	write per view and one cache invalidation.
+
+	`mutations` is a list of `{"action": ..., **arguments}` where the action is one of
+	`VIEW_MUTATIONS`.
+	"""
+	for mutation in parse_json(mutations) or []:
+		mutation = frappe._dict(mutation)
+		action = VIEW_MUTATIONS.get(mutation.pop("action", None))
+		if not action:
+			frappe.throw(_("Invalid view action"))
+		action(**mutation)
+
+	clear_views_cache()
+
+
+def set_view_public(name, value):
 	if frappe.session.user != "Administrator" and "Sales Manager" not in frappe.get_roles():
 		frappe.throw("Not permitted", frappe.PermissionError)
 
-	doc = frappe.get_doc("CRM View Settings", name)
-	if doc.pinned:
-		doc.pinned = False
-	doc.public = value
-	doc.user = "" if value else frappe.session.user
-	doc.save()
+	frappe.has_permission("CRM View Settings", "write", name, throw=True)
+	values = {"public": value, "user": "" if value else frappe.session.user}
+	if frappe.db.get_value("CRM View Settings", name, "pinned"):
+		values["pinned"] = False
+	frappe.db.set_value("CRM View Settings", name, values)
 
 
-@frappe.whitelist()
-def pin(name, value):
-	doc = frappe.get_doc("CRM View Settings", name)
-	doc.pinned = value
-	doc.save()
+def set_view_pinned(name, value):
+	frappe.has_permission("CRM View Settings", "write", name, throw=True)
+	frappe.db.set_value("CRM View Settings", name, "pinned", value)
 
 
 def remove_duplicates(l):
@@ -178,11 +212,16 @@ def sync_default_columns(view):
 
 @frappe.whitelist()
 def set_as_default(name=None, type=None, doctype=None):
+	set_default_view(name, type, doctype)
+	clear_views_cache()
+
+
+def set_default_view(name=None, type=None, doctype=None):
 	if name:
+		frappe.has_permission("CRM View Settings", "write", name, throw=True)
 		frappe.db.set_value("CRM View Settings", name, "is_default", 1)
 	else:
-		doc = create_or_update_standard_view({"type": type, "doctype": doctype, "is_default": 1})
-		name = doc.name
+		name = upsert_standard_view({"type": type, "doctype": doctype, "is_default": 1})
 
 	# remove default from other views of same user
 	frappe.db.set_value(
@@ -195,7 +234,17 @@ def set_as_default(name=None, type=None, doctype=None):
 
 @frappe.whitelist()
 def create_or_update_standard_view(view):
-	view = frappe._dict(view)
+	name = upsert_standard_view(view)
+	clear_views_cache()
+	return name
+
+
+def upsert_standard_view(view) -> str | int:
+	"""
+	Create the current user's standard view of a doctype and type, or update it in place with a
+	single write. Returns the name of the view.
+	"""
+	view = frappe._dict(parse_json(view))
 
 	filters = parse_json(view.filters) or {}
 	columns = parse_json(view.columns or "[]")
@@ -213,57 +262,46 @@ def create_or_update_standard_view(view):
 	elif not columns:
 		columns = sync_default_columns(view)
 
-	doc = frappe.db.exists(
+	values = {
+		"type": view.type or "list",
+		"route_name": view.route_name or get_route_name(view.doctype),
+		"load_default_columns": view.load_default_columns or False,
+		"filters": json.dumps(filters),
+		"order_by": view.order_by or "modified desc",
+		"group_by_field": view.group_by_field or "owner",
+		"column_field": view.column_field,
+		"title_field": view.title_field,
+		"kanban_columns": json.dumps(kanban_columns),
+		"kanban_fields": json.dumps(kanban_fields),
+		"columns": json.dumps(columns),
+		"rows": json.dumps(rows),
+		"is_default": view.is_default or False,
+	}
+
+	name = frappe.db.exists(
 		"CRM View Settings",
 		{"dt": view.doctype, "type": view.type or "list", "is_standard": True, "user": frappe.session.user},
 	)
-	if doc:
-		doc = frappe.get_doc("CRM View Settings", doc)
-		doc.label = view.label
-		doc.type = view.type or "list"
-		doc.route_name = view.route_name or get_route_name(view.doctype)
-		doc.load_default_columns = view.load_default_columns or False
-		doc.filters = json.dumps(filters)
-		doc.order_by = view.order_by or "modified desc"
-		doc.group_by_field = view.group_by_field or "owner"
-		doc.column_field = view.column_field
-		doc.title_field = view.title_field
-		doc.kanban_columns = json.dumps(kanban_columns)
-		doc.kanban_fields = json.dumps(kanban_fields)
-		doc.columns = json.dumps(columns)
-		doc.rows = json.dumps(rows)
-		doc.is_default = view.is_default or False
-		doc.save()
-	else:
-		doc = frappe.new_doc("CRM View Settings")
-
-		label = "List"
-		if view.type == "group_by":
-			label = "Group By"
-		elif view.type == "kanban":
-			label = "Kanban"
-
-		doc.name = view.label or label
-		doc.label = view.label or label
-		doc.type = view.type or "list"
-		doc.dt = view.doctype
-		doc.user = frappe.session.user
-		doc.route_name = view.route_name or get_route_name(view.doctype)
-		doc.load_default_columns = view.load_default_columns or False
-		doc.filters = json.dumps(filters)
-		doc.order_by = view.order_by or "modified desc"
-		doc.group_by_field = view.group_by_field or "owner"
-		doc.column_field = view.column_field
-		doc.title_field = view.title_field
-		doc.kanban_columns = json.dumps(kanban_columns)
-		doc.kanban_fields = json.dumps(kanban_fields)
-		doc.columns = json.dumps(columns)
-		doc.rows = json.dumps(rows)
-		doc.is_standard = True
-		doc.is_default = view.is_default or False
-		doc.insert()
+	if name:
+		frappe.has_permission("CRM View Settings", "write", name, throw=True)
+		frappe.db.set_value("CRM View Settings", name, {"label": view.label, **values})
+		return name
 
-	return doc
+	label = "List"
+	if view.type == "group_by":
+		label = "Group By"
+	elif view.type == "kanban":
+		label = "Kanban"
+
+	doc = frappe.new_doc("CRM View Settings")
+	doc.update(values)
+	doc.name = view.label or label
+	doc.label = view.label or label
+	doc.dt = view.doctype
+	doc.user = frappe.session.user
+	doc.is_standard = True
+	doc.insert()
+	return doc.name
 
 
 def get_route_name(doctype):
@@ -275,3 +313,11 @@ def get_route_name(doctype):
 		doctype += "s"
 
 	return doctype
+
+
+VIEW_MUTATIONS = {
+	"standard_view": upsert_standard_view,
+	"set_as_default": set_default_view,
+	"pin": set_view_pinned,
+	"public": set_view_public,
+}
@@ -1,9 +1,58 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import UnitTestCase
+import json
 
+import frappe
+from frappe.tests import IntegrationTestCase
 
-class TestCRMViewSettings(UnitTestCase):
-	pass
+from crm.api.doc import update_quick_filters
+from crm.api.views import clear_views_cache, get_views
+from crm.fcrm.doctype.crm_view_settings.crm_view_settings import update_views
+
+
+class TestCRMViewSettings(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.clear_cache(doctype="CRM Lead")
+		clear_views_cache()
+
+	def test_update_views_upserts_standard_view(self):
+		for order_by in ("modified desc", "creation asc"):
+			update_views([{"action": "standard_view", "view": {"doctype": "CRM Lead", "order_by": order_by}}])
+
+		views = [view for view in get_views("CRM Lead") if view.is_standard and view.type == "list"]
+		self.assertEqual(len(views), 1)
+		self.assertEqual(views[0].order_by, "creation asc")
+
+		update_views(
+			[
+				{"action": "pin", "name": views[0].name, "value": 1},
+				{"action": "set_as_default", "name": views[0].name},
+			]
+		)
+		view = next(view for view in get_views("CRM Lead") if view.name == views[0].name)
+		self.assertTrue(view.pinned)
+		self.assertTrue(view.is_default)
+
+		with self.assertRaises(frappe.ValidationError):
+			update_views([{"action": "rename", "name": views[0].name}])
+
+	def test_update_quick_filters(self):
+		update_quick_filters(json.dumps(["status", "source"]), json.dumps([]), "CRM Lead")
+		update_quick_filters(json.dumps(["status"]), json.dumps(["status", "source"]), "CRM Lead")
+
+		values = dict(
+			frappe.get_all(
+				"Property Setter",
+				filters={
+					"doc_type": "CRM Lead",
+					"property": "in_standard_filter",
+					"field_name": ("in", ["status", "source"]),
+				},
+				fields=["field_name", "value"],
+				as_list=True,
+			)
+		)
+		self.assertEqual(values, {"status": "1", "source": "0"})
+		self.assertFalse(frappe.get_meta("CRM Lead").get_field("source").in_standard_filter)
@@ -10,6 +10,8 @@ from frappe.frappeclient import FrappeClient
 from frappe.model.document import Document
 from frappe.utils import get_url_to_form, get_url_to_list
 
+from crm.utils.side_effects import defer_side_effect
+
 
 class ERPNextCRMSettings(Document):
 	# begin: auto-generated types
@@ -255,13 +257,32 @@ def get_organization_address(organization):
 	}
 
 
-def create_customer_in_erpnext(doc, method):
+def queue_customer_creation_in_erpnext(doc, method):
+	"""Validate inline so the user still sees a missing organization, but create the
+	customer in ERPNext after the deal is committed."""
+	if not should_create_customer_in_erpnext(doc):
+		return
+
+	if not doc.organization:
+		frappe.throw(_("Organization is required to create a customer"))
+
+	defer_side_effect(
+		doc, "crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
+	)
+
+
+def should_create_customer_in_erpnext(doc):
+	erpnext_crm_settings = frappe.get_cached_doc("ERPNext CRM Settings")
+	return (
+		erpnext_crm_settings.enabled
+		and erpnext_crm_settings.create_customer_on_status_change
+		and doc.status == erpnext_crm_settings.deal_status
+	)
+
+
+def create_customer_in_erpnext(doc, method=None):
 	erpnext_crm_settings = frappe.get_single("ERPNext CRM Settings")
-	if (
-		not erpnext_crm_settings.enabled
-		or not erpnext_crm_settings.create_customer_on_status_change
-		or doc.status != erpnext_crm_settings.deal_status
-	):
+	if not should_create_customer_in_erpnext(doc):
 		return
 
 	if not doc.organization:
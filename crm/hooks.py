@@ -93,6 +93,11 @@ after_install = "crm.install.after_install"
 before_uninstall = "crm.uninstall.before_uninstall"
 # after_uninstall = "crm.uninstall.after_uninstall"
 
+# Sessions
+# ------------
+
+on_logout = ["crm.api.presence.on_logout"]
+
 # Integration Setup
 # ------------------
 # To set up dependencies/integrations with other apps
@@ -132,6 +137,7 @@ before_uninstall = "crm.uninstall.before_uninstall"
 # Override standard doctype classes
 
 override_doctype_class = {
+	"Assignment Rule": "crm.overrides.assignment_rule.CustomAssignmentRule",
 	"Contact": "crm.overrides.contact.CustomContact",
 	"Email Template": "crm.overrides.email_template.CustomEmailTemplate",
 }
@@ -143,6 +149,43 @@ override_doctype_class = {
 doc_events = {
 	"Contact": {
 		"validate": ["crm.api.contact.validate"],
+		"on_update": ["crm.utils.search_index.update_search_index"],
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": [
+			"crm.utils.search_index.remove_from_search_index",
+			"crm.api.doc.clear_list_totals",
+		],
+		"after_rename": ["crm.utils.search_index.rename_in_search_index"],
+	},
+	"CRM Lead": {
+		"on_update": ["crm.utils.search_index.update_search_index"],
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": [
+			"crm.utils.search_index.remove_from_search_index",
+			"crm.api.doc.clear_list_totals",
+		],
+		"after_rename": ["crm.utils.search_index.rename_in_search_index"],
+	},
+	"CRM Organization": {
+		"on_update": ["crm.utils.search_index.update_search_index"],
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": [
+			"crm.utils.search_index.remove_from_search_index",
+			"crm.api.doc.clear_list_totals",
+		],
+		"after_rename": ["crm.utils.search_index.rename_in_search_index"],
+	},
+	"CRM Task": {
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": ["crm.api.doc.clear_list_totals"],
+	},
+	"CRM Note": {
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": ["crm.api.doc.clear_list_totals"],
+	},
+	"CRM Call Log": {
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": ["crm.api.doc.clear_list_totals"],
 	},
 	"ToDo": {
 		"after_insert": ["crm.api.todo.after_insert"],
@@ -157,12 +200,32 @@ doc_events = {
 	},
 	"CRM Deal": {
 		"on_update": [
-			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
+			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.queue_customer_creation_in_erpnext"
 		],
+		"on_change": ["crm.api.doc.clear_list_totals"],
+		"on_trash": ["crm.api.doc.clear_list_totals"],
 	},
 	"User": {
 		"before_validate": ["crm.api.demo.validate_user"],
 		"validate_reset_password": ["crm.api.demo.validate_reset_password"],
+		"on_update": [
+			"crm.api.session.clear_user_directory_cache",
+			"crm.integrations.twilio.routing.clear_number_routes",
+		],
+		"on_trash": [
+			"crm.api.session.clear_user_directory_cache",
+			"crm.integrations.twilio.routing.clear_number_routes",
+		],
+	},
+	"CRM Telephony Agent": {
+		"on_update": [
+			"crm.api.session.clear_user_directory_cache",
+			"crm.integrations.twilio.routing.clear_number_routes",
+		],
+		"on_trash": [
+			"crm.api.session.clear_user_directory_cache",
+			"crm.integrations.twilio.routing.clear_number_routes",
+		],
 	},
 }
 
@@ -172,7 +235,11 @@ doc_events = {
 scheduler_events = {
 	"all": ["crm.api.event.trigger_offset_event_notifications"],
 	"hourly": ["crm.api.event.trigger_hourly_event_notifications"],
-	"daily": ["crm.api.event.trigger_daily_event_notifications"],
+	"daily": [
+		"crm.api.event.trigger_daily_event_notifications",
+		"crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate.prefetch_exchange_rates",
+		"crm.api.export.delete_old_exports",
+	],
 	"weekly": ["crm.api.event.trigger_weekly_event_notifications"],
 	"daily_long": ["crm.lead_syncing.background_sync.sync_leads_from_sources_daily"],
 	"hourly_long": ["crm.lead_syncing.background_sync.sync_leads_from_sources_hourly"],
@@ -212,6 +279,12 @@ scheduler_events = {
 
 ignore_links_on_delete = ["Failed Lead Sync Log"]
 
+# Lead Sync Source type -> connector class, see crm.lead_syncing.connector
+lead_sync_connectors = {
+	"Facebook": "crm.lead_syncing.doctype.lead_sync_source.facebook.FacebookSyncSource",
+	"File": "crm.lead_syncing.doctype.lead_sync_source.file_import.FileSyncSource",
+}
+
 # Request Events
 # ----------------
 # before_request = ["crm.utils.before_request"]
@@ -256,6 +329,15 @@ ignore_links_on_delete = ["Failed Lead Sync Log"]
 after_migrate = [
 	"crm.fcrm.doctype.fcrm_settings.fcrm_settings.after_migrate",
 	"crm.api.whatsapp.add_roles",
+	"crm.utils.link_topology.rebuild_link_topology",
+]
+
+clear_cache = [
+	"crm.utils.link_topology.clear_link_topology_cache",
+	"crm.utils.status_catalog.clear_status_catalog",
+	"crm.fcrm.doctype.crm_fields_layout.crm_fields_layout.clear_fields_layout_cache",
+	"crm.integrations.twilio.routing.clear_number_routes",
+	"crm.api.views.clear_views_cache",
 ]
 
 standard_dropdown_items = [
@@ -0,0 +1,242 @@
+"""
+Call events from telephony webhooks.
+
+Every provider webhook is turned into a call event keyed by the call SID and pushed
+to a Redis list. A background job drains the list and applies the events to the
+`CRM Call Log` in order, as a state machine: a call never moves back to an earlier
+status and a finished call keeps its final status, so late, repeated or out of
+order callbacks can not overwrite newer ones. However many events arrive in a
+burst, the call log is written once per drain and the webhook request logs that
+came with them are inserted together.
+"""
+
+import json
+
+import frappe
+from frappe.utils import now
+
+from crm.api.presence import set_call_presence
+from crm.utils.side_effects import run_inline
+
+CALL_EVENTS_CACHE_KEY = "crm_call_events"
+CALL_EVENTS_FLUSH_CACHE_KEY = "crm_call_events_flush"
+# events of a call that is never flushed are dropped after this many seconds
+CALL_EVENTS_TTL = 24 * 60 * 60
+
+# statuses of the same rank can follow each other, a final status is never changed
+STATUS_RANK = {
+	"Queued": 0,
+	"Initiated": 0,
+	"Ringing": 1,
+	"In Progress": 2,
+	"Completed": 3,
+	"Busy": 3,
+	"No Answer": 3,
+	"Failed": 3,
+	"Canceled": 3,
+}
+FINAL_STATUS_RANK = 3
+
+
+def make_call_event(
+	provider: str,
+	call_sid: str,
+	status: str | None = None,
+	fields: dict | None = None,
+	create: dict | None = None,
+	fetch: dict | None = None,
+	request: dict | None = None,
+) -> dict:
+	"""
+	:param provider: `telephony_medium` of the call log
+	:param call_sid: Name of the call log
+	:param status: Call status as reported by the provider, `in-progress` and `In Progress`
+	        are the same and unknown statuses are ignored
+	:param fields: Other call log fields set by the event, empty values are ignored
+	:param create: `{"method", "kwargs"}` called to create the call log if it does not exist
+	:param fetch: `{"method", "kwargs"}` called from the background job, returning more fields
+	:param request: `{"data", "headers", "description", "service"}` of the webhook, recorded as
+	        an Integration Request
+	"""
+	return {
+		"provider": provider,
+		"call_sid": call_sid,
+		"status": normalize_status(status),
+		"fields": {key: value for key, value in (fields or {}).items() if value not in (None, "")},
+		"create": create,
+		"fetch": fetch,
+		"request": request,
+	}
+
+
+def normalize_status(status: str | None) -> str | None:
+	if not status:
+		return None
+	status = " ".join(str(status).split("-")).title()
+	return status if status in STATUS_RANK else None
+
+
+def queue_call_event(event: dict):
+	"""Apply `event` to its call log from a background job, together with the events after it."""
+	if run_inline():
+		process_call_events(event["call_sid"], [event])
+		return
+
+	key = frappe.cache.make_key(f"{CALL_EVENTS_CACHE_KEY}|{event['call_sid']}")
+	pipeline = frappe.cache.pipeline()
+	pipeline.rpush(key, json.dumps(event, default=str))
+	pipeline.expire(key, CALL_EVENTS_TTL)
+	pipeline.execute()
+
+	# one job per burst, the flag is cleared by the job before it drains the events
+	flag = frappe.cache.make_key(f"{CALL_EVENTS_FLUSH_CACHE_KEY}|{event['call_sid']}")
+	if frappe.cache.set(flag, 1, nx=True, ex=CALL_EVENTS_TTL):
+		frappe.enqueue(
+			"crm.integrations.call_events.flush_call_events",
+			queue="short",
+			call_sid=event["call_sid"],
+		)
+
+
+def flush_call_events(call_sid: str):
+	frappe.cache.delete_value(f"{CALL_EVENTS_FLUSH_CACHE_KEY}|{call_sid}")
+	events = pop_call_events(call_sid)
+	if events:
+		process_call_events(call_sid, events)
+
+
+def pop_call_events(call_sid: str) -> list[dict]:
+	key = frappe.cache.make_key(f"{CALL_EVENTS_CACHE_KEY}|{call_sid}")
+	pipeline = frappe.cache.pipeline()
+	pipeline.lrange(key, 0, -1)
+	pipeline.delete(key)
+	rows, _ = pipeline.execute()
+	return [json.loads(row) for row in rows]
+
+
+def process_call_events(call_sid: str, events: list[dict]):
+	status, error = "Completed", None
+	try:
+		apply_call_events(call_sid, events)
+	except Exception:
+		if frappe.flags.in_test:
+			raise
+		frappe.db.rollback()
+		status, error = "Failed", frappe.get_traceback()
+		frappe.log_error(title="Error while creating/updating call record")
+
+	insert_request_logs(events, status, error)
+
+
+def apply_call_events(call_sid: str, events: list[dict]):
+	"""Apply `events`, in the order they arrived, with one write to the call log."""
+	if not frappe.db.exists("CRM Call Log", call_sid) and not create_call_log(call_sid, events):
+		return
+
+	call_log = frappe.get_doc("CRM Call Log", call_sid, for_update=True)
+	fetched = {}
+	changed = False
+	for event in events:
+		fields = dict(event["fields"])
+		if event.get("fetch"):
+			spec = json.dumps(event["fetch"], sort_keys=True)
+			if spec not in fetched:
+				fetched[spec] = call_method(event["fetch"]) or {}
+			fields = {**fetched[spec], **fields}
+
+		fetched_status = fields.pop("status", None)
+		status = event["status"] or normalize_status(fetched_status)
+		changed |= apply_call_event(call_log, status, fields)
+
+	if changed:
+		call_log.save(ignore_permissions=True)
+		update_agent_presence(call_log)
+	return call_log
+
+
+def update_agent_presence(call_log):
+	agent = call_log.receiver if call_log.type == "Incoming" else call_log.caller
+	if call_log.status == "In Progress":
+		set_call_presence(agent, on_call=True)
+	elif STATUS_RANK.get(call_log.status) == FINAL_STATUS_RANK:
+		set_call_presence(agent, on_call=False)
+
+
+def apply_call_event(call_log, status: str | None, fields: dict) -> bool:
+	"""
+	Move `call_log` to `status` if that is not a step back, and set `fields`.
+
+	Fields of a stale event, one whose status was not applied, only fill in empty values.
+	"""
+	current_rank = STATUS_RANK.get(call_log.status, -1)
+	stale = False
+	changed = False
+	if status and status != call_log.status:
+		if current_rank < FINAL_STATUS_RANK and STATUS_RANK[status] >= current_rank:
+			call_log.status = status
+			changed = True
+		else:
+			stale = True
+
+	for fieldname, value in fields.items():
+		if stale and call_log.get(fieldname):
+			continue
+		if call_log.get(fieldname) != value:
+			call_log.set(fieldname, value)
+			changed = True
+
+	return changed
+
+
+def create_call_log(call_sid: str, events: list[dict]) -> bool:
+	for event in events:
+		if event.get("create"):
+			call_method(event["create"])
+			if frappe.db.exists("CRM Call Log", call_sid):
+				return True
+	return False
+
+
+def call_method(spec: dict):
+	return frappe.get_attr(spec["method"])(**(spec.get("kwargs") or {}))
+
+
+def insert_request_logs(events: list[dict], status: str, error: str | None = None):
+	timestamp = now()
+	values = [
+		(
+			frappe.generate_hash(length=10),
+			timestamp,
+			timestamp,
+			"Guest",
+			"Guest",
+			request.get("description"),
+			request.get("service"),
+			1,
+			json.dumps(request.get("data"), default=str),
+			json.dumps(request.get("headers"), default=str),
+			status,
+			error,
+		)
+		for request in (event.get("request") for event in events)
+		if request
+	]
+	if values:
+		frappe.db.bulk_insert(
+			"Integration Request",
+			[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"request_description",
+				"integration_request_service",
+				"is_remote_request",
+				"data",
+				"request_headers",
+				"status",
+				"error",
+			],
+			values,
+		)
@@ -1,9 +1,9 @@
 import frappe
 import requests
 from frappe import _
-from frappe.integrations.utils import create_request_log
 
 from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.call_events import make_call_event, normalize_status, queue_call_event
 
 # Endpoints for webhook
 
@@ -22,47 +22,53 @@ def handle_request(**kwargs):
 	if not is_integration_enabled():
 		return
 
-	request_log = create_request_log(
-		kwargs,
-		request_description="Exotel Call",
-		service_name="Exotel",
-		request_headers=frappe.request.headers,
-		is_remote_request=1,
-	)
+	frappe.publish_realtime("exotel_call", kwargs)
+	queue_call_event(get_call_event(kwargs, request_headers=dict(frappe.request.headers)))
 
-	try:
-		request_log.status = "Completed"
-		exotel_settings = get_exotel_settings()
-		if not exotel_settings.enabled:
-			return
 
-		call_payload = kwargs
+def get_call_event(call_payload, request_headers=None):
+	"""Call event of an Exotel passthru or status callback payload."""
+	request = {
+		"data": call_payload,
+		"headers": request_headers,
+		"description": "Exotel Call",
+		"service": "Exotel",
+	}
+	if call_payload.get("Status") == "free":
+		# agent is free again, nothing changes on the call log
+		return make_call_event("Exotel", call_payload.get("CallSid"), request=request)
 
-		frappe.publish_realtime("exotel_call", call_payload)
-		status = call_payload.get("Status")
-		if status == "free":
-			return
-
-		if call_log := get_call_log(call_payload):
-			update_call_log(call_payload, call_log=call_log)
-		else:
-			create_call_log(
-				call_id=call_payload.get("CallSid"),
-				from_number=call_payload.get("CallFrom"),
-				to_number=call_payload.get("DialWhomNumber"),
-				medium=call_payload.get("To"),
-				status=get_call_log_status(call_payload),
-				agent=call_payload.get("AgentEmail"),
-			)
-	except Exception:
-		request_log.status = "Failed"
-		request_log.error = frappe.get_traceback()
-		frappe.db.rollback()
-		frappe.log_error(title="Error while creating/updating call record")
-		frappe.db.commit()
-	finally:
-		request_log.save(ignore_permissions=True)
-		frappe.db.commit()
+	direction = call_payload.get("Direction")
+	fields = {
+		# resetting this because call might be redirected to other number
+		"to": call_payload.get("DialWhomNumber") or call_payload.get("To"),
+		"duration": call_payload.get("DialCallDuration") or call_payload.get("ConversationDuration"),
+		"recording_url": call_payload.get("RecordingUrl"),
+		"start_time": call_payload.get("StartTime"),
+		"end_time": call_payload.get("EndTime"),
+	}
+	if direction == "incoming" and call_payload.get("AgentEmail"):
+		fields["receiver"] = call_payload.get("AgentEmail")
+
+	create = {
+		"method": "crm.integrations.exotel.handler.create_call_log",
+		"kwargs": {
+			"call_id": call_payload.get("CallSid"),
+			"from_number": call_payload.get("CallFrom"),
+			"to_number": call_payload.get("DialWhomNumber"),
+			"medium": call_payload.get("To"),
+			"status": normalize_status(get_call_log_status(call_payload)) or "Ringing",
+			"agent": call_payload.get("AgentEmail"),
+		},
+	}
+	return make_call_event(
+		"Exotel",
+		call_payload.get("CallSid"),
+		status=get_call_log_status(call_payload, direction),
+		fields=fields,
+		create=create,
+		request=request,
+	)
 
 
 # Outgoing Call
@@ -203,7 +209,6 @@ def create_call_log(
 	link(contact_number, call_log)
 
 	call_log.save(ignore_permissions=True)
-	frappe.db.commit()
 	return call_log
 
 
@@ -221,12 +226,6 @@ def link(contact_number, call_log):
 		call_log.link_with_reference_doc(doctype, docname)
 
 
-def get_call_log(call_payload):
-	call_log_id = call_payload.get("CallSid")
-	if frappe.db.exists("CRM Call Log", call_log_id):
-		return frappe.get_doc("CRM Call Log", call_log_id)
-
-
 def get_call_log_status(call_payload, direction="inbound"):
 	if direction == "outbound-api" or direction == "outbound-dial":
 		status = call_payload.get("Status")
@@ -256,32 +255,3 @@ def get_call_log_status(call_payload, direction="inbound"):
 		status = "Ringing"
 
 	return status
-
-
-def update_call_log(call_payload, status="Ringing", call_log=None):
-	direction = call_payload.get("Direction")
-	call_log = call_log or get_call_log(call_payload)
-	status = get_call_log_status(call_payload, direction)
-	try:
-		if call_log:
-			call_log.status = status
-			# resetting this because call might be redirected to other number
-			call_log.to = call_payload.get("DialWhomNumber") or call_payload.get("To")
-			call_log.duration = (
-				call_payload.get("DialCallDuration") or call_payload.get("ConversationDuration") or 0
-			)
-			call_log.recording_url = (
-				call_payload.get("RecordingUrl") if call_payload.get("RecordingUrl") else ""
-			)
-			call_log.start_time = call_payload.get("StartTime")
-			call_log.end_time = call_payload.get("EndTime")
-
-			if direction == "incoming" and call_payload.get("AgentEmail"):
-				call_log.receiver = call_payload.get("AgentEmail")
-
-			call_log.save(ignore_permissions=True)
-			frappe.db.commit()
-			return call_log
-	except Exception:
-		frappe.log_error(title="Error while updating call record")
-		frappe.db.commit()
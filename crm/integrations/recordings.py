@@ -0,0 +1,151 @@
+"""
+Call recordings.
+
+Call logs keep the provider's recording URL, but the desk only ever gets a short-lived
+signed URL to `stream_recording`. The first play downloads the recording from the
+provider, with the provider's credentials, into a local cache. Every play after that
+(and every seek, through HTTP range requests) is served from the site's disk. The cache
+is capped in size and the least recently played recordings are evicted first.
+"""
+
+import hashlib
+import hmac
+import mimetypes
+import os
+import time
+from urllib.parse import urlencode, urlparse
+
+import frappe
+import requests
+from frappe import _
+from frappe.utils.password import get_decrypted_password, get_encryption_key
+from werkzeug.utils import send_file
+
+# signed recording URLs stop working after this many seconds
+RECORDING_URL_TTL = 15 * 60
+RECORDING_CACHE_DIR = "crm_recordings"
+# default size of the recording cache, `crm_recording_cache_size_mb` in site config overrides it
+RECORDING_CACHE_SIZE_MB = 512
+RECORDING_DOWNLOAD_TIMEOUT = 30
+# only these hosts and their subdomains are sent the Exotel credentials
+EXOTEL_DOMAINS = ("exotel.com", "exotel.in")
+
+
+def get_recording_proxy_url(call_log: str) -> str:
+	"""Signed URL the recording of `call_log` can be played from for the next few minutes."""
+	expires = int(time.time()) + RECORDING_URL_TTL
+	query = urlencode({"call_log": call_log, "expires": expires, "signature": sign(call_log, expires)})
+	return f"/api/method/crm.integrations.recordings.stream_recording?{query}"
+
+
+def sign(call_log: str, expires: int) -> str:
+	message = f"{call_log}|{expires}".encode()
+	return hmac.new(get_encryption_key().encode(), message, hashlib.sha256).hexdigest()
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def stream_recording(call_log: str, expires: str, signature: str):
+	"""Serve a recording from the local cache, downloading it first if needed."""
+	expires = int(expires or 0)
+	if expires < time.time() or not hmac.compare_digest(sign(call_log, expires), signature or ""):
+		frappe.throw(_("This recording link has expired"), frappe.PermissionError)
+
+	recording_url, provider = frappe.db.get_value(
+		"CRM Call Log", call_log, ["recording_url", "telephony_medium"]
+	) or (None, None)
+	if not recording_url:
+		frappe.throw(_("Recording not found"), frappe.DoesNotExistError)
+
+	path = get_cached_recording(call_log, recording_url, provider)
+	return send_file(
+		path,
+		frappe.request.environ,
+		mimetype=mimetypes.guess_type(path)[0] or "audio/mpeg",
+		conditional=True,
+		max_age=RECORDING_URL_TTL,
+	)
+
+
+def get_cached_recording(call_log: str, recording_url: str, provider: str | None) -> str:
+	cache_dir = get_recording_cache_dir()
+	key = hashlib.sha1(f"{call_log}|{recording_url}".encode()).hexdigest()
+	for filename in os.listdir(cache_dir):
+		if filename.startswith(key):
+			path = os.path.join(cache_dir, filename)
+			# recently played recordings are evicted last
+			os.utime(path)
+			return path
+
+	path = download_recording(recording_url, provider, os.path.join(cache_dir, key))
+	evict_recordings(cache_dir, keep=path)
+	return path
+
+
+def download_recording(recording_url: str, provider: str | None, path: str) -> str:
+	url, auth = get_provider_request(recording_url, provider)
+	response = requests.get(url, auth=auth, stream=True, timeout=RECORDING_DOWNLOAD_TIMEOUT)
+	response.raise_for_status()
+
+	content_type = response.headers.get("Content-Type", "").split(";")[0]
+	path += mimetypes.guess_extension(content_type) or ".mp3"
+
+	# written under a temporary name so a concurrent play never serves a partial file
+	tmp_path = f"{path}.{frappe.generate_hash(length=8)}.tmp"
+	with open(tmp_path, "wb") as f:
+		for chunk in response.iter_content(chunk_size=64 * 1024):
+			f.write(chunk)
+	os.replace(tmp_path, path)
+	return path
+
+
+def get_provider_request(recording_url: str, provider: str | None):
+	"""URL to download a recording from and the credentials the provider requires."""
+	hostname = urlparse(recording_url).hostname or ""
+	if provider == "Twilio" and hostname == "api.twilio.com":
+		account_sid = frappe.db.get_single_value("CRM Twilio Settings", "account_sid")
+		auth_token = get_decrypted_password("CRM Twilio Settings", "CRM Twilio Settings", "auth_token")
+		# without an extension Twilio serves uncompressed wav
+		url = recording_url if os.path.splitext(recording_url)[1] else f"{recording_url}.mp3"
+		return url, (account_sid, auth_token)
+
+	if provider == "Exotel" and is_exotel_host(hostname):
+		settings = frappe.get_cached_doc("CRM Exotel Settings")
+		return recording_url, (settings.api_key, settings.get_password("api_token"))
+
+	return recording_url, None
+
+
+def is_exotel_host(hostname: str) -> bool:
+	return any(hostname == domain or hostname.endswith(f".{domain}") for domain in EXOTEL_DOMAINS)
+
+
+def get_recording_cache_dir() -> str:
+	path = frappe.get_site_path("private", RECORDING_CACHE_DIR)
+	os.makedirs(path, exist_ok=True)
+	return path
+
+
+def evict_recordings(cache_dir: str, keep: str | None = None):
+	"""Delete the least recently played recordings until the cache fits in its size limit."""
+	limit = (frappe.conf.get("crm_recording_cache_size_mb") or RECORDING_CACHE_SIZE_MB) * 1024 * 1024
+
+	entries = []
+	for filename in os.listdir(cache_dir):
+		path = os.path.join(cache_dir, filename)
+		try:
+			stat = os.stat(path)
+		except FileNotFoundError:
+			continue
+		entries.append((stat.st_mtime, stat.st_size, path))
+
+	size = sum(entry[1] for entry in entries)
+	for _mtime, file_size, path in sorted(entries):
+		if size <= limit:
+			break
+		if path == keep:
+			continue
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			pass
+		size -= file_size
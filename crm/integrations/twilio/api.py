@@ -5,9 +5,14 @@ from frappe import _
 from werkzeug.wrappers import Response
 
 from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.call_events import make_call_event, queue_call_event
 
 from .twilio_handler import IncomingCall, Twilio, TwilioCallDetails
 
+PENDING_CALL_LOG_CACHE_KEY = "crm_twilio_pending_call_log"
+# details of an incoming call are kept this long for its call log to be created from
+PENDING_CALL_LOG_TTL = 60 * 60
+
 
 def validate_twilio_request(args, require_application_sid: bool = False):
 	twilio = Twilio.connect()
@@ -76,16 +81,60 @@ def twilio_incoming_call_handler(**kwargs):
 	args = frappe._dict(kwargs)
 	validate_twilio_request(args)
 
-	call_details = TwilioCallDetails(args)
-	create_call_log(call_details)
+	incoming_call = IncomingCall(args.From, args.To)
+	resp = incoming_call.process()
 
-	resp = IncomingCall(args.From, args.To).process()
+	attender = incoming_call.attender
+	queue_call_log(TwilioCallDetails(args, receiver=attender["name"] if attender else ""))
 	return Response(resp.to_xml(), mimetype="text/xml")
 
 
-def create_call_log(call_details: TwilioCallDetails):
+def queue_call_log(call_details: TwilioCallDetails):
+	"""
+	Create the call log in a background job so the caller is not kept waiting on it.
+
+	The call details are kept in Redis until then, a status callback that arrives
+	before the job has run creates the call log from them itself.
+	"""
 	details = call_details.to_dict()
+	frappe.cache.set_value(
+		f"{PENDING_CALL_LOG_CACHE_KEY}|{details['id']}", details, expires_in_sec=PENDING_CALL_LOG_TTL
+	)
+	frappe.enqueue(
+		"crm.integrations.twilio.api.ensure_call_log",
+		queue="short",
+		job_id=f"crm_twilio_call_log::{details['id']}",
+		deduplicate=True,
+		call_sid=details["id"],
+	)
+
+
+def ensure_call_log(call_sid):
+	"""Create the call log of a queued call if it does not exist yet, return whether it exists."""
+	if frappe.db.exists("CRM Call Log", call_sid):
+		return True
+
+	key = f"{PENDING_CALL_LOG_CACHE_KEY}|{call_sid}"
+	details = frappe.cache.get_value(key)
+	if not details:
+		return False
+
+	frappe.db.savepoint("ensure_call_log")
+	try:
+		insert_call_log(details)
+	except frappe.DuplicateEntryError:
+		# created by the job and a status callback at the same time, only undo this insert
+		frappe.db.rollback(save_point="ensure_call_log")
+
+	frappe.cache.delete_value(key)
+	return True
+
+
+def create_call_log(call_details: TwilioCallDetails):
+	return insert_call_log(call_details.to_dict())
+
 
+def insert_call_log(details: dict):
 	call_log = frappe.get_doc({**details, "doctype": "CRM Call Log", "telephony_medium": "Twilio"})
 
 	# link call log with lead/deal
@@ -93,7 +142,6 @@ def create_call_log(call_details: TwilioCallDetails):
 	link(contact_number, call_log)
 
 	call_log.save(ignore_permissions=True)
-	frappe.db.commit()
 	return call_log
 
 
@@ -111,25 +159,30 @@ def link(contact_number, call_log):
 		call_log.link_with_reference_doc(doctype, docname)
 
 
-def update_call_log(call_sid, status=None):
-	"""Update call log status."""
+def get_call_event(call_sid, status=None, fields=None):
+	"""Call event of a Twilio callback, call times and duration are fetched from Twilio by the job."""
+	return make_call_event(
+		"Twilio",
+		call_sid,
+		status=status,
+		fields=fields,
+		create={"method": "crm.integrations.twilio.api.ensure_call_log", "kwargs": {"call_sid": call_sid}},
+		fetch={"method": "crm.integrations.twilio.api.get_call_info", "kwargs": {"call_sid": call_sid}},
+	)
+
+
+def get_call_info(call_sid):
 	twilio = Twilio.connect()
-	if not (twilio and frappe.db.exists("CRM Call Log", call_sid)):
-		return
+	if not twilio:
+		return {}
 
-	try:
-		call_details = twilio.get_call_info(call_sid)
-		call_log = frappe.get_doc("CRM Call Log", call_sid)
-		call_log.status = TwilioCallDetails.get_call_status(status or call_details.status)
-		call_log.duration = call_details.duration
-		call_log.start_time = get_datetime_from_timestamp(call_details.start_time)
-		call_log.end_time = get_datetime_from_timestamp(call_details.end_time)
-		call_log.save(ignore_permissions=True)
-		frappe.db.commit()
-		return call_log
-	except Exception:
-		frappe.log_error(title="Error while updating call record")
-		frappe.db.commit()
+	call_details = twilio.get_call_info(call_sid)
+	return {
+		"status": call_details.status,
+		"duration": call_details.duration,
+		"start_time": get_datetime_from_timestamp(call_details.start_time),
+		"end_time": get_datetime_from_timestamp(call_details.end_time),
+	}
 
 
 @frappe.whitelist(allow_guest=True)
@@ -137,18 +190,7 @@ def update_recording_info(**kwargs):
 	args = frappe._dict(kwargs)
 	validate_twilio_request(args)
 
-	recording_url = args.RecordingUrl
-	call_sid = args.CallSid
-	call_log = update_call_log(call_sid)
-	if not call_log:
-		frappe.throw(_("Call log not found"), frappe.DoesNotExistError)
-
-	try:
-		frappe.db.set_value("CRM Call Log", call_sid, "recording_url", recording_url)
-		frappe.db.commit()
-	except Exception as exc:
-		frappe.log_error(title=_("Failed to capture Twilio recording"))
-		raise exc
+	queue_call_event(get_call_event(args.CallSid, fields={"recording_url": args.RecordingUrl}))
 
 
 @frappe.whitelist(allow_guest=True)
@@ -156,10 +198,7 @@ def update_call_status_info(**kwargs):
 	args = frappe._dict(kwargs)
 	validate_twilio_request(args)
 
-	parent_call_sid = args.ParentCallSid
-	call_log = update_call_log(parent_call_sid, status=args.CallStatus)
-	if not call_log:
-		frappe.throw(_("Call log not found"), frappe.DoesNotExistError)
+	queue_call_event(get_call_event(args.ParentCallSid, status=args.CallStatus))
 
 	call_info = {
 		"ParentCallSid": args.ParentCallSid,
@@ -0,0 +1,77 @@
+"""
+Routing cache for inbound Twilio calls.
+
+Twilio waits on `twilio_incoming_call_handler` while the caller hears ringing, so
+everything needed to pick an agent is kept in Redis: the agents (and their call
+receiving device) behind each Twilio number and the owner of each caller's deal or
+lead. Together with the agents' presence from `crm.api.presence` the TwiML is built
+from memory, and the call log is created after the response, off the critical path.
+"""
+
+import frappe
+from frappe.query_builder import Order
+
+NUMBER_ROUTES_CACHE_KEY = "crm_twilio_number_routes"
+CALLER_OWNER_CACHE_KEY = "crm_twilio_caller_owner"
+# a reassigned deal or lead routes its callers to the new owner within this many seconds
+CALLER_OWNER_TTL = 10 * 60
+
+
+def normalize_number(phone_number: str | None) -> str:
+	"""Digits of a phone number, keeping a leading + sign."""
+	return "".join([c for c in phone_number or "" if c.isdigit() or c == "+"])
+
+
+def get_number_routes(phone_number: str) -> dict:
+	"""
+	Agents using the Twilio number `phone_number`, cached until an agent or user changes.
+
+	>>> get_number_routes("+11234567890")
+	{
+		'owner1': {'name': '..', 'mobile_no': '..', 'call_receiving_device': '...'},
+		'owner2': {....}
+	}
+	"""
+	number = normalize_number(phone_number)
+	return frappe.cache.hget(NUMBER_ROUTES_CACHE_KEY, number, generator=lambda: build_number_routes(number))
+
+
+def build_number_routes(number: str) -> dict:
+	Agent = frappe.qb.DocType("CRM Telephony Agent")
+	User = frappe.qb.DocType("User")
+	rows = (
+		frappe.qb.from_(Agent)
+		.join(User)
+		.on(User.name == Agent.name)
+		.select(Agent.name, User.mobile_no, Agent.call_receiving_device)
+		.where(Agent.twilio_number == number)
+		# as `get_all` ordered them, the most recently modified agent gets the call first
+		.orderby(Agent.modified, order=Order.desc)
+	).run(as_dict=True)
+	return {row.name: dict(row) for row in rows}
+
+
+def clear_number_routes(doc=None, method=None):
+	frappe.cache.delete_value(NUMBER_ROUTES_CACHE_KEY)
+
+
+def get_caller_owner(caller: str) -> str | None:
+	"""Owner of the deal, or else the unconverted lead, with `caller` as mobile no."""
+	if not caller:
+		return None
+
+	return (
+		frappe.cache.get_value(
+			f"{CALLER_OWNER_CACHE_KEY}|{caller}",
+			generator=lambda: find_caller_owner(caller) or "",
+			expires_in_sec=CALLER_OWNER_TTL,
+		)
+		or None
+	)
+
+
+def find_caller_owner(caller: str) -> str | None:
+	deal_owner = frappe.db.get_value("CRM Deal", {"mobile_no": caller}, "deal_owner")
+	if deal_owner:
+		return deal_owner
+	return frappe.db.get_value("CRM Lead", {"mobile_no": caller, "converted": False}, "lead_owner")
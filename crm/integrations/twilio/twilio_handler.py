@@ -6,7 +6,10 @@ from twilio.jwt.access_token.grants import VoiceGrant
 from twilio.rest import Client as TwilioClient
 from twilio.twiml.voice_response import Dial, VoiceResponse
 
-from .utils import get_public_url, merge_dicts
+from crm.api.presence import AVAILABLE_STATUSES, get_available_users, get_users_presence
+
+from .routing import get_caller_owner, get_number_routes
+from .utils import get_public_url
 
 
 class Twilio:
@@ -20,13 +23,22 @@ class Twilio:
 		self.account_sid = settings.account_sid
 		self.application_sid = settings.twiml_sid
 		self.api_key = settings.api_key
-		self.api_secret = settings.get_password("api_secret")
-		self.twilio_client = self.get_twilio_client()
+
+	@property
+	def api_secret(self):
+		return self.settings.get_password("api_secret")
+
+	@property
+	def twilio_client(self):
+		# only built when the REST API is used, generating TwiML needs no credentials
+		if not hasattr(self, "_twilio_client"):
+			self._twilio_client = self.get_twilio_client()
+		return self._twilio_client
 
 	@classmethod
 	def connect(self):
 		"""Make a twilio connection."""
-		settings = frappe.get_doc("CRM Twilio Settings")
+		settings = frappe.get_cached_doc("CRM Twilio Settings")
 		if not (settings and settings.enabled):
 			return
 		return Twilio(settings=settings)
@@ -114,7 +126,7 @@ class Twilio:
 
 	@classmethod
 	def get_twilio_client(self):
-		twilio_settings = frappe.get_doc("CRM Twilio Settings")
+		twilio_settings = frappe.get_cached_doc("CRM Twilio Settings")
 		if not twilio_settings.enabled:
 			frappe.throw(_("Please enable twilio settings before making a call."))
 
@@ -129,6 +141,7 @@ class IncomingCall:
 		self.from_number = from_number
 		self.to_number = to_number
 		self.meta = meta
+		self.attender = None
 
 	def process(self):
 		"""Process the incoming call
@@ -137,7 +150,7 @@ class IncomingCall:
 		"""
 		twilio = Twilio.connect()
 		owners = get_twilio_number_owners(self.to_number)
-		attender = get_the_call_attender(owners, self.from_number)
+		attender = self.attender = get_the_call_attender(owners, self.from_number)
 
 		if not attender:
 			resp = VoiceResponse()
@@ -158,62 +171,38 @@ def get_twilio_number_owners(phone_number):
 		'owner2': {....}
 	}
 	"""
-	# remove special characters from phone number and get only digits also remove white spaces
-	# keep + sign in the number at start of the number
-	phone_number = "".join([c for c in phone_number if c.isdigit() or c == "+"])
-	user_voice_settings = frappe.get_all(
-		"CRM Telephony Agent",
-		filters={"twilio_number": phone_number},
-		fields=["name", "call_receiving_device"],
-	)
-	user_wise_voice_settings = {user["name"]: user for user in user_voice_settings}
-
-	user_general_settings = frappe.get_all(
-		"User", filters=[["name", "IN", user_wise_voice_settings.keys()]], fields=["name", "mobile_no"]
-	)
-	user_wise_general_settings = {user["name"]: user for user in user_general_settings}
-
-	return merge_dicts(user_wise_general_settings, user_wise_voice_settings)
+	return get_number_routes(phone_number)
 
 
 def get_active_loggedin_users(users):
-	"""Filter the current loggedin users from the given users list"""
-	rows = frappe.db.sql(
-		"""
-		SELECT `user`
-		FROM `tabSessions`
-		WHERE `user` IN %(users)s
-		""",
-		{"users": users},
-	)
-	return [row[0] for row in set(rows)]
+	"""Filter the users who are present and not on a call from the given users list"""
+	return get_available_users(users)
 
 
 def get_the_call_attender(owners, caller=None):
 	"""Get attender details from list of owners"""
 	if not owners:
 		return
-	current_loggedin_users = get_active_loggedin_users(list(owners.keys()))
+	presence = get_users_presence(list(owners.keys()))
+	current_loggedin_users = [user for user in presence if presence[user]["status"] in AVAILABLE_STATUSES]
 
 	if len(current_loggedin_users) > 1 and caller:
-		deal_owner = frappe.db.get_value("CRM Deal", {"mobile_no": caller}, "deal_owner")
-		if not deal_owner:
-			deal_owner = frappe.db.get_value(
-				"CRM Lead", {"mobile_no": caller, "converted": False}, "lead_owner"
-			)
+		deal_owner = get_caller_owner(caller)
 		for user in current_loggedin_users:
 			if user == deal_owner:
 				current_loggedin_users = [user]
 
 	for name, details in owners.items():
 		if (details["call_receiving_device"] == "Phone" and details["mobile_no"]) or (
-			details["call_receiving_device"] == "Computer" and name in current_loggedin_users
+			details["call_receiving_device"] == "Computer"
+			and name in current_loggedin_users
+			and presence[name]["softphone"]
 		):
 			return details
 
 
 class TwilioCallDetails:
-	def __init__(self, call_info, call_from=None, call_to=None):
+	def __init__(self, call_info, call_from=None, call_to=None, receiver=None):
 		self.call_info = call_info
 		self.account_sid = call_info.get("AccountSid")
 		self.application_sid = call_info.get("ApplicationSid")
@@ -221,6 +210,8 @@ class TwilioCallDetails:
 		self.call_status = self.get_call_status(call_info.get("CallStatus"))
 		self._call_from = call_from or call_info.get("From")
 		self._call_to = call_to or call_info.get("To")
+		# agent the incoming call was routed to, looked up again if not known
+		self._receiver = receiver
 
 	def get_direction(self):
 		if self.call_info.get("Caller").lower().startswith("client"):
@@ -251,6 +242,8 @@ class TwilioCallDetails:
 			caller = self.call_info.get("Caller")
 			identity = caller.replace("client:", "").strip()
 			caller = Twilio.emailid_from_identity(identity) if identity else ""
+		elif self._receiver is not None:
+			receiver = self._receiver
 		else:
 			owners = get_twilio_number_owners(to_number)
 			attender = get_the_call_attender(owners, from_number)
@@ -0,0 +1,275 @@
+import hashlib
+import time
+from collections.abc import Iterator
+
+import frappe
+from frappe import _
+from frappe.exceptions import ValidationError
+from frappe.model import numeric_fieldtypes
+from frappe.utils import cast
+
+
+class DuplicateLeadError(ValidationError):
+	pass
+
+
+class RateLimitError(Exception):
+	"""Raised by connectors when the remote source asks us to slow down."""
+
+	def __init__(self, retry_after: float | None = None):
+		super().__init__(retry_after)
+		self.retry_after = retry_after
+
+
+def get_connector_class(source_type: str) -> type["LeadSyncConnector"]:
+	"""Return the connector class registered for a Lead Sync Source type via the
+	`lead_sync_connectors` hook."""
+	connectors = frappe.get_hooks("lead_sync_connectors") or {}
+	path = connectors.get(source_type)
+	if not path:
+		frappe.throw(_("No lead sync connector registered for {0}").format(source_type))
+
+	return frappe.get_attr(path[-1] if isinstance(path, list) else path)
+
+
+def get_connector(source) -> "LeadSyncConnector":
+	"""Build the connector for a Lead Sync Source document."""
+	return get_connector_class(source.type).from_source(source)
+
+
+def get_lead_data_hash(lead_data: str | None) -> str:
+	"""Hash of a failure log's `lead_data`, indexed so logged leads are found without comparing payloads."""
+	return hashlib.sha256((lead_data or "").encode()).hexdigest()
+
+
+class LeadSyncConnector:
+	"""
+	Base class for lead sync connectors.
+
+	A connector only knows how to talk to its source: fetch raw leads page by page,
+	flatten one raw lead into a `{key: value}` dict, say which keys map to which
+	CRM Lead fields and remember how far the source was read. Everything else
+	(mapping, dedup, inserts, failure logs, retries and committing pages) is handled
+	here so that every source behaves the same way.
+	"""
+
+	# value of `Lead Sync Source.type` this connector handles
+	source_type: str = ""
+	batch_size = 500
+	max_retries = 5
+	backoff_factor = 2
+
+	def __init__(self, source_name: str | None = None):
+		self.source_name = source_name
+		self.field_map = None
+
+	@classmethod
+	def from_source(cls, source) -> "LeadSyncConnector":
+		return cls(source_name=source.name)
+
+	# Connector interface
+
+	def fetch_batches(self) -> Iterator[list[dict]]:
+		"""Yield raw leads from the source, one page at a time."""
+		raise NotImplementedError
+
+	def get_lead_data(self, lead: dict) -> dict:
+		"""Flatten a raw lead into a `{source key: value}` dict."""
+		return lead
+
+	def get_field_map(self) -> dict:
+		"""Return a `{source key: CRM Lead fieldname}` map."""
+		raise NotImplementedError
+
+	def get_extra_lead_fields(self, lead: dict) -> dict:
+		"""Fields set on every lead created by this connector, e.g. the lead source."""
+		return {}
+
+	def get_duplicate_scope(self) -> dict:
+		"""Filters limiting which existing leads are considered for dedup."""
+		return {}
+
+	def is_rate_limited(self, exc: Exception) -> bool:
+		return isinstance(exc, RateLimitError)
+
+	def checkpoint(self, leads: list[dict]):
+		"""Persist how far the source has been read, `leads` is the page about to be committed."""
+		pass
+
+	# Engine
+
+	def sync(self) -> dict:
+		stats = {"synced": 0, "duplicate": 0, "failed": 0}
+		for leads in self.fetch_batches():
+			for key, value in self.sync_batch(leads).items():
+				stats[key] += value
+		self.update_last_synced_at()
+		return stats
+
+	def sync_batch(self, leads: list[dict]) -> dict:
+		"""Map, dedup and insert a page of raw leads. Failure logs for the page are written
+		together and the page is committed as a unit, with the connector's checkpoint, so a
+		crash mid-sync never loses or repeats more than one page of work."""
+		stats = {"synced": 0, "duplicate": 0, "failed": 0}
+		failure_logs = []
+
+		mapped = [(lead, self.map_lead(lead)) for lead in leads]
+		existing = self.get_existing_keys([data for _lead, data in mapped])
+
+		for lead, crm_lead_data in mapped:
+			key = self.get_duplicate_key(crm_lead_data)
+			if key in existing:
+				failure_logs.append(self.get_failure_log(lead, "Duplicate"))
+				stats["duplicate"] += 1
+				continue
+
+			frappe.db.savepoint("lead_sync")
+			try:
+				self.insert_lead(crm_lead_data)
+			except frappe.UniqueValidationError:
+				frappe.db.rollback(save_point="lead_sync")
+				frappe.clear_last_message()
+				failure_logs.append(self.get_failure_log(lead, "Duplicate"))
+				stats["duplicate"] += 1
+				continue
+			except Exception:
+				frappe.db.rollback(save_point="lead_sync")
+				failure_logs.append(
+					self.get_failure_log(lead, traceback=frappe.get_traceback(with_context=True))
+				)
+				stats["failed"] += 1
+				continue
+
+			existing.add(key)
+			stats["synced"] += 1
+
+		for log in self.without_logged_duplicates(failure_logs):
+			log.insert(ignore_permissions=True)
+
+		self.checkpoint(leads)
+		if not frappe.flags.in_test:
+			frappe.db.commit()  # nosemgrep
+		return stats
+
+	def without_logged_duplicates(self, failure_logs: list) -> list:
+		"""Drop duplicate logs for leads this source already logged as duplicate, e.g. ones read
+		again after a crash or the overlap of time based checkpoints."""
+		for log in failure_logs:
+			log.lead_data_hash = get_lead_data_hash(log.lead_data)
+
+		hashes = [log.lead_data_hash for log in failure_logs if log.type == "Duplicate"]
+		if not hashes:
+			return failure_logs
+
+		logged = set(
+			frappe.get_all(
+				"Failed Lead Sync Log",
+				filters={
+					"source": self.get_source_name(),
+					"type": "Duplicate",
+					"lead_data_hash": ["in", hashes],
+				},
+				pluck="lead_data_hash",
+			)
+		)
+		return [log for log in failure_logs if log.type != "Duplicate" or log.lead_data_hash not in logged]
+
+	def sync_single_lead(self, lead: dict, raise_exception: bool = False):
+		crm_lead_data = self.map_lead(lead)
+
+		try:
+			if self.get_duplicate_key(crm_lead_data) in self.get_existing_keys([crm_lead_data]):
+				raise DuplicateLeadError
+			return self.insert_lead(crm_lead_data)
+		except (frappe.UniqueValidationError, DuplicateLeadError):
+			self.create_failure_log(lead, "Duplicate")
+			if raise_exception:
+				raise
+		except Exception:
+			self.create_failure_log(lead, traceback=frappe.get_traceback(with_context=True))
+			if raise_exception:
+				raise
+
+	def map_lead(self, lead: dict) -> dict:
+		field_map = self.get_field_map()
+		lead_data = self.get_lead_data(lead)
+		crm_lead_data = {field_map[k]: v for k, v in lead_data.items() if k in field_map}
+		crm_lead_data.update(self.get_extra_lead_fields(lead))
+		return crm_lead_data
+
+	def insert_lead(self, crm_lead_data: dict):
+		return frappe.get_doc({"doctype": "CRM Lead", **crm_lead_data}).insert(ignore_permissions=True)
+
+	def get_dedup_fields(self) -> list[str]:
+		return sorted(set(self.get_field_map().values()))
+
+	def get_duplicate_key(self, crm_lead_data: dict) -> tuple:
+		return tuple(self.get_key_value(field, crm_lead_data.get(field)) for field in self.get_dedup_fields())
+
+	def get_key_value(self, fieldname: str, value):
+		"""`value` cast to the type of the CRM Lead field, so raw source values and the typed values
+		read from the database give the same dedup key."""
+		df = frappe.get_meta("CRM Lead").get_field(fieldname)
+		if not df:
+			return value
+		if df.fieldtype not in numeric_fieldtypes and value in (None, ""):
+			return None
+		try:
+			return cast(df.fieldtype, value)
+		except Exception:
+			# left as is, inserting the lead reports the invalid value
+			return value
+
+	def get_existing_keys(self, leads: list[dict]) -> set[tuple]:
+		"""Return dedup keys of `leads` that already exist, using one query for the whole
+		batch instead of one `exists` per lead."""
+		fields = self.get_dedup_fields()
+		if not fields or not leads:
+			return set()
+
+		values = list({key[0] for key in map(self.get_duplicate_key, leads) if key[0] is not None})
+		if not values:
+			return set()
+
+		filters = {**self.get_duplicate_scope(), fields[0]: ["in", values]}
+		rows = frappe.get_all("CRM Lead", filters=filters, fields=fields, as_list=True)
+		return {self.get_duplicate_key(dict(zip(fields, row, strict=True))) for row in rows}
+
+	def with_backoff(self, fn, *args, **kwargs):
+		"""Call `fn`, retrying with exponential backoff while the source is rate limiting us."""
+		for attempt in range(self.max_retries + 1):
+			try:
+				return fn(*args, **kwargs)
+			except Exception as e:
+				if attempt == self.max_retries or not self.is_rate_limited(e):
+					raise
+				retry_after = getattr(e, "retry_after", None)
+				time.sleep(retry_after or self.backoff_factor**attempt)
+
+	def get_failure_log(
+		self, lead_data: dict | None = None, type: str = "Failure", traceback: str | None = None
+	):
+		return frappe.get_doc(
+			{
+				"doctype": "Failed Lead Sync Log",
+				"type": type,
+				"lead_data": frappe.as_json(lead_data),
+				"source": self.get_source_name(),
+				"traceback": traceback,
+			}
+		)
+
+	def create_failure_log(
+		self, lead_data: dict | None = None, type: str = "Failure", traceback: str | None = None
+	):
+		return self.get_failure_log(lead_data, type, traceback).insert(ignore_permissions=True)
+
+	@property
+	def last_synced_at(self):
+		return frappe.db.get_value("Lead Sync Source", self.get_source_name(), "last_synced_at")
+
+	def update_last_synced_at(self):
+		frappe.db.set_value("Lead Sync Source", self.get_source_name(), "last_synced_at", frappe.utils.now())
+
+	def get_source_name(self):
+		return self.source_name
@@ -4,7 +4,7 @@
 import frappe
 from frappe.model.document import Document
 
-from crm.lead_syncing.doctype.lead_sync_source.facebook import FacebookSyncSource
+from crm.lead_syncing.connector import get_connector, get_lead_data_hash
 
 
 class FailedLeadSyncLog(Document):
@@ -17,23 +17,25 @@ class FailedLeadSyncLog(Document):
 		from frappe.types import DF
 
 		lead_data: DF.Code | None
+		lead_data_hash: DF.Data | None
 		source: DF.Link | None
 		traceback: DF.Code | None
 		type: DF.Literal["Duplicate", "Failure", "Synced"]
 	# end: auto-generated types
 
+	def before_insert(self):
+		if not self.lead_data_hash:
+			self.lead_data_hash = get_lead_data_hash(self.lead_data)
+
 	@frappe.whitelist()
 	def retry_sync(self):
 		if not self.source:
 			frappe.throw(frappe._("Can't retry sync for this without source!"))
 
 		source = frappe.get_cached_doc("Lead Sync Source", self.source)
-		if source.type != "Facebook":
-			frappe.throw(frappe._("Not implemented yet!"))
-
-		crm_lead = FacebookSyncSource(
-			source.get_password("access_token"), source.facebook_lead_form
-		).sync_single_lead(frappe.parse_json(self.lead_data), raise_exception=True)
+		crm_lead = get_connector(source).sync_single_lead(
+			frappe.parse_json(self.lead_data), raise_exception=True
+		)
 
 		self.type = "Synced"
 		self.save()
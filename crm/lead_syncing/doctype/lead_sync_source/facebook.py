@@ -1,13 +1,12 @@
 import frappe
-from frappe.exceptions import ValidationError
 from frappe.integrations.utils import make_get_request
 
+from crm.lead_syncing.connector import DuplicateLeadError, LeadSyncConnector
+
 FB_GRAPH_API_BASE = "https://graph.facebook.com"
 FB_GRAPH_API_VERSION = "v23.0"
-
-
-class DuplicateLeadError(ValidationError):
-	pass
+# application, user, page and custom-level throttling
+FB_RATE_LIMIT_ERROR_CODES = (4, 17, 32, 613)
 
 
 def get_fb_graph_api_url(endpoint: str) -> str:
@@ -17,114 +16,103 @@ def get_fb_graph_api_url(endpoint: str) -> str:
 	return f"{FB_GRAPH_API_BASE}/{FB_GRAPH_API_VERSION}/{endpoint}"
 
 
-class FacebookSyncSource:
+class FacebookSyncSource(LeadSyncConnector):
+	source_type = "Facebook"
+
 	def __init__(
 		self,
 		access_token: str,
 		form_id: str,
 		source_name: str | None = None,
 	):
+		super().__init__(source_name)
 		self.access_token = access_token
 		self.form_id = form_id
-		self.source_name = source_name
-		self.form_questions_mapping = None
 
-	def get_api_url(self, endpoint: str) -> str:
-		return get_fb_graph_api_url(endpoint)
+	@classmethod
+	def from_source(cls, source) -> "FacebookSyncSource":
+		if not source.facebook_lead_form:
+			frappe.throw(frappe._("Please select a lead gen form before syncing!"))
 
-	def sync(self):
-		leads = self.fetch_leads()
-		for lead in leads:
-			self.sync_single_lead(lead)
-		self.update_last_synced_at()
-
-	def sync_single_lead(self, lead, raise_exception=False):
-		question_to_field_map = self.get_form_questions_mapping()
-		lead_data = {item["name"]: item["values"][0] for item in lead["field_data"]}
-		crm_lead_data = {
-			question_to_field_map.get(k): v for k, v in lead_data.items() if k in question_to_field_map
-		}
-		crm_lead_data["source"] = "Facebook"
-		crm_lead_data["facebook_lead_id"] = lead["id"]
-		crm_lead_data["facebook_form_id"] = self.form_id
+		return cls(source.get_password("access_token"), source.facebook_lead_form, source.name)
 
-		try:
-			self.validate_duplicate_lead(crm_lead_data, question_to_field_map)
-			return frappe.get_doc(
-				{
-					"doctype": "CRM Lead",
-					**crm_lead_data,
-				}
-			).insert(ignore_permissions=True)
-		except (frappe.UniqueValidationError, DuplicateLeadError):
-			self.create_failure_log(lead, "Duplicate")
-			if raise_exception:
-				raise
-		except Exception:
-			self.create_failure_log(lead, traceback=frappe.get_traceback(with_context=True))
-			if raise_exception:
-				raise
+	def get_api_url(self, endpoint: str) -> str:
+		return get_fb_graph_api_url(endpoint)
 
-	def fetch_leads(self):
+	def fetch_batches(self):
 		url = self.get_api_url(f"/{self.form_id}/leads")
 		params = {
 			"access_token": self.access_token,
 			"fields": "id,created_time,field_data",
-			"limit": 100000,  # TODO: pagination
+			"limit": self.batch_size,
 		}
 
-		filtering = []
 		if self.last_synced_at:
 			timestamp = frappe.utils.data.get_timestamp(self.last_synced_at)
-			filtering.append({"field": "time_created", "operator": "GREATER_THAN", "value": timestamp})
-			params["filtering"] = frappe.as_json(filtering)
+			params["filtering"] = frappe.as_json(
+				[{"field": "time_created", "operator": "GREATER_THAN", "value": timestamp}]
+			)
+
+		while True:
+			response = self.with_backoff(make_get_request, url, params=params)
+			leads = response.get("data", [])
+			if leads:
+				yield leads
+
+			paging = response.get("paging", {})
+			after = paging.get("cursors", {}).get("after")
+			if not leads or not paging.get("next") or not after:
+				break
+			params["after"] = after
 
-		return make_get_request(
-			url,
-			params=params,
-		).get("data", [])
+	def fetch_leads(self):
+		return [lead for leads in self.fetch_batches() for lead in leads]
 
-	def get_form_questions_mapping(self):
-		if self.form_questions_mapping:
-			return self.form_questions_mapping
+	def is_rate_limited(self, exc: Exception) -> bool:
+		response = getattr(exc, "response", None)
+		if response is None:
+			return super().is_rate_limited(exc)
+
+		if response.status_code == 429:
+			return True
+
+		try:
+			error_code = response.json().get("error", {}).get("code")
+		except ValueError:
+			return False
+		return error_code in FB_RATE_LIMIT_ERROR_CODES
+
+	def get_lead_data(self, lead: dict) -> dict:
+		return {item["name"]: item["values"][0] for item in lead["field_data"]}
+
+	def get_extra_lead_fields(self, lead: dict) -> dict:
+		return {
+			"source": "Facebook",
+			"facebook_lead_id": lead["id"],
+			"facebook_form_id": self.form_id,
+		}
+
+	def get_duplicate_scope(self) -> dict:
+		# only for this campaign
+		return {"facebook_form_id": self.form_id}
+
+	def get_field_map(self) -> dict:
+		if self.field_map:
+			return self.field_map
 
 		form_questions = frappe.db.get_all(
 			"Facebook Lead Form Question",
 			filters={"parent": self.form_id},
 			fields=["key", "mapped_to_crm_field"],
 		)
-		self.form_questions_mapping = {
+		self.field_map = {
 			q["key"]: q["mapped_to_crm_field"] for q in form_questions if q["mapped_to_crm_field"]
 		}
 
-		return self.form_questions_mapping
+		return self.field_map
 
-	@property
-	def last_synced_at(self):
-		return frappe.db.get_value(
-			"Lead Sync Source", self.source_name or {"facebook_lead_form": self.form_id}, "last_synced_at"
-		)
-
-	def create_failure_log(
-		self, lead_data: dict | None = None, type: str = "Failure", traceback: str | None = None
-	):
-		return frappe.get_doc(
-			{
-				"doctype": "Failed Lead Sync Log",
-				"type": type,
-				"lead_data": frappe.as_json(lead_data),
-				"source": self.get_source_name(),
-				"traceback": traceback,
-			}
-		).insert(ignore_permissions=True)
-
-	def update_last_synced_at(self):
-		frappe.db.set_value(
-			"Lead Sync Source",
-			self.source_name or {"facebook_lead_form": self.form_id},
-			"last_synced_at",
-			frappe.utils.now(),
-		)
+	def get_form_questions_mapping(self):
+		return self.get_field_map()
 
 	def get_source_name(self):
 		if self.source_name:
@@ -132,12 +120,6 @@ class FacebookSyncSource:
 
 		return frappe.db.get_value("Lead Sync Source", {"facebook_lead_form": self.form_id}, "name")
 
-	def validate_duplicate_lead(self, lead_data: dict, field_mapping: dict):
-		validation_filters = {crm_field: lead_data[crm_field] for crm_field in field_mapping.values()}
-		validation_filters["facebook_form_id"] = lead_data["facebook_form_id"]  # only for this campaign
-		if frappe.db.exists("CRM Lead", validation_filters):
-			raise DuplicateLeadError
-
 
 @frappe.whitelist()
 def fetch_and_store_pages_from_facebook(access_token: str) -> list[dict]:
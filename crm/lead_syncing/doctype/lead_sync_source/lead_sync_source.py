@@ -4,10 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
-from crm.lead_syncing.doctype.lead_sync_source.facebook import (
-	FacebookSyncSource,
-	fetch_and_store_pages_from_facebook,
-)
+from crm.lead_syncing.connector import get_connector
+from crm.lead_syncing.doctype.lead_sync_source.facebook import fetch_and_store_pages_from_facebook
 
 
 class LeadSyncSource(Document):
@@ -19,19 +17,27 @@ class LeadSyncSource(Document):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
-		access_token: DF.Password
+		from crm.lead_syncing.doctype.lead_sync_field_map.lead_sync_field_map import LeadSyncFieldMap
+
+		access_token: DF.Password | None
 		background_sync_frequency: DF.Literal[
 			"Every 5 Minutes", "Every 10 Minutes", "Every 15 Minutes", "Hourly", "Daily", "Monthly"
 		]
 		enabled: DF.Check
 		facebook_lead_form: DF.Link | None
 		facebook_page: DF.Link | None
+		field_mapping: DF.Table[LeadSyncFieldMap]
+		import_file: DF.Attach | None
+		import_offset: DF.Int
 		last_synced_at: DF.Datetime | None
-		type: DF.Literal["Facebook"]
+		type: DF.Literal["Facebook", "File"]
 	# end: auto-generated types
 
 	def validate(self):
 		self.validate_same_fb_form_active()
+		if not self.is_new() and self.has_value_changed("import_file"):
+			# a new file is synced from its start
+			self.import_offset = 0
 
 	def validate_same_fb_form_active(self):
 		if not self.enabled:
@@ -62,8 +68,4 @@ class LeadSyncSource(Document):
 		frappe.enqueue_doc(self.doctype, self.name, "_sync_leads", queue="long")
 
 	def _sync_leads(self):
-		if self.type == "Facebook" and self.access_token:
-			if not self.facebook_lead_form:
-				frappe.throw(frappe._("Please select a lead gen form before syncing!"))
-
-			FacebookSyncSource(self.get_password("access_token"), self.facebook_lead_form).sync()
+		get_connector(self).sync()
@@ -1,9 +1,15 @@
 # Copyright (c) 2025, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
+import os
+import tempfile
+
+import frappe
 from frappe.tests import IntegrationTestCase
 
+from crm.lead_syncing.connector import get_connector
+from crm.lead_syncing.doctype.lead_sync_source.file_import import FileSyncSource
+
 # On IntegrationTestCase, the doctype test records and all
 # link-field test record dependencies are recursively loaded
 # Use these module variables to add/remove to/from that list
@@ -17,4 +23,108 @@ class IntegrationTestLeadSyncSource(IntegrationTestCase):
 	Use this class for testing interactions between multiple components.
 	"""
 
-	pass
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_file_source_streams_in_batches(self):
+		with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+			f.write("First Name,E-mail\n")
+			for i in range(5):
+				f.write(f"Lead {i},lead{i}@example.com\n")
+
+		try:
+			source = FileSyncSource(f.name, {"First Name": "first_name", "E-mail": "email"})
+			source.batch_size = 2
+			batches = list(source.fetch_batches())
+
+			self.assertEqual([len(b) for b in batches], [2, 2, 1])
+			self.assertEqual(
+				source.map_lead(batches[0][0]),
+				{"first_name": "Lead 0", "email": "lead0@example.com"},
+			)
+		finally:
+			os.remove(f.name)
+
+	def test_file_source_resumes_and_logs_duplicates_once(self):
+		frappe.get_doc({"doctype": "CRM Lead", "first_name": "Dup", "email": "dup@example.com"}).insert()
+		source = create_file_source(
+			"First Name,E-mail\nSync 0,sync0@example.com\nDup,dup@example.com\nSync 0,sync0@example.com\n"
+		)
+
+		self.assertEqual(sync(source), {"synced": 1, "duplicate": 2, "failed": 0})
+		self.assertEqual(get_logs(source, "Duplicate"), 2)
+
+		# the next run continues after the rows already synced
+		self.assertEqual(sync(source), {"synced": 0, "duplicate": 0, "failed": 0})
+		with open(get_file_path(source), "a") as f:
+			f.write("Sync 1,sync1@example.com\n")
+		self.assertEqual(sync(source), {"synced": 1, "duplicate": 0, "failed": 0})
+
+		# syncing the file again from the start doesn't log duplicates twice
+		frappe.db.set_value("Lead Sync Source", source, "import_offset", 0)
+		self.assertEqual(sync(source), {"synced": 0, "duplicate": 4, "failed": 0})
+		self.assertEqual(get_logs(source, "Duplicate"), 3)
+
+	def test_file_source_logs_failures_and_continues(self):
+		source = create_file_source(
+			"First Name,E-mail,Status\nBad,bad@example.com,No Such Status\nGood,good@example.com,New\n",
+			status="Status",
+		)
+
+		self.assertEqual(sync(source), {"synced": 1, "duplicate": 0, "failed": 1})
+		self.assertTrue(frappe.db.exists("CRM Lead", {"email": "good@example.com"}))
+		log = frappe.get_last_doc("Failed Lead Sync Log", {"source": source, "type": "Failure"})
+		self.assertIn("bad@example.com", log.lead_data)
+		self.assertTrue(log.traceback)
+
+	def test_file_source_dedups_typed_values(self):
+		frappe.get_doc(
+			{
+				"doctype": "CRM Lead",
+				"first_name": "Typed",
+				"email": "typed@example.com",
+				"annual_revenue": 1000,
+			}
+		).insert()
+		source = create_file_source(
+			"First Name,E-mail,Revenue\nTyped,typed@example.com,1000\nTyped,typed@example.com,2000\n",
+			annual_revenue="Revenue",
+		)
+
+		# "1000" read from the file is the same as the stored 1000.0
+		self.assertEqual(sync(source), {"synced": 1, "duplicate": 1, "failed": 0})
+
+
+def create_file_source(content, **field_map):
+	file = frappe.get_doc(
+		{"doctype": "File", "file_name": "leads.csv", "content": content, "is_private": 1}
+	).insert()
+	field_map = {"first_name": "First Name", "email": "E-mail", **field_map}
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Lead Sync Source",
+				"name": f"Test File Source {frappe.generate_hash(length=5)}",
+				"type": "File",
+				"import_file": file.file_url,
+				"field_mapping": [
+					{"key": key, "mapped_to_crm_field": field} for field, key in field_map.items()
+				],
+			}
+		)
+		.insert()
+		.name
+	)
+
+
+def sync(source):
+	return get_connector(frappe.get_doc("Lead Sync Source", source)).sync()
+
+
+def get_file_path(source):
+	file_url = frappe.db.get_value("Lead Sync Source", source, "import_file")
+	return frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+
+
+def get_logs(source, type):
+	return frappe.db.count("Failed Lead Sync Log", {"source": source, "type": type})
@@ -0,0 +1,156 @@
+import unicodedata
+
+import frappe
+from frappe import _
+from frappe.automation.doctype.assignment_rule.assignment_rule import AssignmentRule
+from frappe.desk.form import assign_to
+from frappe.model.document import Document
+from frappe.query_builder.functions import Count
+from frappe.utils.safe_exec import (
+	WHITELISTED_SAFE_EVAL_GLOBALS,
+	FrappeTransformer,
+	_validate_safe_eval_syntax,
+)
+from RestrictedPython import compile_restricted
+
+CRM_ASSIGNMENT_DOCTYPES = ("CRM Lead", "CRM Deal")
+ASSIGNMENT_LOAD_CACHE_KEY = "crm_assignment_load"
+# open assignment counts are refreshed from the database at least this often
+ASSIGNMENT_LOAD_TTL = 5 * 60
+# set on a load hash built from the database, a hash created by a bare increment is rebuilt
+ASSIGNMENT_LOAD_BUILT = "__built__"
+
+# (rule, fieldname, condition) -> restricted code object, shared by every document assigned
+_compiled_conditions = {}
+
+
+class CustomAssignmentRule(AssignmentRule):
+	"""
+	Assignment Rule tuned for high volume CRM Lead and CRM Deal inserts.
+
+	For CRM doctypes conditions are compiled with `frappe.safe_eval`'s restrictions once per
+	process instead of for every document, and the round robin cursor and open assignment
+	counts are kept in Redis. Assigning no longer writes `last_user` back to the rule, so the
+	cached rule (and its users) stays valid instead of being re-read after every assignment.
+	"""
+
+	def is_crm_rule(self):
+		return self.document_type in CRM_ASSIGNMENT_DOCTYPES
+
+	def safe_eval(self, fieldname, doc):
+		if not self.is_crm_rule() or not self.get(fieldname):
+			return super().safe_eval(fieldname, doc)
+
+		try:
+			code = self.get_compiled_condition(fieldname)
+			eval_globals = {"__builtins__": {}, **WHITELISTED_SAFE_EVAL_GLOBALS}
+			return eval(code, eval_globals, doc.as_dict() if isinstance(doc, Document) else doc)
+		except Exception as e:
+			# as the standard implementation does, a broken condition must not block the document,
+			# and it is never retried without the restrictions
+			frappe.msgprint(_("Auto assignment failed: {0}").format(str(e)), indicator="orange")
+			return False
+
+	def get_compiled_condition(self, fieldname):
+		condition = self.get(fieldname)
+		key = (self.name, fieldname, condition)
+		if key not in _compiled_conditions:
+			condition = unicodedata.normalize("NFKC", condition)
+			_validate_safe_eval_syntax(condition)
+			_compiled_conditions[key] = compile_restricted(
+				condition, filename=f"<{self.name}: {fieldname}>", policy=FrappeTransformer, mode="eval"
+			)
+		return _compiled_conditions[key]
+
+	def do_assignment(self, doc):
+		if not self.is_crm_rule():
+			return super().do_assignment(doc)
+
+		# clear existing assignment, to reassign
+		assign_to.clear(doc.get("doctype"), doc.get("name"), ignore_permissions=True)
+
+		user = self.get_user(doc)
+		if not user:
+			return False
+
+		assign_to.add(
+			dict(
+				assign_to=[user],
+				doctype=doc.get("doctype"),
+				name=doc.get("name"),
+				description=frappe.render_template(self.description, doc),
+				assignment_rule=self.name,
+				notify=True,
+				date=doc.get(self.due_date_based_on) if self.due_date_based_on else None,
+			),
+			ignore_permissions=True,
+		)
+		self.update_assignment_load(user)
+		return True
+
+	def get_user_round_robin(self):
+		if not self.is_crm_rule():
+			return super().get_user_round_robin()
+
+		users = [d.user for d in self.users]
+		if not users:
+			return None
+
+		key = frappe.cache.make_key(f"crm_assignment_cursor|{self.name}")
+		# continue after the last user saved on the rule the first time the cursor is used
+		start = users.index(self.last_user) if self.last_user in users else -1
+		frappe.cache.set(key, start, nx=True)
+		return users[frappe.cache.incr(key) % len(users)]
+
+	def get_user_load_balancing(self):
+		if not self.is_crm_rule():
+			return super().get_user_load_balancing()
+
+		users = [d.user for d in self.users]
+		if not users:
+			return None
+
+		load = get_assignment_load(self.document_type)
+		return min(users, key=lambda user: load.get(user, 0))
+
+	def update_assignment_load(self, user):
+		frappe.cache.hincrby(get_assignment_load_key(self.document_type), user, 1)
+
+
+def get_assignment_load(doctype: str) -> dict:
+	"""Open ToDo count per user for `doctype`, read with one grouped query and kept in a Redis hash."""
+	key = get_assignment_load_key(doctype)
+	# the wrapper's hash methods pickle values, the counters are read and written raw
+	pipeline = frappe.cache.pipeline()
+	pipeline.hgetall(key)
+	load = {frappe.safe_decode(user): int(count) for user, count in pipeline.execute()[0].items()}
+	if load.pop(ASSIGNMENT_LOAD_BUILT, None) is not None:
+		return load
+
+	load = build_assignment_load(doctype)
+	pipeline = frappe.cache.pipeline()
+	pipeline.delete(key)
+	pipeline.hset(key, mapping={**load, ASSIGNMENT_LOAD_BUILT: 1})
+	pipeline.expire(key, ASSIGNMENT_LOAD_TTL)
+	pipeline.execute()
+	return load
+
+
+def get_assignment_load_key(doctype: str) -> str:
+	return frappe.cache.make_key(f"{ASSIGNMENT_LOAD_CACHE_KEY}|{doctype}")
+
+
+def build_assignment_load(doctype: str) -> dict:
+	ToDo = frappe.qb.DocType("ToDo")
+	rows = (
+		frappe.qb.from_(ToDo)
+		.select(ToDo.allocated_to, Count("*"))
+		.where((ToDo.reference_type == doctype) & (ToDo.status == "Open"))
+		.groupby(ToDo.allocated_to)
+	).run()
+	return {user: count for user, count in rows if user}
+
+
+def clear_assignment_load(doctype: str | None = None):
+	for dt in [doctype] if doctype else CRM_ASSIGNMENT_DOCTYPES:
+		frappe.cache.delete_value(f"{ASSIGNMENT_LOAD_CACHE_KEY}|{dt}")
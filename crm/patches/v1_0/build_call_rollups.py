@@ -0,0 +1,7 @@
+import frappe
+
+
+def execute():
+	frappe.enqueue(
+		"crm.fcrm.doctype.crm_call_rollup.crm_call_rollup.rebuild_call_rollups", queue="long", timeout=60 * 60
+	)
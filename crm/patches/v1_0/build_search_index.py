@@ -0,0 +1,5 @@
+import frappe
+
+
+def execute():
+	frappe.enqueue("crm.utils.search_index.rebuild_search_index", queue="long", timeout=60 * 60)
@@ -0,0 +1,24 @@
+import frappe
+from frappe.query_builder import Case
+
+from crm.lead_syncing.connector import get_lead_data_hash
+
+
+def execute():
+	Log = frappe.qb.DocType("Failed Lead Sync Log")
+	last_name = ""
+	while logs := frappe.get_all(
+		"Failed Lead Sync Log",
+		filters={"type": "Duplicate", "lead_data_hash": ["is", "not set"], "name": [">", last_name]},
+		fields=["name", "lead_data"],
+		order_by="name asc",
+		limit=1000,
+	):
+		lead_data_hash = Case()
+		for log in logs:
+			lead_data_hash = lead_data_hash.when(Log.name == log.name, get_lead_data_hash(log.lead_data))
+		frappe.qb.update(Log).set(Log.lead_data_hash, lead_data_hash).where(
+			Log.name.isin([log.name for log in logs])
+		).run()
+		frappe.db.commit()  # nosemgrep
+		last_name = logs[-1].name
@@ -0,0 +1,29 @@
+import frappe
+from frappe.query_builder import Case
+
+from crm.fcrm.doctype.crm_notification.crm_notification import (
+	NOTIFICATION_HASH_FIELDS,
+	get_notification_hash,
+)
+
+
+def execute():
+	Notification = frappe.qb.DocType("CRM Notification")
+	last_name = ""
+	while notifications := frappe.get_all(
+		"CRM Notification",
+		filters={"notification_hash": ["is", "not set"], "name": [">", last_name]},
+		fields=["name", *NOTIFICATION_HASH_FIELDS],
+		order_by="name asc",
+		limit=1000,
+	):
+		notification_hash = Case()
+		for notification in notifications:
+			notification_hash = notification_hash.when(
+				Notification.name == notification.name, get_notification_hash(notification)
+			)
+		frappe.qb.update(Notification).set(Notification.notification_hash, notification_hash).where(
+			Notification.name.isin([notification.name for notification in notifications])
+		).run()
+		frappe.db.commit()  # nosemgrep
+		last_name = notifications[-1].name
@@ -0,0 +1,31 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+
+class TestAssignmentRule(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_conditions_are_restricted(self):
+		rule = get_rule("status == 'New'")
+		self.assertTrue(rule.safe_eval("assign_condition", {"status": "New"}))
+		self.assertFalse(rule.safe_eval("assign_condition", {"status": "Contacted"}))
+
+		rule = get_rule("().__class__.__bases__[0].__subclasses__()")
+		self.assertFalse(rule.safe_eval("assign_condition", {"status": "New"}))
+
+
+def get_rule(condition):
+	return frappe.get_doc(
+		{
+			"doctype": "Assignment Rule",
+			"name": f"Test Rule {frappe.generate_hash(length=5)}",
+			"document_type": "CRM Lead",
+			"rule": "Round Robin",
+			"assign_condition": condition,
+			"users": [{"user": "Administrator"}],
+		}
+	)
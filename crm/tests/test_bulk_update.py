@@ -0,0 +1,89 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.bulk_update import bulk_update, get_save_fields, update_docs
+
+
+class TestBulkUpdate(IntegrationTestCase):
+	def setUp(self):
+		self.leads = [
+			frappe.get_doc({"doctype": "CRM Lead", "first_name": f"Bulk Lead {i}", "status": "New"})
+			.insert()
+			.name
+			for i in range(3)
+		]
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_status_change_is_logged(self):
+		result = bulk_update("CRM Lead", self.leads, {"status": "Contacted"})
+		self.assertEqual(result, {"updated": 3, "failed": {}})
+
+		for name in self.leads:
+			lead = frappe.get_doc("CRM Lead", name)
+			self.assertEqual(lead.status, "Contacted")
+			self.assertEqual([log.get("from") for log in lead.status_change_log], ["New", "Contacted"])
+			self.assertEqual(lead.status_change_log[0].to, "Contacted")
+			self.assertTrue(lead.status_change_log[0].to_date)
+			self.assertFalse(lead.status_change_log[1].to_date)
+			self.assertTrue(frappe.db.exists("Version", {"ref_doctype": "CRM Lead", "docname": name}))
+
+		# records that already have the status are left alone
+		update_docs("CRM Lead", self.leads, {"status": "Contacted"})
+		self.assertEqual(len(frappe.get_doc("CRM Lead", self.leads[0]).status_change_log), 2)
+
+	def test_owner_change_assigns_owner(self):
+		bulk_update("CRM Lead", self.leads, {"lead_owner": "crm.user1@example.com"})
+
+		for name in self.leads:
+			lead = frappe.get_doc("CRM Lead", name)
+			self.assertEqual(lead.lead_owner, "crm.user1@example.com")
+			self.assertIn("crm.user1@example.com", lead.get_assigned_users())
+
+	def test_fields_needing_a_save_are_saved(self):
+		bulk_update("CRM Lead", self.leads[:1], {"last_name": "Updated"})
+		self.assertEqual(frappe.db.get_value("CRM Lead", self.leads[0], "lead_name"), "Bulk Lead 0 Updated")
+
+	def test_failures_are_reported(self):
+		result = update_docs("CRM Lead", [*self.leads, "CRM-LEAD-MISSING"], {"status": "Contacted"})
+		self.assertEqual(result["updated"], 3)
+		self.assertIn("CRM-LEAD-MISSING", result["failed"])
+
+		for data in ({"first_name`) --": "x"}, {"status_change_log": []}):
+			with self.assertRaises(frappe.ValidationError):
+				bulk_update("CRM Lead", self.leads, data)
+
+	def test_values_are_validated(self):
+		for data in (
+			{"status": "No Such Status"},
+			{"lead_owner": "nobody@example.com"},
+			{"no_of_employees": "1 million"},
+		):
+			with self.assertRaises(frappe.ValidationError):
+				bulk_update("CRM Lead", self.leads, data)
+
+		self.assertEqual(frappe.db.get_value("CRM Lead", self.leads[0], "status"), "New")
+
+	def test_lead_owned_by_its_own_email_is_rejected(self):
+		frappe.db.set_value("CRM Lead", self.leads[0], "email", "crm.user1@example.com")
+
+		result = update_docs("CRM Lead", self.leads, {"lead_owner": "crm.user1@example.com"})
+		self.assertEqual(result["updated"], 2)
+		self.assertEqual(list(result["failed"]), [self.leads[0]])
+		self.assertNotEqual(
+			frappe.db.get_value("CRM Lead", self.leads[0], "lead_owner"), "crm.user1@example.com"
+		)
+
+	def test_fetch_from_sources_need_a_save(self):
+		fields = [frappe._dict(fetch_from="territory.territory_manager"), frappe._dict(fetch_from=".website")]
+		with patch("frappe.get_meta", return_value=frappe._dict(fields=fields)):
+			save_fields = get_save_fields("CRM Lead")
+
+		self.assertIn("territory", save_fields)
+		self.assertNotIn("", save_fields)
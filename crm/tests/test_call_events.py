@@ -0,0 +1,112 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.integrations.call_events import make_call_event, process_call_events, queue_call_event
+from crm.integrations.exotel.handler import get_call_event
+
+EXOTEL_CALL_SID = "test-exotel-call-events"
+
+# payloads Exotel sends for an incoming call that is answered and recorded
+EXOTEL_INCOMING_CALL = [
+	{
+		"CallSid": EXOTEL_CALL_SID,
+		"CallFrom": "+919999900001",
+		"To": "+918000000001",
+		"DialWhomNumber": "+919999900002",
+		"Direction": "incoming",
+		"CallType": "call-attempt",
+		"Status": "ringing",
+		"AgentEmail": "Administrator",
+	},
+	{
+		"CallSid": EXOTEL_CALL_SID,
+		"To": "+918000000001",
+		"DialWhomNumber": "+919999900002",
+		"Direction": "incoming",
+		"Status": "in-progress",
+		"AgentEmail": "Administrator",
+	},
+	{
+		"CallSid": EXOTEL_CALL_SID,
+		"To": "+918000000001",
+		"DialWhomNumber": "+919999900002",
+		"Direction": "incoming",
+		"CallType": "completed",
+		"Status": "completed",
+		"DialCallDuration": "42",
+		"RecordingUrl": "https://recordings.example.com/call.mp3",
+		"StartTime": "2026-01-05 10:00:00",
+		"EndTime": "2026-01-05 10:00:42",
+	},
+	{"CallSid": EXOTEL_CALL_SID, "Status": "free"},
+]
+
+
+class TestCallEvents(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_replay_exotel_incoming_call(self):
+		for payload in EXOTEL_INCOMING_CALL:
+			queue_call_event(get_call_event(payload))
+
+		call_log = frappe.get_doc("CRM Call Log", EXOTEL_CALL_SID)
+		self.assertEqual(call_log.status, "Completed")
+		self.assertEqual(call_log.receiver, "Administrator")
+		self.assertEqual(call_log.duration, 42)
+		self.assertEqual(call_log.recording_url, "https://recordings.example.com/call.mp3")
+		self.assertEqual(
+			frappe.db.count(
+				"Integration Request",
+				{"integration_request_service": "Exotel", "data": ["like", f"%{EXOTEL_CALL_SID}%"]},
+			),
+			len(EXOTEL_INCOMING_CALL),
+		)
+
+	def test_late_events_do_not_overwrite_final_status(self):
+		for payload in EXOTEL_INCOMING_CALL[:3]:
+			queue_call_event(get_call_event(payload))
+
+		# Exotel retries the answered callback after the call has ended
+		queue_call_event(get_call_event({**EXOTEL_INCOMING_CALL[1], "DialCallDuration": "0"}))
+
+		call_log = frappe.get_doc("CRM Call Log", EXOTEL_CALL_SID)
+		self.assertEqual(call_log.status, "Completed")
+		self.assertEqual(call_log.duration, 42)
+
+	def test_out_of_order_burst(self):
+		call_log = create_call_log("test-twilio-call-events")
+		events = [
+			make_call_event("Twilio", call_log.name, status="completed", fields={"duration": 30}),
+			make_call_event("Twilio", call_log.name, status="ringing"),
+			make_call_event("Twilio", call_log.name, status="in-progress", fields={"duration": 0}),
+			make_call_event("Twilio", call_log.name, fields={"recording_url": "https://example.com/r.mp3"}),
+		]
+
+		process_call_events(call_log.name, events)
+
+		call_log.reload()
+		self.assertEqual(call_log.status, "Completed")
+		self.assertEqual(call_log.duration, 30)
+		self.assertEqual(call_log.recording_url, "https://example.com/r.mp3")
+
+	def test_events_of_unknown_call_are_ignored(self):
+		process_call_events("test-unknown-call", [make_call_event("Twilio", "test-unknown-call", "ringing")])
+		self.assertFalse(frappe.db.exists("CRM Call Log", "test-unknown-call"))
+
+
+def create_call_log(call_sid):
+	return frappe.get_doc(
+		{
+			"doctype": "CRM Call Log",
+			"id": call_sid,
+			"type": "Incoming",
+			"status": "Ringing",
+			"from": "+919999900003",
+			"to": "+918000000002",
+			"telephony_medium": "Twilio",
+		}
+	).insert(ignore_permissions=True)
@@ -0,0 +1,77 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import csv
+import os
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, now_datetime
+from openpyxl import load_workbook
+
+from crm.api.export import build_export, delete_old_exports, export_list
+
+TEST_FILTERS = {"first_name": ["like", "Export Lead %"]}
+COLUMNS = [{"key": "first_name", "label": "First Name"}, {"key": "_assign", "label": "Assigned To"}]
+
+
+class TestExport(IntegrationTestCase):
+	def setUp(self):
+		for i in range(3):
+			frappe.get_doc(
+				{"doctype": "CRM Lead", "first_name": f"Export Lead {i}", "_assign": '["a@example.com"]'}
+			).insert()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_csv_export(self):
+		with open(export("CSV", "test-export-csv"), newline="") as f:
+			rows = list(csv.reader(f))
+
+		self.assertEqual(rows[0], ["First Name", "Assigned To"])
+		self.assertEqual(rows[1:], [[f"Export Lead {i}", "a@example.com"] for i in range(3)])
+
+	def test_excel_export(self):
+		sheet = load_workbook(export("Excel", "test-export-xlsx"), read_only=True).active
+		rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+
+		self.assertEqual(rows[0], ["First Name", "Assigned To"])
+		self.assertEqual(len(rows), 4)
+
+	def test_export_is_limited_to_page_length(self):
+		build_export("test-export-page", "CRM Lead", COLUMNS, dict(TEST_FILTERS), "first_name asc", "CSV", 2)
+		with open(get_export_path("test-export-page"), newline="") as f:
+			self.assertEqual(len(list(csv.reader(f))), 3)
+
+	def test_old_exports_are_deleted(self):
+		path = export("CSV", "test-export-old")
+		file = frappe.get_last_doc("File", {"file_name": ["like", "%test-export-old%"]})
+		frappe.db.set_value("File", file.name, "creation", add_days(now_datetime(), -2))
+
+		delete_old_exports()
+		self.assertFalse(frappe.db.exists("File", file.name))
+		self.assertFalse(os.path.exists(path))
+
+	def test_invalid_columns_are_rejected(self):
+		with self.assertRaises(frappe.ValidationError):
+			export_list("CRM Lead", [{"key": "first_name from `tabUser` --"}], TEST_FILTERS)
+
+	def test_client_export_id_is_used(self):
+		with patch("frappe.enqueue") as enqueue:
+			self.assertEqual(export_list("CRM Lead", COLUMNS, TEST_FILTERS, export_id="abc123"), "abc123")
+		self.assertEqual(enqueue.call_args.kwargs["export_id"], "abc123")
+
+		with self.assertRaises(frappe.ValidationError):
+			export_list("CRM Lead", COLUMNS, TEST_FILTERS, export_id="../../etc")
+
+
+def export(file_format, export_id):
+	build_export(export_id, "CRM Lead", COLUMNS, dict(TEST_FILTERS), "first_name asc", file_format)
+	return get_export_path(export_id)
+
+
+def get_export_path(export_id):
+	file_url = frappe.db.get_value("File", {"file_name": ["like", f"%{export_id}%"]}, "file_url")
+	return frappe.get_site_path(file_url.lstrip("/"))
@@ -0,0 +1,94 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.doc import get_data
+
+TEST_FILTERS = {"first_name": ["like", "List Data %"]}
+
+
+class TestListData(IntegrationTestCase):
+	def setUp(self):
+		for first_name, annual_revenue in (
+			("List Data A", 100),
+			("List Data A", 200),
+			("List Data A", 300),
+			("List Data B", 400),
+		):
+			frappe.get_doc(
+				{"doctype": "CRM Lead", "first_name": first_name, "annual_revenue": annual_revenue}
+			).insert()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_group_by_counts_every_group(self):
+		result = get_group_by_data(page_length=1)
+
+		self.assertEqual(result["group_by_field"]["options"], ["List Data A", "List Data B"])
+		self.assertEqual(result["group_by_field"]["counts"], {"List Data A": 3, "List Data B": 1})
+		# every group gets its first page, not just the groups on the first page of the list
+		self.assertEqual(sorted(row.first_name for row in result["data"]), ["List Data A", "List Data B"])
+		self.assertEqual(result["total_count"], 4)
+
+	def test_group_by_pages_groups_independently(self):
+		result = get_group_by_data(page_length=1, group_page_lengths={"List Data A": 2})
+
+		first_names = [row.first_name for row in result["data"]]
+		self.assertEqual(first_names.count("List Data A"), 2)
+		self.assertEqual(first_names.count("List Data B"), 1)
+
+	def test_group_by_rejects_unknown_fields(self):
+		with self.assertRaises(frappe.ValidationError):
+			get_group_by_data(group_by_field="first_name`) --")
+
+	def test_aggregates(self):
+		aggregates = [
+			{"function": "sum", "field": "annual_revenue"},
+			{"function": "max", "field": "annual_revenue"},
+		]
+		result = get_data("CRM Lead", dict(TEST_FILTERS), "modified desc", aggregates=aggregates)
+		self.assertEqual(result["aggregates"], {"annual_revenue": {"sum": 1000, "max": 400}})
+
+		# cached totals follow changes to the records
+		frappe.get_doc({"doctype": "CRM Lead", "first_name": "List Data C", "annual_revenue": 50}).insert()
+		result = get_data("CRM Lead", dict(TEST_FILTERS), "modified desc", aggregates=aggregates)
+		self.assertEqual(result["total_count"], 5)
+		self.assertEqual(result["aggregates"]["annual_revenue"]["sum"], 1050)
+
+	def test_aggregates_of_non_numeric_fields_are_rejected(self):
+		for aggregate in ({"function": "sum", "field": "first_name"}, {"function": "std", "field": "total"}):
+			with self.assertRaises(frappe.ValidationError):
+				get_data("CRM Lead", dict(TEST_FILTERS), "modified desc", aggregates=[aggregate])
+
+	def test_deal_amounts_are_aggregated_in_base_currency(self):
+		org = frappe.get_doc({"doctype": "CRM Organization", "organization_name": "List Data Org"}).insert()
+		for deal_value, currency, exchange_rate in ((100, "USD", 1), (100, "EUR", 1.5)):
+			deal = frappe.get_doc({"doctype": "CRM Deal", "organization": org.name}).insert()
+			# set directly, the exchange rate would otherwise be fetched from the provider
+			frappe.db.set_value(
+				"CRM Deal",
+				deal.name,
+				{"deal_value": deal_value, "currency": currency, "exchange_rate": exchange_rate},
+			)
+
+		aggregates = [{"function": "sum", "field": "deal_value"}, {"function": "max", "field": "deal_value"}]
+		result = get_data("CRM Deal", {"organization": org.name}, "modified desc", aggregates=aggregates)
+		self.assertEqual(result["total_count"], 2)
+		self.assertEqual(result["aggregates"], {"deal_value": {"sum": 250, "max": 150}})
+
+
+def get_group_by_data(page_length=20, group_by_field="first_name", group_page_lengths=None):
+	return get_data(
+		"CRM Lead",
+		dict(TEST_FILTERS),
+		"modified desc",
+		page_length=page_length,
+		view={
+			"view_type": "group_by",
+			"group_by_field": group_by_field,
+			"group_page_lengths": group_page_lengths,
+		},
+	)
@@ -0,0 +1,65 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.page import PAGE_SECTIONS, get_page_data
+
+
+class TestPageData(IntegrationTestCase):
+	def setUp(self):
+		self.lead = frappe.get_doc(
+			{"doctype": "CRM Lead", "first_name": "Page Lead", "lead_owner": "Administrator"}
+		).insert()
+
+		contact = frappe.get_doc({"doctype": "Contact", "first_name": "Page Contact"}).insert()
+		self.deal = frappe.get_doc({"doctype": "CRM Deal", "deal_owner": "Administrator"})
+		self.deal.append("contacts", {"contact": contact.name, "is_primary": 1})
+		self.deal.insert()
+		self.contact = contact.name
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_lead_page(self):
+		data = get_page_data("CRM Lead", self.lead.name)
+
+		self.assertEqual(set(data), {*PAGE_SECTIONS, "errors"})
+		self.assertEqual(data["errors"], {})
+		self.assertEqual(data["doc"]["name"], self.lead.name)
+		self.assertEqual(len(data["activities"]), 5)
+		self.assertIsInstance(data["sidepanel_sections"], list)
+		self.assertEqual(set(data["fields_layouts"]), {"Side Panel", "Data Fields"})
+		self.assertEqual(data["contacts"], [])
+
+	def test_deal_page_sections(self):
+		data = get_page_data(
+			"CRM Deal", self.deal.name, sections=["activities", "assigned_users", "contacts"]
+		)
+
+		self.assertEqual(set(data), {"activities", "assigned_users", "contacts", "errors"})
+		# versions, calls, notes, tasks and attachments, as returned by get_activities
+		self.assertEqual(len(data["activities"]), 5)
+		self.assertEqual([contact["name"] for contact in data["contacts"]], [self.contact])
+		self.assertTrue(data["contacts"][0]["is_primary"])
+
+	def test_failed_section_is_reported(self):
+		def fail(context):
+			raise frappe.ValidationError("Broken section")
+
+		with patch.dict(PAGE_SECTIONS, {"linked_docs": fail}):
+			data = get_page_data("CRM Lead", self.lead.name, sections=["doc", "linked_docs"])
+
+		self.assertIn("doc", data)
+		self.assertNotIn("linked_docs", data)
+		self.assertEqual(data["errors"], {"linked_docs": "Broken section"})
+
+	def test_invalid_requests(self):
+		with self.assertRaises(frappe.ValidationError):
+			get_page_data("Contact", self.contact)
+
+		with self.assertRaises(frappe.ValidationError):
+			get_page_data("CRM Lead", self.lead.name, sections=["doc", "no_such_section"])
@@ -0,0 +1,76 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.api.presence import (
+	clear_presence,
+	get_available_users,
+	get_users_presence,
+	heartbeat,
+	set_call_presence,
+	set_presence,
+)
+
+TEST_USERS = ("presence-a@example.com", "presence-b@example.com", "presence-c@example.com")
+
+
+class TestPresence(IntegrationTestCase):
+	def tearDown(self):
+		for user in (*TEST_USERS, frappe.session.user):
+			clear_presence(user)
+
+	def test_heartbeat(self):
+		heartbeat(status="idle", softphone=True)
+
+		presence = get_users_presence([frappe.session.user])[frappe.session.user]
+		self.assertEqual(presence["status"], "idle")
+		self.assertTrue(presence["softphone"])
+
+		with self.assertRaises(frappe.ValidationError):
+			heartbeat(status="away")
+
+	def test_users_without_heartbeat_are_offline(self):
+		set_presence(TEST_USERS[0], "online")
+
+		presence = get_users_presence(TEST_USERS)
+		self.assertEqual(presence[TEST_USERS[0]]["status"], "online")
+		self.assertEqual(presence[TEST_USERS[1]]["status"], "offline")
+
+	def test_available_users(self):
+		set_presence(TEST_USERS[0], "online", softphone=True)
+		set_presence(TEST_USERS[1], "busy", softphone=True)
+		set_presence(TEST_USERS[2], "idle")
+
+		self.assertEqual(get_available_users(TEST_USERS), [TEST_USERS[0], TEST_USERS[2]])
+		self.assertEqual(get_available_users(TEST_USERS, softphone=True), [TEST_USERS[0]])
+
+	def test_call_presence(self):
+		set_presence(TEST_USERS[0], "online", softphone=True)
+
+		set_call_presence(TEST_USERS[0], on_call=True)
+		self.assertEqual(get_users_presence([TEST_USERS[0]])[TEST_USERS[0]]["status"], "busy")
+
+		set_call_presence(TEST_USERS[0], on_call=False)
+		presence = get_users_presence([TEST_USERS[0]])[TEST_USERS[0]]
+		self.assertEqual(presence["status"], "online")
+		self.assertTrue(presence["softphone"])
+
+		# agents that are not present are not brought online by their calls
+		set_call_presence(TEST_USERS[1], on_call=True)
+		self.assertEqual(get_users_presence([TEST_USERS[1]])[TEST_USERS[1]]["status"], "offline")
+
+	def test_heartbeat_keeps_call_presence(self):
+		user = frappe.session.user
+		heartbeat(status="online")
+		set_call_presence(user, on_call=True)
+
+		# a call taken on a phone is not seen by the desk's heartbeat
+		heartbeat(status="online")
+		self.assertEqual(get_users_presence([user])[user]["status"], "busy")
+
+		set_call_presence(user, on_call=False)
+		self.assertEqual(get_users_presence([user])[user]["status"], "online")
+		heartbeat(status="idle")
+		self.assertEqual(get_users_presence([user])[user]["status"], "idle")
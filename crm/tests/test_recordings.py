@@ -0,0 +1,65 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import os
+import tempfile
+import time
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_log
+from crm.integrations.recordings import evict_recordings, is_exotel_host, sign, stream_recording
+
+
+class TestRecordings(IntegrationTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_call_logs_get_signed_recording_urls(self):
+		call = parse_call_log(
+			frappe._dict(name="test-recording-1", recording_url="https://api.twilio.com/Recordings/RE1")
+		)
+
+		url = urlparse(call.recording_url)
+		self.assertEqual(url.path, "/api/method/crm.integrations.recordings.stream_recording")
+		query = {key: value[0] for key, value in parse_qs(url.query).items()}
+		self.assertEqual(query["call_log"], "test-recording-1")
+		self.assertEqual(query["signature"], sign("test-recording-1", int(query["expires"])))
+
+	def test_invalid_links_are_rejected(self):
+		expires = int(time.time()) + 60
+		with self.assertRaises(frappe.PermissionError):
+			stream_recording("test-recording-1", str(expires), sign("test-recording-2", expires))
+
+		expired = int(time.time()) - 1
+		with self.assertRaises(frappe.PermissionError):
+			stream_recording("test-recording-1", str(expired), sign("test-recording-1", expired))
+
+	def test_least_recently_played_recordings_are_evicted(self):
+		with tempfile.TemporaryDirectory() as cache_dir:
+			paths = []
+			for i in range(3):
+				path = os.path.join(cache_dir, f"recording-{i}.mp3")
+				with open(path, "wb") as f:
+					f.write(b"0" * 400 * 1024)
+				os.utime(path, (i, i))
+				paths.append(path)
+
+			# the oldest recording was just played
+			os.utime(paths[0])
+			with patch.dict(frappe.local.conf, {"crm_recording_cache_size_mb": 1}):
+				evict_recordings(cache_dir)
+
+			self.assertTrue(os.path.exists(paths[0]))
+			self.assertFalse(os.path.exists(paths[1]))
+			self.assertTrue(os.path.exists(paths[2]))
+
+	def test_exotel_credentials_only_go_to_exotel_hosts(self):
+		for hostname in ("exotel.com", "recordings.exotel.com", "api.exotel.in"):
+			self.assertTrue(is_exotel_host(hostname), hostname)
+
+		for hostname in ("evilexotel.com", "exotel.com.example.com", "notexotel.in", ""):
+			self.assertFalse(is_exotel_host(hostname), hostname)
@@ -4,11 +4,12 @@ import frappe
 import phonenumbers
 from frappe import _
 from frappe.model.docstatus import DocStatus
-from frappe.model.dynamic_links import get_dynamic_link_map
 from frappe.utils import floor
 from phonenumbers import NumberParseException
 from phonenumbers import PhoneNumberFormat as PNF
 
+from crm.utils.link_topology import get_link_topology
+
 
 def parse_phone_number(phone_number, default_country="IN"):
 	try:
@@ -103,39 +104,29 @@ def seconds_to_duration(seconds):
 
 # Extracted from frappe core frappe/model/delete_doc.py/check_if_doc_is_linked
 def get_linked_docs(doc, method="Delete"):
-	from frappe.model.rename_doc import get_link_fields
-
-	link_fields = get_link_fields(doc.doctype)
+	topology = get_link_topology(doc.doctype)
 	ignored_doctypes = set()
 
 	if method == "Cancel" and (doc_ignore_flags := doc.get("ignore_linked_doctypes")):
 		ignored_doctypes.update(doc_ignore_flags)
 	if method == "Delete":
-		ignored_doctypes.update(frappe.get_hooks("ignore_links_on_delete"))
+		ignored_doctypes.update(topology["ignored_doctypes"])
 
 	docs = []
 
-	for lf in link_fields:
-		link_dt, link_field, issingle = lf["parent"], lf["fieldname"], lf["issingle"]
+	for lf in topology["links"]:
+		link_dt, link_field = lf["parent"], lf["fieldname"]
 		if link_dt in ignored_doctypes or (link_field == "amended_from" and method == "Cancel"):
 			continue
 
-		try:
-			meta = frappe.get_meta(link_dt)
-		except frappe.DoesNotExistError:
-			frappe.clear_last_message()
-			# This mostly happens when app do not remove their customizations, we shouldn't
-			# prevent link checks from failing in those cases
-			continue
-
-		if issingle:
+		if lf["issingle"]:
 			if frappe.db.get_single_value(link_dt, link_field) == doc.name:
 				docs.append({"doc": doc.name, "link_dt": link_dt, "link_field": link_field})
 			continue
 
 		fields = ["name", "docstatus"]
 
-		if meta.istable:
+		if lf["istable"]:
 			fields.extend(["parent", "parenttype"])
 
 		for item in frappe.db.get_values(link_dt, {link_field: doc.name}, fields, as_dict=True):
@@ -168,23 +159,23 @@ def get_linked_docs(doc, method="Delete"):
 
 # Extracted from frappe core frappe/model/delete_doc.py/check_if_doc_is_dynamically_linked
 def get_dynamic_linked_docs(doc, method="Delete"):
-	docs = []
-	for df in get_dynamic_link_map().get(doc.doctype, []):
-		ignore_linked_doctypes = doc.get("ignore_linked_doctypes") or []
+	topology = get_link_topology(doc.doctype)
+	ignored_doctypes = set(topology["ignored_doctypes"])
+	if method == "Cancel":
+		ignored_doctypes.update(doc.get("ignore_linked_doctypes") or [])
 
-		if df.parent in frappe.get_hooks("ignore_links_on_delete") or (
-			df.parent in ignore_linked_doctypes and method == "Cancel"
-		):
+	docs = []
+	for df in topology["dynamic_links"]:
+		if df["parent"] in ignored_doctypes:
 			# don't check for communication and todo!
 			continue
 
-		meta = frappe.get_meta(df.parent)
-		if meta.issingle:
+		if df["issingle"]:
 			# dynamic link in single doc
-			refdoc = frappe.db.get_singles_dict(df.parent)
+			refdoc = frappe.db.get_singles_dict(df["parent"])
 			if (
-				refdoc.get(df.options) == doc.doctype
-				and refdoc.get(df.fieldname) == doc.name
+				refdoc.get(df["options"]) == doc.doctype
+				and refdoc.get(df["fieldname"]) == doc.name
 				and (
 					# linked to an non-cancelled doc when deleting
 					(method == "Delete" and not DocStatus(refdoc.docstatus).is_cancelled())
@@ -192,13 +183,15 @@ def get_dynamic_linked_docs(doc, method="Delete"):
 					or (method == "Cancel" and DocStatus(refdoc.docstatus).is_submitted())
 				)
 			):
-				docs.append({"doc": doc.name, "reference_doctype": df.parent, "reference_docname": df.parent})
+				docs.append(
+					{"doc": doc.name, "reference_doctype": df["parent"], "reference_docname": df["parent"]}
+				)
 		else:
 			# dynamic link in table
-			df["table"] = ", `parent`, `parenttype`, `idx`" if meta.istable else ""
+			table = ", `parent`, `parenttype`, `idx`" if df["istable"] else ""
 			for refdoc in frappe.db.sql(
 				"""select `name`, `docstatus` {table} from `tab{parent}` where
-				`{options}`=%s and `{fieldname}`=%s""".format(**df),
+				`{options}`=%s and `{fieldname}`=%s""".format(table=table, **df),
 				(doc.doctype, doc.name),
 				as_dict=True,
 			):
@@ -207,16 +200,14 @@ def get_dynamic_linked_docs(doc, method="Delete"):
 				if (method == "Delete" and not DocStatus(refdoc.docstatus).is_cancelled()) or (
 					method == "Cancel" and DocStatus(refdoc.docstatus).is_submitted()
 				):
-					reference_doctype = refdoc.parenttype if meta.istable else df.parent
-					reference_docname = refdoc.parent if meta.istable else refdoc.name
+					reference_doctype = refdoc.parenttype if df["istable"] else df["parent"]
+					reference_docname = refdoc.parent if df["istable"] else refdoc.name
 
-					if reference_doctype in frappe.get_hooks("ignore_links_on_delete") or (
-						reference_doctype in ignore_linked_doctypes and method == "Cancel"
-					):
+					if reference_doctype in ignored_doctypes:
 						# don't check for communication and todo!
 						continue
 
-					at_position = f"at Row: {refdoc.idx}" if meta.istable else ""
+					at_position = f"at Row: {refdoc.idx}" if df["istable"] else ""
 
 					docs.append(
 						{
@@ -229,6 +220,92 @@ def get_dynamic_linked_docs(doc, method="Delete"):
 	return docs
 
 
+def get_bulk_linked_docs(doctype, names, batch_size=1000):
+	"""
+	Set-based counterpart of `get_linked_docs` + `get_dynamic_linked_docs` for deleting
+	many documents of the same doctype at once.
+
+	Instead of walking every link field once per document, each link field and dynamic
+	link is queried once per batch of `names` with an `IN (...)` filter.
+
+	:param doctype: Doctype of the documents being deleted
+	:param names: Names of the documents being deleted
+	:return: List of `{"doc", "reference_doctype", "reference_docname"}` dicts
+	"""
+	from frappe.utils import create_batch
+
+	topology = get_link_topology(doctype)
+	names = list(set(names))
+	name_set = set(names)
+	ignored_doctypes = set(topology["ignored_doctypes"])
+	docs = {}
+
+	def add(docname, reference_doctype, reference_docname):
+		if reference_doctype in ignored_doctypes:
+			return
+		if reference_doctype == doctype and reference_docname == docname:
+			# linked to itself
+			return
+		docs[(docname, reference_doctype, reference_docname)] = {
+			"doc": docname,
+			"reference_doctype": reference_doctype,
+			"reference_docname": reference_docname,
+		}
+
+	for lf in topology["links"]:
+		link_dt, link_field = lf["parent"], lf["fieldname"]
+		# links from single doctypes have no reference document to unlink or delete
+		if link_dt in ignored_doctypes or lf["issingle"]:
+			continue
+
+		fields = ["name", link_field]
+		if lf["istable"]:
+			fields.extend(["parent", "parenttype"])
+
+		for batch in create_batch(names, batch_size):
+			for item in frappe.db.get_values(link_dt, {link_field: ["in", batch]}, fields, as_dict=True):
+				if lf["istable"] and item.parent:
+					add(item[link_field], item.parenttype, item.parent)
+				else:
+					add(item[link_field], link_dt, item.name)
+
+	for df in topology["dynamic_links"]:
+		if df["parent"] in ignored_doctypes:
+			continue
+
+		if df["issingle"]:
+			refdoc = frappe.db.get_singles_dict(df["parent"])
+			if (
+				refdoc.get(df["options"]) == doctype
+				and refdoc.get(df["fieldname"]) in name_set
+				and not DocStatus(refdoc.docstatus).is_cancelled()
+			):
+				add(refdoc.get(df["fieldname"]), df["parent"], df["parent"])
+			continue
+
+		table = frappe.qb.DocType(df["parent"])
+		fields = [table.name, table.docstatus, table[df["fieldname"]].as_("linked_name")]
+		if df["istable"]:
+			fields.extend([table.parent, table.parenttype])
+
+		for batch in create_batch(names, batch_size):
+			refdocs = (
+				frappe.qb.from_(table)
+				.select(*fields)
+				.where((table[df["options"]] == doctype) & (table[df["fieldname"]].isin(batch)))
+				.run(as_dict=True)
+			)
+			for refdoc in refdocs:
+				if DocStatus(refdoc.docstatus).is_cancelled():
+					continue
+				if df["istable"]:
+					add(refdoc.linked_name, refdoc.parenttype, refdoc.parent)
+				else:
+					add(refdoc.linked_name, df["parent"], refdoc.name)
+
+	return list(docs.values())
+
+
 def is_admin(user: str | None = None) -> bool:
 	"""
 	Check whether `user` is an admin
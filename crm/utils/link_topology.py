@@ -0,0 +1,76 @@
+import frappe
+from frappe.model.dynamic_links import get_dynamic_link_map
+
+LINK_TOPOLOGY_CACHE_KEY = "crm_link_topology"
+
+
+def get_link_topology(doctype: str) -> dict:
+	"""
+	Return everything that can point at a `doctype`, built once and cached until the next
+	migrate or cache clear:
+
+	- `links`: Link fields pointing at `doctype` (`parent`, `fieldname`, `issingle`, `istable`)
+	- `dynamic_links`: Dynamic Link fields that may point at `doctype`
+	  (`parent`, `fieldname`, `options`, `issingle`, `istable`)
+	- `ignored_doctypes`: doctypes from the `ignore_links_on_delete` hook
+	"""
+	return frappe.cache.hget(LINK_TOPOLOGY_CACHE_KEY, doctype, generator=lambda: build_link_topology(doctype))
+
+
+def build_link_topology(doctype: str) -> dict:
+	from frappe.model.rename_doc import get_link_fields
+
+	links = []
+	for lf in get_link_fields(doctype):
+		try:
+			meta = frappe.get_meta(lf["parent"])
+		except frappe.DoesNotExistError:
+			frappe.clear_last_message()
+			# This mostly happens when app do not remove their customizations
+			continue
+
+		links.append(
+			{
+				"parent": lf["parent"],
+				"fieldname": lf["fieldname"],
+				"issingle": bool(lf["issingle"]),
+				"istable": bool(meta.istable),
+			}
+		)
+
+	dynamic_links = []
+	for df in get_dynamic_link_map().get(doctype, []):
+		try:
+			meta = frappe.get_meta(df.parent)
+		except frappe.DoesNotExistError:
+			frappe.clear_last_message()
+			continue
+
+		dynamic_links.append(
+			{
+				"parent": df.parent,
+				"fieldname": df.fieldname,
+				"options": df.options,
+				"issingle": bool(meta.issingle),
+				"istable": bool(meta.istable),
+			}
+		)
+
+	return {
+		"links": links,
+		"dynamic_links": dynamic_links,
+		"ignored_doctypes": list(frappe.get_hooks("ignore_links_on_delete")),
+	}
+
+
+def clear_link_topology_cache():
+	frappe.cache.delete_value(LINK_TOPOLOGY_CACHE_KEY)
+
+
+def rebuild_link_topology():
+	"""Warm the topology for CRM doctypes after migrate, other doctypes are built on first use."""
+	clear_link_topology_cache()
+	for doctype in frappe.get_all("DocType", filters={"module": "FCRM", "istable": 0}, pluck="name"):
+		get_link_topology(doctype)
+	for doctype in ("Contact", "Address"):
+		get_link_topology(doctype)
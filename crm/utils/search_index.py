@@ -0,0 +1,214 @@
+"""
+Typeahead search index for contacts, leads and organizations.
+
+Every indexed document is stored as a set of tokens in `CRM Search Token`: the
+full value of each searchable field plus its individual words and the hosts and
+domains in it (and the digits of phone numbers). Tokens are kept up to date from
+doc events, and a search is one grouped query over indexed `token LIKE 'term%'`
+lookups that ranks and limits the matches, so pickers get their top results
+without scanning the source tables.
+"""
+
+import re
+
+import frappe
+
+SEARCH_TOKEN_DOCTYPE = "CRM Search Token"
+MAX_TOKEN_LENGTH = 140
+
+# doctype -> title field, description field and fields whose values are searchable
+SEARCH_INDEX_FIELDS = {
+	"Contact": {
+		"title": "full_name",
+		"description": "email_id",
+		"fields": ["full_name", "email_id", "mobile_no", "phone", "company_name"],
+		"child_fields": {"email_ids": "email_id", "phone_nos": "phone"},
+	},
+	"CRM Lead": {
+		"title": "lead_name",
+		"description": "email",
+		"fields": ["lead_name", "email", "mobile_no", "phone", "organization"],
+	},
+	"CRM Organization": {
+		"title": "organization_name",
+		"description": "website",
+		"fields": ["organization_name", "website"],
+	},
+}
+
+PHONE_FIELDS = ("mobile_no", "phone")
+# dotted names like the host of a website or the domain of an email, so "acme.com" finds them
+HOST_PATTERN = re.compile(r"[\w-]+(?:\.[\w-]+)+")
+
+
+def normalize(value) -> str:
+	return str(value or "").strip().casefold()
+
+
+def get_tokens(value, is_phone=False) -> set[str]:
+	value = normalize(value)
+	if not value:
+		return set()
+
+	if is_phone:
+		digits = re.sub(r"\D", "", value)
+		return {digits[:MAX_TOKEN_LENGTH]} if digits else set()
+
+	tokens = {value[:MAX_TOKEN_LENGTH]}
+	tokens.update(word[:MAX_TOKEN_LENGTH] for word in re.split(r"[\W_]+", value) if word)
+	for host in HOST_PATTERN.findall(value):
+		tokens.add(host[:MAX_TOKEN_LENGTH])
+		if host.startswith("www."):
+			tokens.add(host[4:MAX_TOKEN_LENGTH])
+	return tokens
+
+
+def get_search_tokens(doctype: str, doc) -> set[str]:
+	"""Tokens of a document, or a row with the same fields (and child rows as lists)."""
+	config = SEARCH_INDEX_FIELDS[doctype]
+	tokens = set()
+	for fieldname in config["fields"]:
+		tokens |= get_tokens(doc.get(fieldname), fieldname in PHONE_FIELDS)
+
+	for table, fieldname in config.get("child_fields", {}).items():
+		for row in doc.get(table) or []:
+			tokens |= get_tokens(row.get(fieldname), fieldname == "phone")
+
+	return tokens
+
+
+def update_search_index(doc, method=None):
+	"""Re-index a document, used as an `on_update` doc event."""
+	if doc.doctype not in SEARCH_INDEX_FIELDS:
+		return
+
+	remove_from_search_index(doc)
+	insert_search_tokens(doc.doctype, [doc])
+
+
+def remove_from_search_index(doc, method=None):
+	frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": doc.name})
+
+
+def rename_in_search_index(doc, method=None, old=None, new=None, merge=False):
+	frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doc.doctype, "reference_name": old})
+	update_search_index(doc)
+
+
+def insert_search_tokens(doctype: str, docs):
+	config = SEARCH_INDEX_FIELDS[doctype]
+	now = frappe.utils.now()
+	values = []
+	for doc in docs:
+		title = (doc.get(config["title"]) or doc.name)[:MAX_TOKEN_LENGTH]
+		description = (doc.get(config["description"]) or "")[:MAX_TOKEN_LENGTH]
+		for token in get_search_tokens(doctype, doc):
+			values.append(
+				(frappe.generate_hash(length=10), now, now, token, doctype, doc.name, title, description)
+			)
+
+	if values:
+		frappe.db.bulk_insert(
+			SEARCH_TOKEN_DOCTYPE,
+			[
+				"name",
+				"creation",
+				"modified",
+				"token",
+				"reference_doctype",
+				"reference_name",
+				"title",
+				"description",
+			],
+			values,
+		)
+
+
+def rebuild_search_index(doctypes=None, batch_size=1000):
+	"""Rebuild the index from scratch, reading documents a batch at a time."""
+	for doctype in doctypes or SEARCH_INDEX_FIELDS:
+		config = SEARCH_INDEX_FIELDS[doctype]
+		frappe.db.delete(SEARCH_TOKEN_DOCTYPE, {"reference_doctype": doctype})
+
+		fields = list({"name", config["title"], config["description"], *config["fields"]})
+		last_name = ""
+		while batch := frappe.get_all(
+			doctype,
+			fields=fields,
+			filters={"name": [">", last_name]},
+			order_by="name asc",
+			limit=batch_size,
+		):
+			set_child_rows(doctype, batch)
+			insert_search_tokens(doctype, batch)
+			frappe.db.commit()  # nosemgrep
+			last_name = batch[-1].name
+
+
+def set_child_rows(doctype: str, rows: list):
+	child_fields = SEARCH_INDEX_FIELDS[doctype].get("child_fields")
+	if not child_fields:
+		return
+
+	meta = frappe.get_meta(doctype)
+	by_name = {row.name: row for row in rows}
+	for table, fieldname in child_fields.items():
+		child_doctype = meta.get_field(table).options
+		for child in frappe.get_all(
+			child_doctype,
+			filters={"parenttype": doctype, "parent": ["in", list(by_name)]},
+			fields=["parent", fieldname],
+		):
+			by_name[child.parent].setdefault(table, []).append(child)
+
+
+def search_index(txt: str, doctypes=None, limit: int = 10) -> list[dict]:
+	"""
+	Return the best `limit` matches for `txt` as `{doctype, name, title, description}`.
+
+	Every word of `txt` must prefix-match a token of the document. Documents where more
+	words match a token exactly come first, then shorter titles.
+	"""
+	terms = [term for term in (normalize(word) for word in txt.split()) if term]
+	if not terms:
+		return []
+
+	# one grouped query over the tokens matching any term, keeping documents that match all of
+	# them, so matches are ranked and limited over every candidate
+	values = {"doctypes": list(doctypes or SEARCH_INDEX_FIELDS), "limit": limit}
+	term_matches, exact_matches = [], []
+	for i, term in enumerate(terms):
+		variants = sorted(get_term_variants(term))
+		prefixes = []
+		for j, variant in enumerate(variants):
+			values[f"prefix_{i}_{j}"] = f"{escape_like(variant)}%"
+			prefixes.append(f"token like %(prefix_{i}_{j})s")
+		values[f"exact_{i}"] = variants
+		term_matches.append(f"({' or '.join(prefixes)})")
+		exact_matches.append(f"max(token in %(exact_{i})s)")
+
+	return frappe.db.sql(
+		f"""
+		select reference_doctype as doctype, reference_name as name,
+			max(title) as title, max(description) as description
+		from `tab{SEARCH_TOKEN_DOCTYPE}`
+		where reference_doctype in %(doctypes)s and ({" or ".join(term_matches)})
+		group by reference_doctype, reference_name
+		having {" and ".join(f"max({match})" for match in term_matches)}
+		order by {" + ".join(exact_matches)} desc, char_length(max(title)), max(title)
+		limit %(limit)s
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def get_term_variants(term: str) -> set[str]:
+	# phone numbers are indexed as digits only, "+91 98" should still find them
+	if re.fullmatch(r"[\d\s()+.-]+", term):
+		return {term, re.sub(r"\D", "", term)} - {""}
+	return {term}
+
+
+def escape_like(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
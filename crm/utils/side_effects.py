@@ -0,0 +1,160 @@
+"""
+Deferred side effects for CRM documents.
+
+Non-critical work triggered by a save (sharing with the owner, assignment
+notifications, ERPNext customer creation, ...) is queued with
+`defer_side_effect` instead of running inside the request. Effects are
+coalesced per document for the whole request and, once the transaction
+commits, a single background job per document runs them and records how long
+each effect took.
+
+Effects that are cheaper done for many documents at once (notifications for a
+bulk assignment, ...) are queued with `defer_batched_side_effect` and run once
+with every item collected during the request.
+"""
+
+import time
+
+import frappe
+from frappe.utils import create_batch
+
+SIDE_EFFECT_TIMINGS_CACHE_KEY = "crm_side_effect_timings"
+# items handed to a single batched side effect job
+SIDE_EFFECT_BATCH_SIZE = 500
+
+
+def defer_side_effect(doc, effect: str, **kwargs):
+	"""
+	Run `effect` for `doc` after the current transaction commits.
+
+	:param doc: Document the effect belongs to
+	:param effect: Name of a method on the document, or a dotted path to a function
+	        that takes the document as its first argument
+	:param kwargs: Keyword arguments for the effect, if the same effect is deferred
+	        again for the same document in this request the last arguments win
+	"""
+	if run_inline():
+		run_side_effect(doc, effect, kwargs)
+		return
+
+	get_pending_side_effects()["docs"].setdefault((doc.doctype, doc.name), {})[effect] = kwargs
+
+
+def defer_batched_side_effect(effect: str, item):
+	"""
+	Run `effect` once, after the current transaction commits, with every `item` deferred
+	for it in this request.
+
+	:param effect: Dotted path to a function that takes a list of items
+	:param item: JSON serializable value describing one unit of work
+	"""
+	if run_inline():
+		run_batched_side_effect(effect, [item])
+		return
+
+	get_pending_side_effects()["batches"].setdefault(effect, []).append(item)
+
+
+def run_inline():
+	return frappe.flags.in_test or frappe.flags.in_install or frappe.flags.in_migrate
+
+
+def get_pending_side_effects():
+	pending = getattr(frappe.local, "crm_deferred_side_effects", None)
+	if not pending:
+		pending = frappe.local.crm_deferred_side_effects = {"docs": {}, "batches": {}}
+		frappe.db.after_commit.add(enqueue_deferred_side_effects)
+		frappe.db.after_rollback.add(clear_deferred_side_effects)
+	return pending
+
+
+def enqueue_deferred_side_effects():
+	pending = getattr(frappe.local, "crm_deferred_side_effects", None) or {}
+	frappe.local.crm_deferred_side_effects = None
+	for (doctype, name), effects in pending.get("docs", {}).items():
+		frappe.enqueue(
+			"crm.utils.side_effects.run_side_effects",
+			queue="short",
+			doctype=doctype,
+			name=name,
+			effects=effects,
+		)
+
+	for effect, items in pending.get("batches", {}).items():
+		for batch in create_batch(items, SIDE_EFFECT_BATCH_SIZE):
+			frappe.enqueue(
+				"crm.utils.side_effects.run_batched_side_effect",
+				queue="short",
+				effect=effect,
+				items=list(batch),
+			)
+
+
+def clear_deferred_side_effects():
+	frappe.local.crm_deferred_side_effects = None
+
+
+def run_side_effects(doctype: str, name: str, effects: dict):
+	try:
+		doc = frappe.get_doc(doctype, name)
+	except frappe.DoesNotExistError:
+		# deleted before the job got to it
+		frappe.clear_last_message()
+		return
+
+	for effect, kwargs in effects.items():
+		run_side_effect(doc, effect, kwargs)
+
+
+def run_side_effect(doc, effect: str, kwargs: dict | None = None):
+	fn = frappe.get_attr(effect) if "." in effect else getattr(doc, effect)
+	args = () if "." not in effect else (doc,)
+
+	start = time.perf_counter()
+	try:
+		fn(*args, **(kwargs or {}))
+	except Exception:
+		if frappe.flags.in_test:
+			raise
+		frappe.log_error(title=f"CRM side effect {effect} failed for {doc.doctype} {doc.name}")
+	finally:
+		record_side_effect_timing(f"{doc.doctype}:{effect}", time.perf_counter() - start)
+
+
+def run_batched_side_effect(effect: str, items: list):
+	start = time.perf_counter()
+	try:
+		frappe.get_attr(effect)(items)
+	except Exception:
+		if frappe.flags.in_test:
+			raise
+		frappe.log_error(title=f"CRM side effect {effect} failed for {len(items)} items")
+	finally:
+		record_side_effect_timing(effect, time.perf_counter() - start)
+
+
+def record_side_effect_timing(effect: str, duration: float):
+	timing = frappe.cache.hget(SIDE_EFFECT_TIMINGS_CACHE_KEY, effect) or {
+		"count": 0,
+		"total_ms": 0.0,
+		"max_ms": 0.0,
+	}
+	duration_ms = duration * 1000
+	timing["count"] += 1
+	timing["total_ms"] += duration_ms
+	timing["max_ms"] = max(timing["max_ms"], duration_ms)
+	timing["last_ms"] = duration_ms
+	frappe.cache.hset(SIDE_EFFECT_TIMINGS_CACHE_KEY, effect, timing)
+
+
+@frappe.whitelist()
+def get_side_effect_timings():
+	"""Count, average, max and last run time in milliseconds of every deferred side effect."""
+	frappe.only_for("System Manager")
+
+	timings = frappe.cache.hgetall(SIDE_EFFECT_TIMINGS_CACHE_KEY) or {}
+	return {
+		frappe.safe_decode(effect): {**timing, "avg_ms": timing["total_ms"] / timing["count"]}
+		for effect, timing in timings.items()
+		if timing and timing.get("count")
+	}
@@ -0,0 +1,63 @@
+import frappe
+
+STATUS_DOCTYPES = {
+	"CRM Lead": "CRM Lead Status",
+	"CRM Deal": "CRM Deal Status",
+}
+STATUS_CATALOG_CACHE_KEY = "crm_status_catalog"
+
+
+def get_status_catalog(status_doctype: str) -> dict:
+	"""
+	Return `{status: {"type", "probability", "position", "color"}}` for every status of
+	`CRM Lead Status` or `CRM Deal Status`. Built with one query and cached until a
+	status is changed, renamed or deleted.
+	"""
+	return frappe.cache.hget(
+		STATUS_CATALOG_CACHE_KEY, status_doctype, generator=lambda: build_status_catalog(status_doctype)
+	)
+
+
+def build_status_catalog(status_doctype: str) -> dict:
+	fields = ["name", "type", "position", "color"]
+	if frappe.get_meta(status_doctype).has_field("probability"):
+		fields.append("probability")
+
+	catalog = {}
+	for status in frappe.get_all(status_doctype, fields=fields, order_by="position asc"):
+		catalog[status.name] = {
+			"type": status.type,
+			"probability": status.get("probability") or 0,
+			"position": status.position,
+			"color": status.color,
+		}
+	return catalog
+
+
+def get_status_info(doctype: str, status: str | None) -> dict:
+	"""Catalog entry of `status` for a CRM Lead or CRM Deal, empty if it does not exist."""
+	if not status:
+		return {}
+	return get_status_catalog(STATUS_DOCTYPES[doctype]).get(status) or {}
+
+
+def get_status_type(doctype: str, status: str | None) -> str | None:
+	return get_status_info(doctype, status).get("type")
+
+
+def get_statuses_of_type(doctype: str, *types: str) -> tuple:
+	"""
+	Statuses of a CRM Lead or CRM Deal whose type is one of `types`, in position order.
+
+	Meant to be used as an `IN %(param)s` query parameter, so an empty result is returned
+	as `("",)` to keep the query valid while matching no document.
+	"""
+	catalog = get_status_catalog(STATUS_DOCTYPES[doctype])
+	return tuple(name for name, info in catalog.items() if info["type"] in types) or ("",)
+
+
+def clear_status_catalog(doc=None, method=None):
+	if doc:
+		frappe.cache.hdel(STATUS_CATALOG_CACHE_KEY, doc.doctype)
+	else:
+		frappe.cache.delete_value(STATUS_CATALOG_CACHE_KEY)
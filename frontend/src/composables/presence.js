@@ -0,0 +1,51 @@
+import { call } from 'frappe-ui'
+import { ref, watch } from 'vue'
+
+const HEARTBEAT_INTERVAL = 30 * 1000
+const IDLE_AFTER = 5 * 60 * 1000
+
+// set by the softphone components, sent with every heartbeat
+export const softphoneReady = ref(false)
+export const inCall = ref(false)
+
+let timer = null
+let lastActivity = Date.now()
+
+function markActive() {
+  lastActivity = Date.now()
+}
+
+function getStatus() {
+  if (inCall.value) return 'busy'
+  if (document.hidden || Date.now() - lastActivity > IDLE_AFTER) return 'idle'
+  return 'online'
+}
+
+export function sendHeartbeat() {
+  return call('crm.api.presence.heartbeat', {
+    status: getStatus(),
+    softphone: softphoneReady.value,
+  }).catch(() => {})
+}
+
+export function startPresenceHeartbeat(socket) {
+  if (timer) return
+
+  for (let event of ['mousedown', 'keydown', 'scroll', 'touchstart']) {
+    window.addEventListener(event, markActive, { passive: true })
+  }
+  document.addEventListener('visibilitychange', sendHeartbeat)
+  socket?.on('connect', sendHeartbeat)
+
+  sendHeartbeat()
+  timer = setInterval(sendHeartbeat, HEARTBEAT_INTERVAL)
+}
+
+export function stopPresenceHeartbeat() {
+  if (!timer) return
+  clearInterval(timer)
+  timer = null
+  document.removeEventListener('visibilitychange', sendHeartbeat)
+}
+
+watch([softphoneReady, inCall], () => timer && sendHeartbeat())
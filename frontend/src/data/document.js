@@ -80,21 +80,6 @@ export function useDocument(doctype, docname, resourceOverrides = {}) {
     }
   }
 
-  assigneesCache[doctype] = assigneesCache[doctype] || {}
-
-  if (!assigneesCache[doctype][docname || '']) {
-    assigneesCache[doctype][docname || ''] = createResource({
-      url: 'crm.api.doc.get_assigned_users',
-      cache: `assignees:${doctype}:${docname}`,
-      auto: docname ? true : false,
-      params: {
-        doctype: doctype,
-        name: docname,
-      },
-      transform: (data) => parseAssignees(data),
-    })
-  }
-
   permissionsCache[doctype] = permissionsCache[doctype] || {}
 
   if (!permissionsCache[doctype][docname || '']) {
@@ -333,7 +318,7 @@ export function useDocument(doctype, docname, resourceOverrides = {}) {
 
   return {
     document: documentsCache[doctype][docname || ''],
-    assignees: assigneesCache[doctype][docname || ''],
+    assignees: getAssignees(doctype, docname),
     permissions: permissionsCache[doctype][docname || ''],
     scripts,
     error,
@@ -352,3 +337,22 @@ export function useDocument(doctype, docname, resourceOverrides = {}) {
     triggerConvertToDeal,
   }
 }
+
+export function getAssignees(doctype, docname, auto = Boolean(docname)) {
+  assigneesCache[doctype] = assigneesCache[doctype] || {}
+
+  if (!assigneesCache[doctype][docname || '']) {
+    assigneesCache[doctype][docname || ''] = createResource({
+      url: 'crm.api.doc.get_assigned_users',
+      cache: `assignees:${doctype}:${docname}`,
+      auto,
+      params: {
+        doctype: doctype,
+        name: docname,
+      },
+      transform: (data) => parseAssignees(data),
+    })
+  }
+
+  return assigneesCache[doctype][docname || '']
+}
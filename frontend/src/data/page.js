@@ -0,0 +1,50 @@
+import { getAssignees } from '@/data/document'
+import { parseAssignees } from '@/utils'
+import { createResource } from 'frappe-ui'
+import { watch } from 'vue'
+
+export function usePageData(doctype, docname, sections) {
+  const page = createResource({
+    url: 'crm.api.page.get_page_data',
+    params: {
+      doctype: doctype,
+      name: docname,
+      sections: [...sections, 'assigned_users'],
+    },
+    auto: true,
+  })
+
+  // created before useDocument so the assignees come from this request
+  // instead of one of their own
+  const assignees = getAssignees(doctype, docname, false)
+  loadPageSection(page, 'assigned_users', assignees, {
+    transform: (data) => parseAssignees(data),
+  })
+
+  return page
+}
+
+export function loadPageSection(page, section, resource, options = {}) {
+  const { transform = (data) => data, onSuccess } = options
+
+  function load() {
+    if (page.data && section in page.data) {
+      resource.data = transform(page.data[section])
+      onSuccess?.(resource.data)
+    } else {
+      // the page request or this section failed, load it on its own
+      resource.fetch()
+    }
+  }
+
+  if (page.data || page.error) return load()
+
+  const stop = watch(
+    () => page.data || page.error,
+    (loaded) => {
+      if (!loaded) return
+      stop()
+      load()
+    },
+  )
+}